@@ -3,10 +3,11 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from fpdf import FPDF
-import qrcode
-import io
 from datetime import datetime
+import os
+from lts.informes import PDFBase, pdf_a_bytes
+from lts.instrumentacion import Instrumentacion, activar, etapa, panel_depuracion
+from lts.recursos import descarga_diferida, huella
 
 # Constantes
 PM = {
@@ -60,12 +61,17 @@ def analizar_composicion(composicion):
         'Validación': validacion
     }
 
-class PDF(FPDF):
+def cumple_regla(valor, op, ref):
+    return valor < ref if op == '<' else ref[0] <= valor <= ref[1]
+
+class PDF(PDFBase):
     def header(self):
         self.set_font('Arial', 'B', 12)
         self.cell(0, 10, 'Informe de Análisis de Gas Natural', 0, 1, 'C')
         self.ln(5)
     def add_sample(self, nombre, resultados):
+        cumple = {param: cumple_regla(valor, op, ref) for param, (valor, (op, ref, _)) in resultados['Validación'].items()}
+        emitido = self.certificar(nombre, resultados, all(cumple.values()))
         self.set_font('Arial', '', 10)
         self.cell(0, 10, f"Muestra: {nombre}", 0, 1)
         for k, v in resultados.items():
@@ -76,36 +82,42 @@ class PDF(FPDF):
         self.cell(0, 8, 'Validación de parámetros:', 0, 1)
         self.set_font('Arial', '', 10)
         for param, (valor, (op, ref, unidad)) in resultados['Validación'].items():
-            if op == '<':
-                cumple = valor < ref
-                espec = f"< {ref} {unidad}"
-            else:
-                cumple = ref[0] <= valor <= ref[1]
-                espec = f"{ref[0]}–{ref[1]} {unidad}"
-            estado = '✅' if cumple else '❌'
+            espec = f"< {ref} {unidad}" if op == '<' else f"{ref[0]}–{ref[1]} {unidad}"
+            estado = '✅' if cumple[param] else '❌'
             self.cell(0, 8, f"{estado} {param}: {valor:.2f} ({espec})", 0, 1)
+        self.set_font('Arial', 'I', 7)
+        self.cell(0, 5, f"Certificado {emitido.codigo}", 0, 1)
         self.ln(5)
 
+def generar_informe(resultados):
+    pdf = PDF()
+    pdf.add_page()
+    pdf.add_sample("Muestra", resultados)
+    return pdf_a_bytes(pdf)
+
 st.title("🧪 Analizador de Gas Natural")
+instrumentacion = st.session_state.setdefault("instrumentacion", Instrumentacion())
+depurar = st.sidebar.checkbox("🐞 Depuración (tiempos por etapa)", value=bool(os.environ.get("LTS_DEBUG")))
+activar(instrumentacion if depurar else None)
 archivo = st.file_uploader("Subí un archivo CSV con una muestra", type="csv")
 
 if archivo:
-    df = pd.read_csv(archivo)
-    fila = df.iloc[0]
-    composicion = {k: fila[k] for k in PM if k in fila}
-    resultados = analizar_composicion(composicion)
+    with etapa('ingesta'):
+        df = pd.read_csv(archivo)
+    with etapa('análisis'):
+        fila = df.iloc[0]
+        composicion = {k: fila[k] for k in PM if k in fila}
+        resultados = analizar_composicion(composicion)
     st.subheader("📊 Resultados del análisis")
-    st.dataframe(pd.DataFrame.from_dict(resultados, orient='index', columns=['Valor']))
+    with etapa('render tabla'):
+        st.dataframe(pd.DataFrame.from_dict(resultados, orient='index', columns=['Valor']))
 
-    pdf = PDF()
-    pdf.add_page()
-    pdf.add_sample("Muestra", resultados)
-    buffer = io.BytesIO()
-    pdf.output(buffer)
-    buffer.seek(0)
-    st.download_button(
-        label="📥 Descargar informe PDF",
-        data=buffer,
-        file_name=f"Informe_Gas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-        mime="application/pdf"
+    # Cada PDF emite y registra un certificado: se genera solo al pedirlo, una vez por archivo
+    descarga_diferida(
+        st, "informe PDF", huella(archivo.getvalue(), 'informe'),
+        lambda: generar_informe(resultados),
+        f"Informe_Gas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
     )
+
+if depurar:
+    panel_depuracion(st, instrumentacion)
@@ -1,124 +1,215 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-from fpdf import FPDF
 import io
+import os
 from datetime import datetime
+from lts.calidad_datos import COLUMNAS_ATIPICO, cribar, historia_reciente
+from lts.certificados import obtener_indice
+from lts.especificaciones import TABLA
+from lts.gas import COMPONENTES, analizar_tabla, banderas_lote, fila_a_resultados, parametros_historial
+from lts.comercial import CLAVES, leer_volumenes, obtener_balance
+from lts.historial import obtener_historial
+from lts.incertidumbre import incertidumbre_lote
+from lts.importacion import DESTINOS, FORMATOS, PERFILES, columnas_de, leer_tabla, resolver_mapeo
+from lts.ingesta import detectar_columna_fecha, procesar_historico
+from lts.informes import generar_informe_lote, informe_muestra
+from lts.recursos import ANALISIS, descarga_diferida, estadisticas_caches, huella
+from lts.exportacion import exportar_zip
+from lts.tiempo_real import obtener_analizador
+from lts.instrumentacion import Instrumentacion, activar, etapa, panel_depuracion
 
 st.title("Sistema de Análisis de Calidad - Planta LTS")
-modulo = st.selectbox("🧪 Elegí el tipo de análisis:", ["Gas Natural", "Gasolina Estabilizada"])
-
-PM = {
-    'CH4': 16.04, 'C2H6': 30.07, 'C3H8': 44.10,
-    'i-C4H10': 58.12, 'n-C4H10': 58.12, 'i-C5H12': 72.15, 'n-C5H12': 72.15,
-    'C6+': 86.00, 'N2': 28.01, 'CO2': 44.01, 'H2S': 34.08, 'O2': 32.00
-}
-HHV = {
-    'CH4': 39.82, 'C2H6': 70.6, 'C3H8': 101.0,
-    'i-C4H10': 131.6, 'n-C4H10': 131.6,
-    'i-C5H12': 161.0, 'n-C5H12': 161.0,
-    'C6+': 190.0
-}
-R = 8.314
-PM_aire = 28.96
-T_std = 288.15
-P_std = 101325
-
-class PDF(FPDF):
-    def header(self):
-        try:
-            self.image("LOGO PETROGAS.png", x=10, y=8, w=25)  # Asegurate que este archivo PNG esté en el mismo directorio
-        except:
-            pass
-        self.set_font('Arial', 'B', 12)
-        self.cell(0, 10, f"Informe de Calidad - {modulo}", 0, 1, 'C')
-        self.ln(5)
-
-    def add_sample(self, nombre, resultados):
-        self.set_font('Arial', '', 10)
-        self.cell(0, 10, f"Muestra: {nombre}", 0, 1)
-        for k, v in resultados.items():
-            if k != 'Validación':
-                try:
-                    self.cell(0, 8, f"{k}: {v:.4f}" if isinstance(v, float) else f"{k}: {v}", 0, 1)
-                except:
-                    self.cell(0, 8, f"{k}: [ERROR AL MOSTRAR]", 0, 1)
-        self.ln(3)
-        if 'Validación' in resultados:
-            self.set_font('Arial', 'B', 10)
-            self.cell(0, 8, 'Validación de parámetros:', 0, 1)
-            self.set_font('Arial', '', 10)
-            for param, (valor, (op, ref, unidad)) in resultados['Validación'].items():
-                if op == '<':
-                    cumple = valor < ref
-                    espec = f"< {ref} {unidad}"
-                else:
-                    cumple = ref[0] <= valor <= ref[1]
-                    espec = f"{ref[0]}-{ref[1]} {unidad}"
-                estado = 'CUMPLE' if cumple else 'NO CUMPLE'
-                self.cell(0, 8, f"{estado} {param}: {valor:.2f} ({espec})", 0, 1)
-        self.ln(5)
+instrumentacion = st.session_state.setdefault("instrumentacion", Instrumentacion())
+depurar = st.sidebar.checkbox("🐞 Depuración (tiempos por etapa)", value=bool(os.environ.get("LTS_DEBUG")))
+activar(instrumentacion if depurar else None)
+
+# --------------------------- ANÁLISIS CON CONTROL DE DATOS --------------------------- #
+def analizar_archivo(archivo, perfil, valor_dolar, contrato, punto=None):
+    """Control de calidad de datos y análisis de las filas limpias: (resultados, lote, rechazos, limpias).
+
+    Los atípicos se buscan frente a las últimas composiciones del punto guardadas en el historial.
+    `limpias` conserva la composición y la fecha de muestreo de cada fila analizada.
+    """
+    historia = historia_reciente(obtener_historial(), "Gas Natural", punto)
+    limpias, rechazos = cribar(leer_tabla(archivo, perfil), historia)
+    if limpias.empty:
+        raise ValueError(f"El control de datos rechazó las {len(rechazos)} filas del archivo "
+                         f"(p. ej.: {rechazos['Motivo'].iloc[0]})")
+    resultados, lote = analizar_tabla(limpias, valor_dolar, contrato)
+    if lote is not None:
+        lote = lote.join(limpias[COLUMNAS_ATIPICO])
+    return resultados, lote, rechazos, limpias
+
+# --------------------------- VERIFICACIÓN DE CERTIFICADOS --------------------------- #
+# Con LTS_URL_VERIFICACION apuntando a esta app, el QR de cada informe abre ?verificar=<código>
+codigo = st.query_params.get("verificar") or st.sidebar.text_input("🔎 Verificar certificado (código o texto del QR)")
+if codigo:
+    emitido = obtener_indice().verificar(codigo)
+    if emitido is None:
+        st.error("❌ Certificado no registrado: el código no corresponde a ningún informe emitido.")
+    else:
+        estado = {True: "CUMPLE", False: "NO CUMPLE", None: "-"}[emitido.cumple]
+        st.success(f"✅ Certificado válido: {emitido.muestra} ({emitido.titulo}), emitido el "
+                   f"{datetime.fromtimestamp(emitido.fecha):%Y-%m-%d %H:%M} — {estado}")
+        st.dataframe(pd.DataFrame(emitido.datos.items(), columns=["Parámetro", "Valor certificado"]))
+    if "verificar" in st.query_params:
+        st.stop()
+
+TABLA.contratos("Gas Natural")  # recarga la tabla si cambió
+if TABLA.error:
+    st.warning(f"⚠️ {TABLA.error}")
+
+modulo = st.selectbox("🧪 Elegí el tipo de análisis:", ["Gas Natural", "Gasolina Estabilizada", "Analizadores en línea", "Balance comercial"])
 
 if modulo == "Gas Natural":
     st.header("📄 Módulo de Gas Natural")
     valor_dolar = st.number_input("💲 Ingresá el valor estimado en USD por MJ de PCS", value=2.25, step=0.01)
-    archivo = st.file_uploader("Subí un archivo CSV con una muestra", type="csv")
-
-    def analizar_composicion(composicion, valor_dolar):
-        composicion = {k: float(v) for k, v in composicion.items() if k in PM}
-        total = sum(composicion.values())
-        fracciones = {k: v / total for k, v in composicion.items()}
-        pm_muestra = sum(fracciones[k] * PM[k] for k in fracciones)
-        densidad = (pm_muestra * P_std) / (R * T_std)
-        hhv_total = sum(fracciones.get(k, 0) * HHV.get(k, 0) for k in HHV)
-        gamma = PM_aire / pm_muestra
-        wobbe = hhv_total / np.sqrt(pm_muestra / PM_aire)
-        dew_point = -30 if fracciones.get('C6+', 0) > 0.01 else -60
-        api_h2s_ppm = composicion.get('H2S', 0) * 1e4
-        carga_h2s = (api_h2s_ppm * PM['H2S'] / 1e6) / (pm_muestra * 1e3)
-        ingreso = hhv_total * valor_dolar
-        validacion = {
-            'CO2 (%)': (composicion.get('CO2', 0), ('<', 2, '% molar')),
-            'Inertes totales': (sum(composicion.get(k, 0) for k in ['N2', 'CO2', 'O2']), ('<', 4, '% molar')),
-            'O2 (%)': (composicion.get('O2', 0), ('<', 0.2, '% molar')),
-            'H2S (ppm)': (api_h2s_ppm, ('<', 2, 'ppm')),
-            'PCS (kcal/m3)': (hhv_total * 239.006, ('>=', (8850, 12200), 'Kcal/Sm3'))
-        }
-        return {
-            'PM': pm_muestra,
-            'PCS (MJ/m3)': hhv_total,
-            'PCS (kcal/m3)': hhv_total * 239.006,
-            'Gamma': gamma,
-            'Wobbe': wobbe,
-            'Densidad (kg/m3)': densidad,
-            'Dew Point estimado (C)': dew_point,
-            'CO2 (%)': composicion.get('CO2', 0),
-            'H2S ppm': api_h2s_ppm,
-            'Carga H2S (kg/kg)': carga_h2s,
-            'Ingreso estimado (USD/m3)': ingreso,
-            'Validación': validacion
-        }
+    archivo = st.file_uploader("Subí un archivo con una o más muestras (CSV, XLSX o Parquet)", type=FORMATOS)
+    perfil = st.selectbox("🗂️ Perfil de columnas", ["(automático)"] + PERFILES.nombres())
+    perfil = None if perfil == "(automático)" else perfil
+    historico = st.checkbox("📚 Procesar como histórico (lectura por bloques, resumen diario)")
+    punto = st.text_input("📍 Punto de muestreo")
+    contrato = st.selectbox("📑 Contrato / especificación", TABLA.contratos(modulo))
 
     if archivo:
-        df = pd.read_csv(archivo)
-        fila = df.iloc[0]
-        composicion = {k: fila[k] for k in PM if k in fila}
-        resultados = analizar_composicion(composicion, valor_dolar)
+        with st.expander("🔗 Mapeo de columnas"):
+            columnas = columnas_de(archivo)
+            mapeo = resolver_mapeo(columnas, perfil)
+            editado = st.data_editor(
+                pd.DataFrame({'Columna': columnas, 'Componente': [mapeo.get(c) for c in columnas]}),
+                column_config={'Componente': st.column_config.SelectboxColumn(options=DESTINOS)},
+                disabled=['Columna'], hide_index=True, key="mapeo_columnas")
+            nombre_perfil = st.text_input("Guardar como perfil", value=perfil or "", key="nombre_perfil")
+            if st.button("💾 Guardar perfil") and nombre_perfil:
+                PERFILES.guardar(nombre_perfil, {
+                    c: d for c, d in zip(editado['Columna'], editado['Componente']) if isinstance(d, str) and d})
+                st.success(f"Perfil '{nombre_perfil}' guardado; elegilo arriba para usarlo")
+
+    if archivo and historico:
+        clave = huella(archivo.getvalue(), valor_dolar, contrato, TABLA.version, perfil, PERFILES.version, 'historico')
+        try:
+            with etapa('caché de análisis'):
+                agregador = ANALISIS.obtener(
+                    clave, lambda: procesar_historico(archivo, valor_dolar, perfil=perfil, contrato=contrato))
+        except ValueError as error:
+            st.error(str(error))
+            st.stop()
+        st.subheader("Resumen diario del histórico")
+        st.metric("Muestras procesadas", agregador.muestras)
+        st.metric("Muestras que NO CUMPLEN", agregador.fuera_de_spec)
+        st.metric("Filas rechazadas por el control de datos", agregador.control.rechazadas)
+        st.metric("Filas atípicas (incluidas en el análisis)", agregador.control.atipicas)
+        with etapa('render tabla'):
+            st.dataframe(agregador.resumen())
+        if agregador.control.rechazadas:
+            rechazos = agregador.informe_rechazos()
+            with st.expander(f"🚫 Filas rechazadas ({agregador.control.rechazadas})"):
+                st.dataframe(agregador.control.resumen())
+                if len(rechazos) < agregador.control.rechazadas:
+                    st.caption(f"El informe incluye las primeras {len(rechazos)} filas rechazadas.")
+                st.download_button("⬇️ Descargar informe de rechazos (CSV)", rechazos.to_csv(index_label='Fila'),
+                                   file_name=f"Rechazos_Historico_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                                   mime="text/csv")
+        if agregador.control.atipicas:
+            atipicos = agregador.informe_atipicos()
+            with st.expander(f"⚠️ Filas atípicas, analizadas igual ({agregador.control.atipicas})"):
+                if len(atipicos) < agregador.control.atipicas:
+                    st.caption(f"Se muestran las primeras {len(atipicos)} filas atípicas.")
+                st.dataframe(atipicos)
+
+    elif archivo:
+        clave = huella(archivo.getvalue(), valor_dolar, contrato, TABLA.version, perfil, PERFILES.version, punto,
+                       'control')
+        try:
+            with etapa('caché de análisis'):
+                resultados, lote, rechazos, limpias = ANALISIS.obtener(
+                    clave, lambda: analizar_archivo(archivo, perfil, valor_dolar, contrato, punto or None))
+        except ValueError as error:
+            st.error(str(error))
+            st.stop()
+        titulo = f"Informe de Calidad - {modulo}"
+
+        if len(rechazos):
+            st.warning(f"⚠️ El control de datos rechazó {len(rechazos)} filas; se analizan las restantes.")
+            with st.expander(f"🚫 Filas rechazadas ({len(rechazos)})"):
+                st.dataframe(rechazos)
+                st.download_button("⬇️ Descargar informe de rechazos (CSV)", rechazos.to_csv(index_label='Fila'),
+                                   file_name=f"Rechazos_Gas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                                   mime="text/csv")
 
         st.subheader("Resultados del análisis")
-        st.dataframe(pd.DataFrame.from_dict(resultados, orient='index', columns=['Valor']))
+        with etapa('render tabla'):
+            st.dataframe(pd.DataFrame.from_dict(resultados, orient='index', columns=['Valor']))
+
+        if lote is not None:
+            st.subheader(f"Resultados por muestra ({len(lote)} filas)")
+            st.metric("Muestras que NO CUMPLEN", int((~lote['Cumple']).sum()))
+            if lote['Atípico'].any():
+                st.warning(f"⚠️ {int(lote['Atípico'].sum())} muestras atípicas frente a la historia reciente "
+                           "(columna 'Motivo atípico'); se validan igual contra la especificación.")
+            with etapa('render tabla'):
+                st.dataframe(lote)
+            detalle = st.checkbox("Incluir una página de detalle por muestra")
+            descarga_diferida(
+                st, "informe del lote (PDF)", clave + ('lote', detalle),
+                lambda: generar_informe_lote(lote, titulo, detalle=detalle, contrato=contrato),
+                f"Informe_Gas_Lote_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+            )
+            if st.button("🗂️ Generar certificados individuales (ZIP)"):
+                trabajos = [
+                    (f"Informe_Gas_{i}.pdf", 'muestra',
+                     {'titulo': titulo, 'nombre': str(i), 'resultados': fila_a_resultados(fila, contrato)})
+                    for i, fila in lote.iterrows()
+                ]
+                barra = st.progress(0.0, text="Generando certificados...")
+                zip_buffer = io.BytesIO()
+                exportar_zip(trabajos, zip_buffer, progreso=lambda hechos, total: barra.progress(
+                    hechos / total, text=f"{hechos}/{total} certificados"))
+                st.download_button(
+                    label="📥 Descargar certificados (ZIP)",
+                    data=zip_buffer.getvalue(),
+                    file_name=f"Certificados_Gas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
+                    mime="application/zip"
+                )
 
-        pdf = PDF()
-        pdf.add_page()
-        pdf.add_sample("Muestra", resultados)
-        pdf_bytes = pdf.output(dest='S').encode('latin1')
-        buffer = io.BytesIO(pdf_bytes)
-
-        st.download_button(
-            label="📥 Descargar informe PDF",
-            data=buffer,
-            file_name=f"Informe_Gas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-            mime="application/pdf"
+        if st.checkbox("🎲 Incertidumbre de medición (Monte Carlo)"):
+            c1, c2, c3 = st.columns(3)
+            sorteos = c1.selectbox("Sorteos por muestra", [1_000, 10_000, 50_000], index=1)
+            escala = c2.number_input("Factor sobre la repetibilidad del GC", 0.1, 10.0, 1.0, step=0.1)
+            umbral = c3.number_input("Alertar si P(no cumple) supera", 0.0, 1.0, 0.05, step=0.01)
+            with etapa('caché de análisis'):
+                mc = ANALISIS.obtener(clave + ('incertidumbre', sorteos, escala), lambda: incertidumbre_lote(
+                    leer_tabla(archivo, perfil).drop(index=rechazos.index), sorteos, escala=escala,
+                    contrato=contrato, semilla=0))
+            nominal = lote['Cumple'] if lote is not None else pd.Series([all(
+                regla.cumple(valor) for valor, regla in resultados['Validación'].values())], index=mc.index)
+            dudosas = nominal.to_numpy() & (mc['P(no cumple)'] > umbral).to_numpy()
+            st.metric("Muestras que CUMPLEN pero pueden estar fuera de especificación", int(dudosas.sum()))
+            columnas = ['P(no cumple)'] + [c for c in mc.columns if c.startswith('P(fuera)')] + [
+                f"{p} {s}" for p in ('PCS (kcal/m3)', 'Wobbe', 'CO2 (%)') for s in ('media', 'IC inf', 'IC sup')]
+            with etapa('render tabla'):
+                st.dataframe(mc[columnas].assign(**{'Cumple (nominal)': nominal.to_numpy()}))
+            st.caption(f"IC del 95 % con {sorteos:,} composiciones perturbadas por muestra (σ de repetibilidad x {escala:g}).")
+
+        if st.button("💾 Guardar en historial"):
+            # Con la composición, para que el control de datos compare las próximas cargas con esta
+            columna_fecha = detectar_columna_fecha(limpias)
+            fechas = limpias[columna_fecha] if columna_fecha else None
+            composicion = limpias[[k for k in COMPONENTES if k in limpias.columns]]
+            if lote is not None:
+                obtener_historial().registrar_lote(modulo, lote.join(composicion), banderas_lote(contrato),
+                                                   punto=punto or None, fechas=fechas)
+            else:
+                parametros = {**parametros_historial(resultados),
+                              **{k: (float(v), None) for k, v in composicion.iloc[0].items()}}
+                obtener_historial().registrar(modulo, parametros, punto=punto or None,
+                                              fecha=None if fechas is None else fechas.iloc[0])
+            st.success("Análisis guardado en el historial")
+
+        descarga_diferida(
+            st, "informe PDF", clave + ('muestra',),
+            lambda: informe_muestra(titulo, "Muestra", resultados),
+            f"Informe_Gas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         )
 
 elif modulo == "Gasolina Estabilizada":
@@ -127,10 +218,8 @@ elif modulo == "Gasolina Estabilizada":
     sales = st.number_input("🧂 Concentración de sales (mg/l)", min_value=0.0)
     color = st.text_area("🎨 Color (observación)")
 
-    validacion = {
-        'TVR (psi a 38.7 C)': (tvr, ('<', 12, 'psi')),
-        'Sales (mg/l)': (sales, ('<', 20, 'mg/l'))
-    }
+    valores = {'TVR (psi a 38.7 C)': tvr, 'Sales (mg/l)': sales}
+    validacion = {r.parametro: (valores[r.columna], r) for r in TABLA.reglas(modulo) if r.columna in valores}
 
     resultados = {
         'TVR (psi a 38.7 C)': tvr,
@@ -140,19 +229,81 @@ elif modulo == "Gasolina Estabilizada":
     }
 
     st.subheader("Resultados del análisis")
-    st.dataframe(pd.DataFrame.from_dict(resultados, orient='index', columns=['Valor']))
-
-    pdf = PDF()
-    pdf.add_page()
-    pdf.add_sample("Gasolina", resultados)
-    pdf_bytes = pdf.output(dest='S').encode('latin1')
-    buffer = io.BytesIO(pdf_bytes)
-
-    st.download_button(
-        label="📥 Descargar informe PDF",
-        data=buffer,
-        file_name=f"Informe_Gasolina_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-        mime="application/pdf"
+    with etapa('render tabla'):
+        st.dataframe(pd.DataFrame.from_dict(resultados, orient='index', columns=['Valor']))
+
+    if st.button("💾 Guardar en historial"):
+        obtener_historial().registrar(modulo, {
+            param: (valor, bool(regla.cumple(valor))) for param, (valor, regla) in validacion.items()
+        })
+        st.success("Análisis guardado en el historial")
+
+    descarga_diferida(
+        st, "informe PDF", huella(f"{tvr}|{sales}|{color}".encode(), modulo, TABLA.version),
+        lambda: informe_muestra(f"Informe de Calidad - {modulo}", "Gasolina", resultados),
+        f"Informe_Gasolina_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
     )
 
+elif modulo == "Analizadores en línea":
+    st.header("📡 Analizadores en línea")
+    carpeta = st.text_input("📂 Carpeta de CSV de los analizadores", value=os.environ.get("LTS_ANALIZADORES", ""))
+    puerto = int(st.number_input("🔌 Puerto TCP (JSON por línea, 0 = desactivado)", value=0, step=1))
+    contrato = st.selectbox("📑 Contrato / especificación", TABLA.contratos("Gas Natural"))
+
+    if carpeta or puerto:
+        servicio = obtener_analizador(carpeta or None, puerto or None)
+
+        @st.fragment(run_every=1)
+        def panel_en_linea():
+            if servicio.error is not None:
+                st.error(f"❌ El servicio de adquisición se detuvo: {servicio.error}")
+            st.caption(f"{servicio.lecturas} lecturas · {servicio.descartadas} descartadas")
+            alarmas = servicio.ultimas_alarmas(contrato=contrato)
+            if len(alarmas):
+                st.error(f"🚨 {alarmas.iloc[0]['corriente']}: {alarmas.iloc[0]['parametro']} fuera de "
+                         f"especificación ({alarmas.iloc[0]['especificacion']})")
+            st.subheader("Última lectura por corriente")
+            st.dataframe(servicio.ultimas(contrato))
+            st.subheader("Alarmas")
+            st.dataframe(alarmas)
+            corrientes = servicio.corrientes()
+            if corrientes:
+                corriente = st.selectbox("Corriente", corrientes)
+                st.line_chart(servicio.datos(corriente, contrato).set_index('Fecha')[['PCS (kcal/m3)', 'Wobbe']])
+
+        panel_en_linea()
+
+elif modulo == "Balance comercial":
+    st.header("💰 Balance comercial")
+    valor_dolar = st.number_input("💲 Valor en USD por MJ de PCS", value=2.25, step=0.01, key="dolar_comercial")
+    archivo = st.file_uploader("Subí las mediciones de volumen (CSV: Fecha, Punto, Volumen (Sm3), Contrato)",
+                               type="csv", key="volumenes")
+    if archivo:
+        historial = obtener_historial()
+        try:
+            volumenes = leer_volumenes(io.BytesIO(archivo.getvalue()))
+        except ValueError as error:
+            st.error(str(error))
+            st.stop()
+        contratos = sorted(volumenes['Contrato'].astype(str).unique()) if 'Contrato' in volumenes else []
+        precios = {c: st.number_input(f"💲 USD/MJ contrato {c}", value=valor_dolar, step=0.01, key=f"precio_{c}")
+                   for c in contratos}
+        with etapa('balance comercial'):
+            balance = obtener_balance(historial, volumenes, huella(archivo.getvalue()), precios, valor_dolar)
+            por = st.multiselect("Agrupar por", CLAVES, default=['Día'])
+            resumen = balance.resumen(por)
+        total = balance.resumen([]).iloc[0]
+        columnas = st.columns(3)
+        columnas[0].metric("Energía (GJ)", f"{total['Energía (MJ)'] / 1e3:,.0f}")
+        columnas[1].metric("Ingreso (USD)", f"{total['Ingreso (USD)']:,.0f}")
+        columnas[2].metric("PCS ponderado (kcal/m3)", f"{total['PCS ponderado (kcal/m3)']:,.0f}")
+        if total['Volumen sin muestra (Sm3)'] > 0:
+            st.warning(f"{total['Volumen sin muestra (Sm3)']:,.0f} Sm3 sin una muestra previa del punto: no se valorizan")
+        with etapa('render tabla'):
+            st.dataframe(resumen)
 
+# --------------------------- CACHÉ --------------------------- #
+with st.sidebar.expander("Caché"):
+    st.dataframe(pd.DataFrame(estadisticas_caches()))
+if depurar:
+    panel_depuracion(st, instrumentacion)
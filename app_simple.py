@@ -1,161 +1,162 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-from fpdf import FPDF
 from datetime import datetime
 from io import BytesIO
 import os
-import base64
-from pathlib import Path
+from lts.informes import LOGO_LABORATORIO, informe_laboratorio
+from lts.especificaciones import TABLA
+from lts.instrumentacion import Instrumentacion, activar, etapa, panel_depuracion
+from lts.historial import inicio_trimestre_anterior, obtener_historial
+from lts.tendencias import PARAMETROS_TENDENCIA, obtener_tendencia
+from lts.recursos import CSS, estadisticas_caches, logo_base64
+from lts.calculadoras import (PM_AMINAS, barrido_cacheado, captacion_gas_acido, circulacion_amina,
+                              depresion_punto_rocio, mapa_de_calor, punto_rocio_teg)
 
 # --------------------------- CONFIGURACIÓN GENERAL --------------------------- #
 st.set_page_config(page_title="LTS Lab Analyzer", layout="wide")
-LOGO_PATH = "logopetrogas.png"
-
-# --------------------------- FUNCIONES UTILITARIAS --------------------------- #
-def limpiar_pdf_texto(texto):
-    reemplazos = {
-        "₀": "0", "₁": "1", "₂": "2", "₃": "3", "₄": "4",
-        "₅": "5", "₆": "6", "₇": "7", "₈": "8", "₉": "9",
-        "⁰": "0", "¹": "1", "²": "2", "³": "3",
-        "°": " grados ", "º": "", "“": '"', "”": '"',
-        "‘": "'", "’": "'", "–": "-", "—": "-", "•": "-",
-        "→": "->", "←": "<-", "⇒": "=>", "≠": "!=", "≥": ">=", "≤": "<=",
-        "✓": "OK", "✅": "OK", "❌": "NO"
-    }
-    for k, v in reemplazos.items():
-        texto = texto.replace(k, v)
-    return texto
+instrumentacion = st.session_state.setdefault("instrumentacion", Instrumentacion())
+depurar = st.sidebar.checkbox("🐞 Depuración (tiempos por etapa)", value=bool(os.environ.get("LTS_DEBUG")))
+activar(instrumentacion if depurar else None)
+LOGO_PATH = LOGO_LABORATORIO
 
 # --------------------------- ESTILO VISUAL --------------------------- #
-st.markdown("""
-    <style>
-        .stApp { background-color: #1e1e1e; color: white; }
-        .stButton>button, .stDownloadButton>button {
-            background-color: #0d6efd; color: white; border-radius: 8px; border: none;
-        }
-        input, textarea, .stTextInput, .stTextArea, .stNumberInput input {
-            background-color: #2e2e2e !important; color: white !important; border: 1px solid #555 !important;
-        }
-        .stSelectbox div { background-color: #2e2e2e !important; color: white !important; }
-    </style>
-""", unsafe_allow_html=True)
+st.markdown(CSS, unsafe_allow_html=True)
 
 # --------------------------- LOGO --------------------------- #
-if Path(LOGO_PATH).exists():
-    with open(LOGO_PATH, "rb") as f:
-        logo_base64 = base64.b64encode(f.read()).decode("utf-8")
+logo = logo_base64(LOGO_PATH)
+if logo:
     st.markdown(f"""
         <div style='text-align:center;'>
-            <img src='data:image/png;base64,{logo_base64}' width='200'/>
+            <img src='data:image/png;base64,{logo}' width='200'/>
         </div>
     """, unsafe_allow_html=True)
 else:
     st.warning("⚠️ No se encontró el logo 'logopetrogas.png'")
 
 st.markdown("<h2 style='text-align:center;'>🧪 LTS Lab Analyzer</h2>", unsafe_allow_html=True)
+TABLA.contratos("Gas Natural")  # recarga la tabla si cambió
+if TABLA.error:
+    st.warning(f"⚠️ {TABLA.error}")
 
-# --------------------------- PDF --------------------------- #
-class PDF(FPDF):
-    def header(self):
-        if os.path.exists(LOGO_PATH):
-            self.image(LOGO_PATH, 10, 8, 33)
-        self.set_font("Arial", "B", 12)
-        self.cell(0, 10, "INFORME DE ANÁLISIS DE LABORATORIO", 0, 1, "C")
-        self.set_font("Arial", "", 10)
-        self.cell(0, 10, f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M')}", 0, 1, "R")
-        self.ln(5)
-
-    def footer(self):
-        self.set_y(-15)
-        self.set_font("Arial", "I", 8)
-        self.cell(0, 10, "Confidencial - Uso interno PETROGAS", 0, 0, "C")
-
-    def add_section(self, title, content):
-        self.set_font("Arial", "B", 11)
-        self.cell(0, 10, title, 0, 1)
-        self.set_font("Arial", "", 10)
-        if isinstance(content, dict):
-            for k, v in content.items():
-                self.cell(0, 8, f"{k}: {v}", 0, 1)
-        else:
-            self.multi_cell(0, 8, str(content))
-        self.ln(2)
-
-def exportar_pdf(nombre, operador, explicacion, resultados, observaciones, muestreo_en, muestra_por):
-    pdf = PDF()
-    pdf.add_page()
-    pdf.add_section("Operador", limpiar_pdf_texto(operador))
-    pdf.add_section("Muestreo en", limpiar_pdf_texto(muestreo_en))
-    pdf.add_section("Muestra tomada por", limpiar_pdf_texto(muestra_por))
-    pdf.add_section("Explicación técnica", limpiar_pdf_texto(explicacion))
-    pdf.add_section("Resultados", resultados)
-    pdf.add_section("Observaciones", limpiar_pdf_texto(observaciones or "Sin observaciones."))
-    output = pdf.output(dest='S').encode('latin-1', errors='ignore')
-    st.download_button("⬇️ Descargar informe PDF", data=BytesIO(output), file_name=nombre, mime="application/pdf")
+# --------------------------- ESPECIFICACIONES --------------------------- #
+def evaluar(modulo, valores):
+    with etapa('validación'):
+        return TABLA.compilar(modulo).evaluar_valores(valores)
+
+# --------------------------- HISTORIAL --------------------------- #
+def formatear_resultados(parametros):
+    return {k: f"{valor} - {'✅' if ok else '❌'}" for k, (valor, ok) in parametros.items()}
+
+def guardar_analisis(modulo, parametros, operador, muestreo_en, muestra_por, observaciones):
+    with etapa('historial'):
+        obtener_historial().registrar(modulo, parametros, punto=muestreo_en or None, operador=operador,
+                                      muestra_por=muestra_por, observaciones=observaciones)
+
+# --------------------------- ESTADO POR SESIÓN --------------------------- #
+# El último análisis de cada módulo vive en st.session_state: sobrevive al rerun del botón de
+# descarga y no se mezcla entre usuarios (cada sesión tiene su propio session_state).
+def analizar_modulo(modulo, valores, explicacion, prefijo, operador, muestreo_en, muestra_por, obs):
+    parametros = evaluar(modulo, valores)
+    resultados = formatear_resultados(parametros)
+    guardar_analisis(modulo, parametros, operador, muestreo_en, muestra_por, obs)
+    reglas = TABLA.reglas(modulo)
+    regla_de = {**{r.parametro: r for r in reglas}, **{r.columna: r for r in reglas}}
+    validacion = {k: (v, regla_de[k]) for k, v in valores.items() if k in regla_de}
+    st.session_state[f"analisis_{modulo}"] = {
+        'resultados': resultados,
+        'pdf': informe_laboratorio(operador, explicacion, resultados, obs, muestreo_en, muestra_por, validacion),
+        'nombre': f"{prefijo}_{operador}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
+    }
+
+def mostrar_analisis(modulo):
+    analisis = st.session_state.get(f"analisis_{modulo}")
+    if analisis is None:
+        return
+    with etapa('render tabla'):
+        st.dataframe(pd.DataFrame(analisis['resultados'].items(), columns=["Parámetro", "Resultado"]))
+    st.download_button("⬇️ Descargar informe PDF", data=BytesIO(analisis['pdf']), file_name=analisis['nombre'],
+                       mime="application/pdf", key=f"pdf_{modulo}")
+
+# --------------------------- CALCULADORAS --------------------------- #
+PUNTOS_BARRIDO = [100, 300, 1000]  # por eje: hasta 10^6 puntos de operación por grilla
+
+def mapa_barrido(calculo, ejes, fijos, clave):
+    """Barrido de dos parámetros sobre `ejes` ({parámetro: (etiqueta, mínimo, máximo)}) como mapa de calor."""
+    puntos = st.select_slider("Puntos por eje", PUNTOS_BARRIDO, value=300, key=f"puntos_{clave}")
+    rangos = {}
+    for parametro, (etiqueta, minimo, maximo) in ejes.items():
+        desde, hasta = st.slider(etiqueta, minimo, maximo, (minimo, maximo), key=f"{parametro}_{clave}")
+        rangos[parametro] = (desde, hasta, puntos)
+    with etapa('barrido'):
+        (x, y), z = barrido_cacheado(calculo, rangos, fijos)
+        imagen = mapa_de_calor(z)
+    (etiqueta_x, *_), (etiqueta_y, *_) = ejes.values()
+    if np.isnan(z).all():
+        st.warning("⚠️ Ningún punto del barrido tiene solución con estos parámetros.")
+        return
+    st.image(imagen, caption=f"{calculo}: {np.nanmin(z):.2f} (violeta) a {np.nanmax(z):.2f} (amarillo) — "
+                             f"x: {etiqueta_x} {x[0]:g}→{x[-1]:g}, y: {etiqueta_y} {y[0]:g}→{y[-1]:g}")
+    sin_solucion = int(np.isnan(z).sum())
+    st.caption(f"{z.size:,} puntos de operación evaluados"
+               + (f" ({sin_solucion:,} sin solución, en gris)" if sin_solucion else ""))
 
 # --------------------------- TABS --------------------------- #
-tabs = st.tabs([
-    "Gas Natural", "Gasolina Estabilizada", "MEG", "TEG", "Agua Desmineralizada", "Aminas"
-])
+MODULOS = ["Gas Natural", "Gasolina Estabilizada", "MEG", "TEG", "Agua Desmineralizada", "Aminas"]
+tabs = st.tabs(MODULOS + ["Historial", "Tendencias"])
 
 # --------------------------- MODULOS --------------------------- #
 # GAS NATURAL
 with tabs[0]:
     st.subheader("🔥 Análisis de Gas Natural")
-    h2s = st.number_input("H₂S (ppm)", 0.0, step=0.1)
-    co2 = st.number_input("CO₂ (%)", 0.0, step=0.1)
-    operador = st.text_input("👤 Operador")
-    muestreo_en = st.text_input("📍 Muestreo en")
-    muestra_por = st.text_input("🧑‍🔬 Muestra tomada por")
-    obs = st.text_area("📝 Observaciones")
+    h2s = st.number_input("H2S (ppm)", 0.0, step=0.1, key="h2s_gas")
+    co2 = st.number_input("CO2 (%)", 0.0, step=0.1, key="co2_gas")
+    operador = st.text_input("👤 Operador", key="op_gas")
+    muestreo_en = st.text_input("📍 Muestreo en", key="m_gas")
+    muestra_por = st.text_input("🧑‍🔬 Muestra tomada por", key="t_gas")
+    obs = st.text_area("📝 Observaciones", key="obs_gas")
     if st.button("📊 Analizar Gas"):
-        resultados = {
-            "H₂S (ppm)": f"{h2s} - {'✅' if h2s <= 2.1 else '❌'}",
-            "CO₂ (%)": f"{co2} - {'✅' if co2 <= 2.0 else '❌'}"
-        }
-        st.dataframe(pd.DataFrame(resultados.items(), columns=["Parámetro", "Resultado"]))
-        exportar_pdf(f"Gas_{operador}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                     operador, "Evaluación de H₂S y CO₂.", resultados, obs, muestreo_en, muestra_por)
+        analizar_modulo("Gas Natural", {
+            "H2S (ppm)": h2s,
+            "CO2 (%)": co2
+        }, "Evaluación de H₂S y CO₂.", "Gas", operador, muestreo_en, muestra_por, obs)
+    mostrar_analisis("Gas Natural")
 
 # GASOLINA
 with tabs[1]:
     st.subheader("⛽ Análisis de Gasolina Estabilizada")
-    tvr = st.number_input("TVR (psia)", 0.0, step=0.1)
-    sales = st.number_input("Sales (mg/m²)", 0.0, step=0.1)
-    agua = st.number_input("Agua y sedimentos (%)", 0.0, step=0.1)
+    tvr = st.number_input("TVR (psia)", 0.0, step=0.1, key="tvr_gasolina")
+    sales = st.number_input("Sales (mg/m²)", 0.0, step=0.1, key="sales_gasolina")
+    agua = st.number_input("Agua y sedimentos (%)", 0.0, step=0.1, key="agua_gasolina")
     operador = st.text_input("👤 Operador", key="op_gasolina")
     muestreo_en = st.text_input("📍 Muestreo en", key="m_gasolina")
     muestra_por = st.text_input("🧑‍🔬 Muestra tomada por", key="t_gasolina")
     obs = st.text_area("📝 Observaciones", key="obs_gasolina")
     if st.button("📊 Analizar Gasolina"):
-        resultados = {
-            "TVR (psia)": f"{tvr} - {'✅' if tvr <= 12 else '❌'}",
-            "Sales (mg/m²)": f"{sales} - {'✅' if sales <= 100 else '❌'}",
-            "Agua y sedimentos (%)": f"{agua} - {'✅' if agua <= 1 else '❌'}"
-        }
-        st.dataframe(pd.DataFrame(resultados.items(), columns=["Parámetro", "Resultado"]))
-        exportar_pdf(f"Gasolina_{operador}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                     operador, "Control de TVR, sales y sedimentos.", resultados, obs, muestreo_en, muestra_por)
+        analizar_modulo("Gasolina Estabilizada", {
+            "TVR (psia)": tvr,
+            "Sales (mg/m²)": sales,
+            "Agua y sedimentos (%)": agua
+        }, "Control de TVR, sales y sedimentos.", "Gasolina", operador, muestreo_en, muestra_por, obs)
+    mostrar_analisis("Gasolina Estabilizada")
 
 # MEG
 with tabs[2]:
     st.subheader("🧪 Análisis de MEG")
-    ph = st.number_input("pH", 0.0, 14.0, step=0.1)
-    conc = st.number_input("Concentración (%wt)", 0.0, 100.0, step=0.1)
-    cl = st.number_input("Cloruros (ppm)", 0.0, step=0.1)
+    ph = st.number_input("pH", 0.0, 14.0, step=0.1, key="ph_meg")
+    conc = st.number_input("Concentración (%wt)", 0.0, 100.0, step=0.1, key="conc_meg")
+    cl = st.number_input("Cloruros (ppm)", 0.0, step=0.1, key="cl_meg")
     operador = st.text_input("👤 Operador", key="op_meg")
     muestreo_en = st.text_input("📍 Muestreo en", key="m_meg")
     muestra_por = st.text_input("🧑‍🔬 Muestra tomada por", key="t_meg")
     obs = st.text_area("📝 Observaciones", key="obs_meg")
     if st.button("📊 Analizar MEG"):
-        resultados = {
-            "pH": f"{ph} - {'✅' if 6.5 <= ph <= 8 else '❌'}",
-            "Concentración (%wt)": f"{conc} - {'✅' if 60 <= conc <= 84 else '❌'}",
-            "Cloruros (ppm)": f"{cl} - {'✅' if cl <= 50 else '❌'}"
-        }
-        st.dataframe(pd.DataFrame(resultados.items(), columns=["Parámetro", "Resultado"]))
-        exportar_pdf(f"MEG_{operador}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                     operador, "Control del inhibidor de formación de hidratos.", resultados, obs, muestreo_en, muestra_por)
+        analizar_modulo("MEG", {
+            "pH": ph,
+            "Concentración (%wt)": conc,
+            "Cloruros (ppm)": cl
+        }, "Control del inhibidor de formación de hidratos.", "MEG", operador, muestreo_en, muestra_por, obs)
+    mostrar_analisis("MEG")
 
 # TEG
 with tabs[3]:
@@ -168,51 +169,127 @@ with tabs[3]:
     muestra_por = st.text_input("🧑‍🔬 Muestra tomada por", key="t_teg")
     obs = st.text_area("📝 Observaciones", key="obs_teg")
     if st.button("📊 Analizar TEG"):
-        resultados = {
-            "pH": f"{ph} - {'✅' if 6.5 <= ph <= 8.5 else '❌'}",
-            "Concentración (%wt)": f"{conc} - {'✅' if conc >= 99 else '❌'}",
-            "Cloruros (ppm)": f"{cl} - {'✅' if cl <= 50 else '❌'}"
-        }
-        st.dataframe(pd.DataFrame(resultados.items(), columns=["Parámetro", "Resultado"]))
-        exportar_pdf(f"TEG_{operador}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                     operador, "Análisis del glicol para deshidratación.", resultados, obs, muestreo_en, muestra_por)
+        analizar_modulo("TEG", {
+            "pH": ph,
+            "Concentración (%wt)": conc,
+            "Cloruros (ppm)": cl
+        }, "Análisis del glicol para deshidratación.", "TEG", operador, muestreo_en, muestra_por, obs)
+    mostrar_analisis("TEG")
+    with st.expander("🧮 Punto de rocío del gas deshidratado"):
+        t_contactor = st.number_input("Temperatura del contactor (°C)", 10.0, 60.0, 38.0, step=0.5, key="t_contactor_teg")
+        conc_calc = st.number_input("Concentración de TEG pobre (%wt)", 90.0, 99.99, max(min(conc, 99.99), 90.0) if conc else 99.0,
+                                    step=0.01, key="conc_calc_teg")
+        aproximacion = st.number_input("Aproximación al equilibrio (°C)", 0.0, 15.0, 8.0, step=0.5, key="aprox_teg")
+        c1, c2 = st.columns(2)
+        c1.metric("Punto de rocío de equilibrio", f"{punto_rocio_teg(t_contactor, conc_calc):.1f} °C")
+        c2.metric("Depresión del punto de rocío", f"{depresion_punto_rocio(t_contactor, conc_calc, aproximacion):.1f} °C")
+        if st.toggle("Barrido temperatura × concentración", key="barrido_teg"):
+            mapa_barrido("Depresión del punto de rocío (°C)", {
+                "temperatura_contactor": ("Temperatura del contactor (°C)", 10.0, 60.0),
+                "concentracion": ("Concentración de TEG (%wt)", 95.0, 99.99),
+            }, {"aproximacion": aproximacion}, "teg")
 
 # AGUA DESMINERALIZADA
 with tabs[4]:
     st.subheader("💧 Análisis de Agua Desmineralizada")
-    cl = st.number_input("Cloruros (ppm)", 0.0, step=0.1)
+    cl = st.number_input("Cloruros (ppm)", 0.0, step=0.1, key="cl_agua")
     operador = st.text_input("👤 Operador", key="op_agua")
     muestreo_en = st.text_input("📍 Muestreo en", key="m_agua")
     muestra_por = st.text_input("🧑‍🔬 Muestra tomada por", key="t_agua")
     obs = st.text_area("📝 Observaciones", key="obs_agua")
     if st.button("📊 Analizar Agua"):
-        resultados = {
-            "Cloruros (ppm)": f"{cl} - {'✅' if cl <= 10 else '❌'}"
-        }
-        st.dataframe(pd.DataFrame(resultados.items(), columns=["Parámetro", "Resultado"]))
-        exportar_pdf(f"Agua_{operador}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                     operador, "Control de cloruros en agua desmineralizada.", resultados, obs, muestreo_en, muestra_por)
+        analizar_modulo("Agua Desmineralizada", {
+            "Cloruros (ppm)": cl
+        }, "Control de cloruros en agua desmineralizada.", "Agua", operador, muestreo_en, muestra_por, obs)
+    mostrar_analisis("Agua Desmineralizada")
 
 # AMINAS
 with tabs[5]:
     st.subheader("☠️ Análisis de Aminas")
-    conc = st.number_input("Concentración (%wt)", 0.0, 100.0, step=0.1)
-    cl_amina = st.number_input("Cloruros en amina (ppm)", 0.0, step=1.0)
-    cl_caldera = st.number_input("Cloruros en caldera (ppm)", 0.0, step=0.1)
-    carga_pobre = st.number_input("Carga ácida amina pobre (mol/mol)", 0.0, step=0.001)
-    carga_rica = st.number_input("Carga ácida amina rica (mol/mol)", 0.0, step=0.01)
+    conc = st.number_input("Concentración (%wt)", 0.0, 100.0, step=0.1, key="conc_aminas")
+    cl_amina = st.number_input("Cloruros en amina (ppm)", 0.0, step=1.0, key="cl_amina_aminas")
+    cl_caldera = st.number_input("Cloruros en caldera (ppm)", 0.0, step=0.1, key="cl_caldera_aminas")
+    carga_pobre = st.number_input("Carga ácida amina pobre (mol/mol)", 0.0, step=0.001, key="pobre_aminas")
+    carga_rica = st.number_input("Carga ácida amina rica (mol/mol)", 0.0, step=0.01, key="rica_aminas")
     operador = st.text_input("👤 Operador", key="op_aminas")
     muestreo_en = st.text_input("📍 Muestreo en", key="m_aminas")
     muestra_por = st.text_input("🧑‍🔬 Muestra tomada por", key="t_aminas")
     obs = st.text_area("📝 Observaciones", key="obs_aminas")
     if st.button("📊 Analizar Aminas"):
-        resultados = {
-            "Concentración (%wt)": f"{conc} - {'✅' if 48 <= conc <= 52 else '❌'}",
-            "Cloruros en amina": f"{cl_amina} - {'✅' if cl_amina <= 1000 else '❌'}",
-            "Cloruros en caldera": f"{cl_caldera} - {'✅' if cl_caldera <= 10 else '❌'}",
-            "Carga ácida pobre": f"{carga_pobre} - {'✅' if carga_pobre <= 0.025 else '❌'}",
-            "Carga ácida rica": f"{carga_rica} - {'✅' if carga_rica <= 0.45 else '❌'}"
-        }
-        st.dataframe(pd.DataFrame(resultados.items(), columns=["Parámetro", "Resultado"]))
-        exportar_pdf(f"Aminas_{operador}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                     operador, "Evaluación de solvente amínico y cargas ácidas.", resultados, obs, muestreo_en, muestra_por)
+        analizar_modulo("Aminas", {
+            "Concentración (%wt)": conc,
+            "Cloruros en amina": cl_amina,
+            "Cloruros en caldera": cl_caldera,
+            "Carga ácida pobre": carga_pobre,
+            "Carga ácida rica": carga_rica
+        }, "Evaluación de solvente amínico y cargas ácidas.", "Aminas", operador, muestreo_en, muestra_por, obs)
+    mostrar_analisis("Aminas")
+    with st.expander("🧮 Circulación de amina y captación de gas ácido"):
+        amina = st.selectbox("Amina", list(PM_AMINAS), key="tipo_aminas")
+        caudal = st.number_input("Caudal de gas (Sm3/d)", 0.0, value=1_000_000.0, step=10_000.0, key="caudal_aminas")
+        acido = st.number_input("Gas ácido a remover (H₂S + CO₂, %mol)", 0.0, 100.0, 3.0, step=0.1, key="acido_aminas")
+        densidad = st.number_input("Densidad de la solución (kg/m3)", 900.0, 1200.0, 1040.0, step=5.0, key="densidad_aminas")
+        pobre_calc = carga_pobre or 0.01
+        rica_calc = carga_rica or 0.45
+        conc_calc = conc or 50.0
+        if rica_calc <= pobre_calc:
+            st.warning("⚠️ La carga rica debe ser mayor que la pobre para calcular la circulación.")
+        else:
+            c1, c2 = st.columns(2)
+            circulacion = circulacion_amina(caudal, acido, pobre_calc, rica_calc, conc_calc, amina, densidad)
+            c1.metric("Circulación de solución", f"{circulacion:,.1f} m3/h")
+            c2.metric("Captación de gas ácido", f"{captacion_gas_acido(pobre_calc, rica_calc, conc_calc, amina, densidad):.1f} Sm3/m3")
+            st.caption(f"Con carga pobre {pobre_calc:g}, carga rica {rica_calc:g} mol/mol y {conc_calc:g} %wt "
+                       "(valores del análisis o, si están en cero, valores típicos).")
+        if st.toggle("Barrido carga rica × concentración", key="barrido_aminas"):
+            mapa_barrido("Circulación de amina (m3/h)", {
+                "carga_rica": ("Carga ácida rica (mol/mol)", 0.1, 0.7),
+                "concentracion": ("Concentración de amina (%wt)", 20.0, 60.0),
+            }, {"caudal_gas": caudal, "gas_acido": acido, "carga_pobre": pobre_calc, "amina": amina,
+                "densidad": densidad}, "aminas")
+
+# HISTORIAL
+with tabs[6]:
+    st.subheader("🗄️ Historial de muestras")
+    historial = obtener_historial()
+    modulo_h = st.selectbox("Módulo", MODULOS, key="modulo_historial")
+    punto_h = st.selectbox("Punto de muestreo", ["(todos)"] + historial.puntos(modulo_h), key="punto_historial")
+    desde, hasta = inicio_trimestre_anterior()
+    rango = st.date_input("Período", (desde.date(), hasta.date()), key="rango_historial")
+    solo_fuera = st.checkbox("Solo muestras que NO CUMPLEN", key="fuera_historial")
+    if len(rango) == 2:
+        with etapa('consulta historial'):
+            muestras = historial.consultar(
+                modulo_h, None if punto_h == "(todos)" else punto_h,
+                desde=rango[0], hasta=pd.Timestamp(rango[1]) + pd.Timedelta(days=1),
+                solo_fuera_de_spec=solo_fuera)
+        st.caption(f"{len(muestras)} muestras")
+        st.dataframe(muestras)
+
+# TENDENCIAS
+with tabs[7]:
+    st.subheader("📈 Tendencias y cartas de control")
+    historial = obtener_historial()
+    modulo_t = st.selectbox("Módulo", MODULOS, key="modulo_tendencia")
+    disponibles = historial.parametros(modulo_t)
+    preferidos = [p for p in PARAMETROS_TENDENCIA.get(modulo_t, []) if p in disponibles]
+    if not disponibles:
+        st.info("Todavía no hay muestras de este módulo en el historial.")
+    else:
+        parametro_t = st.selectbox("Parámetro", preferidos + [p for p in disponibles if p not in preferidos],
+                                   key="parametro_tendencia")
+        punto_t = st.selectbox("Punto de muestreo", ["(todos)"] + historial.puntos(modulo_t), key="punto_tendencia")
+        ventana = st.slider("Ventana móvil (muestras)", 5, 200, 30, key="ventana_tendencia")
+        with etapa('tendencias'):
+            tendencia = obtener_tendencia(historial, modulo_t, parametro_t,
+                                          None if punto_t == "(todos)" else punto_t, ventana)
+        columnas = st.columns(5)
+        for columna, (nombre, valor) in zip(columnas, tendencia.resumen().items()):
+            columna.metric(nombre, f"{valor:.4g}" if isinstance(valor, float) else valor)
+        st.line_chart(tendencia.grafico())
+
+# --------------------------- CACHÉ --------------------------- #
+with st.sidebar.expander("Caché"):
+    st.dataframe(pd.DataFrame(estadisticas_caches()))
+if depurar:
+    panel_depuracion(st, instrumentacion)
@@ -0,0 +1,229 @@
+"""Benchmarks reproducibles de análisis de composición, validación y generación de PDF.
+
+    python benchmarks/bench_lts.py -o bench.json
+    python benchmarks/bench_lts.py --rapido -o nuevo.json --comparar bench.json
+
+Cada caso corre en un proceso nuevo (spawn) para que el pico de RSS sea el del caso. El índice de
+certificados y el historial apuntan a una carpeta temporal, así los PDF sintéticos nunca llegan
+al índice real, y dentro de cada caso los certificados no se registran (no se mide SQLite). Los
+resultados se guardan en JSON; con --comparar se marcan las regresiones de p50 por encima de
+--tolerancia y el proceso sale con código 1.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+SEMILLA = 20250509
+# Escala típica de cada componente en % molar (mismo orden que lts.gas.COMPONENTES)
+ESCALA = [80, 8, 4, 1, 1, .5, .5, .5, 2, 2, .0001, .1]
+TAMANOS = [1, 10, 100, 1_000, 10_000, 100_000, 1_000_000]
+TAMANOS_RAPIDO = [1, 100, 10_000]
+TAMANOS_PDF = [10, 100, 1_000]
+TAMANOS_PDF_RAPIDO = [10, 100]
+CAMPOS_TEXTO = 100_000
+SORTEOS_MC = 10_000
+TAMANOS_MC = [1, 100, 1_000]
+TAMANOS_MC_RAPIDO = [1, 100]
+# Campos de texto típicos de los informes, con caracteres fuera de latin-1
+TEXTOS = [
+    "Evaluación de H₂S y CO₂ — 1.5 ppm ✅", "Punto de rocío ≤ -5 °C → ❌", "Muestra “LTS-01” • Planta",
+    "Sales (mg/l)", "Concentración 10⁵ ppm", "Operador: José Núñez",
+]
+
+
+def composiciones(n):
+    import numpy as np
+    import pandas as pd
+
+    from lts.gas import COMPONENTES
+
+    rng = np.random.default_rng(SEMILLA)
+    return pd.DataFrame(rng.random((n, len(COMPONENTES))) * ESCALA, columns=COMPONENTES)
+
+
+def _preparar(caso, n):
+    from lts.gas import analizar_composicion, analizar_lote
+
+    if caso == 'analizar_composicion':
+        filas = composiciones(max(n, 1)).to_dict('records')
+        estado = {'i': 0}
+
+        def correr():
+            analizar_composicion(filas[estado['i'] % len(filas)])
+            estado['i'] += 1
+        return correr
+    if caso == 'analizar_lote':
+        df = composiciones(n)
+        return lambda: analizar_lote(df)
+    if caso == 'validacion':
+        from lts.especificaciones import TABLA
+        from lts.gas import PRODUCTO
+
+        lote = analizar_lote(composiciones(n))
+        compiladas = TABLA.compilar(PRODUCTO)
+        return lambda: compiladas.veredicto(lote)
+    if caso == 'informe_muestra':
+        from lts.informes import informe_muestra
+
+        resultados = analizar_composicion(composiciones(1).iloc[0].to_dict())
+        return lambda: informe_muestra("Informe de Calidad - Gas Natural", "Muestra", resultados)
+    if caso == 'informe_laboratorio':
+        from lts.informes import informe_laboratorio
+
+        resultados = {"H₂S (ppm)": "1.0 - ✅", "CO₂ (%)": "1.5 - ❌"}
+        return lambda: informe_laboratorio("Operador", "Evaluación de H₂S y CO₂.", resultados,
+                                           "Sin observaciones.", "Planta LTS", "Laboratorio")
+    if caso == 'limpiar_texto':
+        from lts.informes import limpiar_pdf_texto
+
+        campos = (TEXTOS * (n // len(TEXTOS) + 1))[:n]
+        return lambda: [limpiar_pdf_texto(t) for t in campos]
+    if caso == 'incertidumbre':
+        from lts.incertidumbre import incertidumbre_lote
+
+        df = composiciones(n)
+        return lambda: incertidumbre_lote(df, SORTEOS_MC, semilla=SEMILLA)
+    if caso in ('informe_lote', 'informe_lote_detalle'):
+        from lts.informes import generar_informe_lote
+
+        lote = analizar_lote(composiciones(n))
+        return lambda: generar_informe_lote(lote, detalle=caso == 'informe_lote_detalle')
+    raise ValueError(f"Caso desconocido: {caso}")
+
+
+def correr_caso(caso, n, repeticiones, presupuesto):
+    """Corre el caso hasta `repeticiones` veces o `presupuesto` segundos; devuelve sus métricas."""
+    import numpy as np
+
+    from lts.informes import certificados_diferidos
+
+    correr = _preparar(caso, n)
+    tiempos = []
+    with certificados_diferidos() as certificados:
+        correr()  # calentamiento
+        limite = time.perf_counter() + presupuesto
+        while len(tiempos) < repeticiones and (len(tiempos) < 3 or time.perf_counter() < limite):
+            certificados.clear()
+            inicio = time.perf_counter()
+            correr()
+            tiempos.append(time.perf_counter() - inicio)
+    tiempos = np.array(tiempos)
+    return {
+        'caso': caso,
+        'n': n,
+        'repeticiones': len(tiempos),
+        'p50_s': float(np.percentile(tiempos, 50)),
+        'p99_s': float(np.percentile(tiempos, 99)),
+        'media_s': float(tiempos.mean()),
+        'muestras_por_s': float(n / tiempos.mean()) if n else None,
+        'pico_rss_mb': _pico_rss_mb(),
+    }
+
+
+def _pico_rss_mb():
+    """Pico de RSS del proceso en MB; None donde no hay getrusage (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def casos(rapido):
+    tamanos = TAMANOS_RAPIDO if rapido else TAMANOS
+    tamanos_pdf = TAMANOS_PDF_RAPIDO if rapido else TAMANOS_PDF
+    yield 'analizar_composicion', 1, 1000
+    for n in tamanos:
+        yield 'analizar_lote', n, 200 if n <= 10_000 else 5
+        yield 'validacion', n, 200 if n <= 10_000 else 5
+    yield 'informe_muestra', 1, 100
+    yield 'informe_laboratorio', 1, 100
+    yield 'limpiar_texto', CAMPOS_TEXTO, 20
+    for n in (TAMANOS_MC_RAPIDO if rapido else TAMANOS_MC):
+        yield 'incertidumbre', n, 20 if n <= 100 else 3
+    for n in tamanos_pdf:
+        yield 'informe_lote', n, 20 if n <= 100 else 3
+    yield 'informe_lote_detalle', tamanos_pdf[1], 3
+
+
+def metadatos():
+    import numpy
+    import pandas
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parent).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'numpy': numpy.__version__,
+        'pandas': pandas.__version__,
+        'semilla': SEMILLA,
+    }
+
+
+def comparar(actual, base, tolerancia):
+    previos = {(r['caso'], r['n']): r for r in base['resultados']}
+    regresiones = 0
+    for r in actual['resultados']:
+        previo = previos.get((r['caso'], r['n']))
+        if previo is None:
+            continue
+        razon = r['p50_s'] / previo['p50_s']
+        marca = 'REGRESIÓN' if razon > 1 + tolerancia else ''
+        regresiones += bool(marca)
+        print(f"{r['caso']:<22} n={r['n']:<9} p50 {previo['p50_s']*1e3:10.3f} -> {r['p50_s']*1e3:10.3f} ms "
+              f"(x{razon:.2f}) {marca}")
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-o', '--salida', default='bench.json')
+    parser.add_argument('--rapido', action='store_true', help="Tamaños reducidos (hasta 10k filas)")
+    parser.add_argument('--presupuesto', type=float, default=5.0, help="Segundos máximos por caso")
+    parser.add_argument('--comparar', help="JSON de una corrida anterior para detectar regresiones")
+    parser.add_argument('--tolerancia', type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    resultados = []
+    contexto = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory(prefix='bench_lts_') as temporal:
+        # Los procesos spawn heredan el entorno y leen estas rutas al importar lts
+        os.environ['LTS_CERTIFICADOS'] = str(Path(temporal) / 'certificados.db')
+        os.environ['LTS_HISTORIAL'] = str(Path(temporal) / 'historial.db')
+        for caso, n, repeticiones in casos(args.rapido):
+            with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as ejecutor:
+                r = ejecutor.submit(correr_caso, caso, n, repeticiones, args.presupuesto).result()
+            resultados.append(r)
+            print(f"{caso:<22} n={n:<9} p50 {r['p50_s']*1e3:10.3f} ms  p99 {r['p99_s']*1e3:10.3f} ms  "
+                  f"{r['muestras_por_s'] or 0:14.0f} muestras/s  RSS {r['pico_rss_mb'] or float('nan'):7.1f} MB")
+
+    informe = {'metadatos': metadatos(), 'resultados': resultados}
+    Path(args.salida).write_text(json.dumps(informe, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f"Resultados en {args.salida}")
+
+    if args.comparar:
+        base = json.loads(Path(args.comparar).read_text(encoding='utf-8'))
+        if comparar(informe, base, args.tolerancia):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
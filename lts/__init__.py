@@ -0,0 +1,2 @@
+# Núcleo de cálculo del Sistema de Análisis de Calidad - Planta LTS.
+# Importable sin Streamlit: las apps (app_final.py, app_simple.py, ...) lo usan como librería.
@@ -0,0 +1,5 @@
+import sys
+
+from lts.cli import main
+
+sys.exit(main())
@@ -0,0 +1,120 @@
+"""Calculadoras de ingeniería para las unidades de aminas y de deshidratación con TEG.
+
+Todas las funciones aceptan escalares o arrays de NumPy (con broadcasting): la misma función
+evalúa un punto de operación o un barrido de 10^5-10^6 puntos.
+"""
+import numpy as np
+
+from lts.recursos import MEMORIA_CACHE_MB, CacheLRU
+
+VOLUMEN_MOLAR_STD = 23.645  # Sm3/kmol a 15 °C y 101.325 kPa
+PM_AMINAS = {'MDEA': 119.16, 'DEA': 105.14, 'MEA': 61.08}  # kg/kmol
+PM_TEG = 150.17
+PM_AGUA = 18.015
+# Coeficiente de actividad del agua en TEG concentrado (aprox. constante entre 25 y 50 °C)
+GAMMA_AGUA_TEG = 0.6
+ANTOINE_AGUA = (8.07131, 1730.63, 233.426)  # log10(P [mmHg]) = A - B / (C + T [°C])
+
+
+# --------------------------- AMINAS --------------------------- #
+def _delta_carga(carga_pobre, carga_rica):
+    # Carga neta por mol de amina; sin sentido físico (NaN) si la rica no supera a la pobre
+    delta = np.asarray(carga_rica, dtype=float) - carga_pobre
+    return np.where(delta > 0, delta, np.nan)
+
+
+def circulacion_amina(caudal_gas, gas_acido, carga_pobre, carga_rica, concentracion, amina='MDEA',
+                      densidad=1040.0):
+    """Circulación de solución (m3/h) para captar el gas ácido del caudal de gas.
+
+    caudal_gas en Sm3/d, gas_acido en % molar a remover (H2S + CO2), cargas en mol/mol,
+    concentración en %wt de amina y densidad de la solución en kg/m3. NaN donde la carga rica no
+    supera a la pobre (la amina no capta nada).
+    """
+    acido = caudal_gas * gas_acido / 100 / VOLUMEN_MOLAR_STD  # kmol/d
+    amina_kmol = acido / _delta_carga(carga_pobre, carga_rica)
+    solucion_kg = amina_kmol * PM_AMINAS[amina] / (concentracion / 100)
+    return solucion_kg / densidad / 24
+
+
+def captacion_gas_acido(carga_pobre, carga_rica, concentracion, amina='MDEA', densidad=1040.0):
+    """Gas ácido captado por m3 de solución circulada (Sm3/m3); NaN si la carga rica no supera a la pobre."""
+    molaridad = densidad * concentracion / 100 / PM_AMINAS[amina]  # kmol de amina por m3
+    return _delta_carga(carga_pobre, carga_rica) * molaridad * VOLUMEN_MOLAR_STD
+
+
+# --------------------------- TEG --------------------------- #
+def presion_vapor_agua(temperatura):
+    a, b, c = ANTOINE_AGUA
+    return 10 ** (a - b / (c + temperatura))
+
+
+def punto_rocio_teg(temperatura_contactor, concentracion, gamma=GAMMA_AGUA_TEG):
+    """Punto de rocío de agua (°C) del gas en equilibrio con TEG de `concentracion` %wt.
+
+    Presión parcial de agua = x_agua · γ · Psat(T contactor); el punto de rocío es la
+    temperatura a la que Psat iguala esa presión (agua líquida subenfriada bajo 0 °C).
+    """
+    teg = concentracion / 100
+    moles_agua = (1 - teg) / PM_AGUA
+    x_agua = moles_agua / (moles_agua + teg / PM_TEG)
+    presion = x_agua * gamma * presion_vapor_agua(temperatura_contactor)
+    a, b, c = ANTOINE_AGUA
+    with np.errstate(divide='ignore'):
+        return b / (a - np.log10(presion)) - c
+
+
+def depresion_punto_rocio(temperatura_contactor, concentracion, aproximacion=0.0, gamma=GAMMA_AGUA_TEG):
+    """Descenso del punto de rocío (°C) respecto de la temperatura del contactor.
+
+    `aproximacion` es lo que el punto de rocío real queda por encima del de equilibrio
+    (típicamente 6-11 °C).
+    """
+    return temperatura_contactor - (punto_rocio_teg(temperatura_contactor, concentracion, gamma) + aproximacion)
+
+
+# --------------------------- BARRIDOS --------------------------- #
+CALCULOS = {
+    'Circulación de amina (m3/h)': circulacion_amina,
+    'Captación de gas ácido (Sm3/m3)': captacion_gas_acido,
+    'Punto de rocío TEG (°C)': punto_rocio_teg,
+    'Depresión del punto de rocío (°C)': depresion_punto_rocio,
+}
+BARRIDOS = CacheLRU('barridos', max_entradas=32, max_mb=MEMORIA_CACHE_MB * 0.1)
+
+
+def barrido(calculo, ejes, fijos=None):
+    """Evalúa CALCULOS[calculo] en la grilla de `ejes` ({parámetro: (mínimo, máximo, puntos)}).
+
+    Los ejes se pasan como grillas abiertas (np.ix_), así que la única matriz completa es el
+    resultado. Devuelve (valores de cada eje, resultado con forma puntos_eje1 x puntos_eje2 ...).
+    """
+    nombres = list(ejes)
+    valores = [np.linspace(*ejes[n]) for n in nombres]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        resultado = CALCULOS[calculo](**dict(fijos or {}), **dict(zip(nombres, np.ix_(*valores))))
+    return valores, np.broadcast_to(resultado, tuple(len(v) for v in valores))
+
+
+def barrido_cacheado(calculo, ejes, fijos=None):
+    """barrido() memoizado por definición de grilla (cálculo, ejes y parámetros fijos)."""
+    clave = (calculo, tuple((n, tuple(e)) for n, e in ejes.items()), tuple(sorted((fijos or {}).items())))
+    return BARRIDOS.obtener(clave, lambda: barrido(calculo, ejes, fijos))
+
+
+# Escala tipo viridis para dibujar mapas de calor sin matplotlib
+_ESCALA = np.array([[68, 1, 84], [59, 82, 139], [33, 145, 140], [94, 201, 98], [253, 231, 37]], dtype=float)
+
+
+def mapa_de_calor(z, vmin=None, vmax=None):
+    """Matriz (eje x, eje y) -> imagen RGB uint8 con el eje y hacia arriba; NaN en gris."""
+    z = np.asarray(z, dtype=float).T[::-1]
+    vmin = np.nanmin(z) if vmin is None else vmin
+    vmax = np.nanmax(z) if vmax is None else vmax
+    t = np.clip((z - vmin) / ((vmax - vmin) or 1.0), 0, 1) * (len(_ESCALA) - 1)
+    t = np.nan_to_num(t, nan=0.0)
+    i = np.minimum(t.astype(int), len(_ESCALA) - 2)
+    f = (t - i)[..., None]
+    imagen = _ESCALA[i] * (1 - f) + _ESCALA[i + 1] * f
+    imagen[np.isnan(z)] = 128
+    return imagen.astype(np.uint8)
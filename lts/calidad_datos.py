@@ -0,0 +1,177 @@
+"""Control de calidad de las composiciones antes del análisis.
+
+Cada bloque de filas se revisa en forma vectorizada:
+
+- componentes faltantes (NaN) o negativos,
+- total fuera de 100 % ± `tolerancia` (un total nulo no se puede normalizar),
+- componentes fuera de su rango físico (RANGOS, % molar),
+- atípicos frente a la historia reciente: z robusto por componente (mediana e IQR de las últimas
+  `ventana` filas válidas) y distancia de Mahalanobis de la composición normalizada frente a esa
+  misma ventana.
+
+Solo las tres primeras revisiones descartan filas: un atípico puede ser una excursión real de
+especificación, así que se sigue analizando y sale marcado en las columnas 'Atípico' y 'Motivo
+atípico'. La ventana pasa de un bloque al siguiente, así un histórico se revisa en una sola pasada
+junto con la lectura por bloques; un archivo suelto se compara con las últimas composiciones
+guardadas en el Historial (historia_reciente). Las filas rechazadas salen con su motivo en un
+informe aparte.
+"""
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from lts.gas import COMPONENTES, matriz_composicion
+from lts.incertidumbre import SIGMA_REPETIBILIDAD
+from lts.instrumentacion import etapa
+
+TOLERANCIA_TOTAL = 2.0  # % sobre 100
+RANGOS = {  # (mínimo, máximo) físicamente razonables en % molar para gas de planta
+    'CH4': (50.0, 100.0), 'C2H6': (0.0, 20.0), 'C3H8': (0.0, 12.0),
+    'i-C4H10': (0.0, 5.0), 'n-C4H10': (0.0, 5.0), 'i-C5H12': (0.0, 3.0), 'n-C5H12': (0.0, 3.0),
+    'C6+': (0.0, 2.0), 'N2': (0.0, 20.0), 'CO2': (0.0, 20.0), 'H2S': (0.0, 1.0), 'O2': (0.0, 1.0)
+}
+VENTANA = 500
+PASO = 50  # filas que comparten la misma ventana de referencia
+MINIMO_HISTORIA = 30
+Z_MAXIMO = 6.0
+Z_CHI2 = 3.09  # cuantil normal de 0.999 para el umbral chi² de Mahalanobis
+# Piso del desvío: una diferencia menor que la repetibilidad del GC no es un atípico
+_PISO = np.array([SIGMA_REPETIBILIDAD[k] for k in COMPONENTES])
+_MIN = np.array([RANGOS[k][0] for k in COMPONENTES])
+_MAX = np.array([RANGOS[k][1] for k in COMPONENTES])
+COLUMNAS_ATIPICO = ['Atípico', 'Motivo atípico']
+
+
+def umbral_chi2(grados, z=Z_CHI2):
+    """Cuantil de chi² por la aproximación de Wilson-Hilferty (sin scipy)."""
+    a = 2.0 / (9.0 * grados)
+    return grados * (1.0 - a + z * np.sqrt(a)) ** 3
+
+
+class ControlCalidad:
+    """Revisa bloques de composiciones; conserva la ventana de filas válidas entre bloques."""
+
+    def __init__(self, historia=None, ventana=VENTANA, tolerancia=TOLERANCIA_TOTAL, z_maximo=Z_MAXIMO,
+                 paso=PASO, minimo_historia=MINIMO_HISTORIA):
+        self.ventana = ventana
+        self.tolerancia = tolerancia
+        self.z_maximo = z_maximo
+        self.paso = paso
+        self.minimo_historia = minimo_historia
+        self.umbral_d2 = umbral_chi2(len(COMPONENTES))
+        self.historia = np.empty((0, len(COMPONENTES)))
+        self.revisadas = 0
+        self.rechazadas = 0
+        self.atipicas = 0
+        self.motivos = Counter()
+        if historia is not None and len(historia):
+            self.historia = self._normalizadas(matriz_composicion(historia))[-ventana:]
+
+    @staticmethod
+    def _normalizadas(x):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return x / x.sum(axis=1, keepdims=True) * 100.0
+
+    def _atipicos(self, validas):
+        """z robusto máximo, su componente y d² de Mahalanobis de cada fila válida.
+
+        Cada tramo de `paso` filas se compara con las `ventana` filas válidas anteriores.
+        """
+        referencia = np.concatenate([self.historia, validas])
+        inicio = len(self.historia)
+        z = np.full(len(validas), np.nan)
+        componente = np.zeros(len(validas), dtype=int)
+        d2 = np.full(len(validas), np.nan)
+        for desde in range(0, len(validas), self.paso):
+            fin = inicio + desde
+            ventana = referencia[max(0, fin - self.ventana):fin]
+            if len(ventana) < self.minimo_historia:
+                continue
+            tramo = validas[desde:desde + self.paso]
+            q1, mediana, q3 = np.percentile(ventana, [25, 50, 75], axis=0)
+            sigma = np.maximum((q3 - q1) / 1.349, _PISO)
+            desvio = np.abs(tramo - mediana) / sigma
+            z[desde:desde + len(tramo)] = desvio.max(axis=1)
+            componente[desde:desde + len(tramo)] = desvio.argmax(axis=1)
+            # Covarianza de la ventana recortada a mediana ± 3σ (resistente a atípicos previos)
+            recortada = np.clip(ventana, mediana - 3 * sigma, mediana + 3 * sigma)
+            covarianza = np.cov(recortada, rowvar=False) + np.diag(_PISO ** 2)
+            centrado = tramo - mediana
+            d2[desde:desde + len(tramo)] = np.einsum(
+                'ij,ij->i', centrado, np.linalg.solve(covarianza, centrado.T).T)
+        return z, componente, d2
+
+    def revisar(self, bloque):
+        """Devuelve (filas limpias de `bloque` con las columnas COLUMNAS_ATIPICO, informe de rechazadas)."""
+        with etapa('control de datos'):
+            x = matriz_composicion(bloque)
+            total = np.nansum(x, axis=1)
+            faltante = np.isnan(x).any(axis=1)
+            negativo = (x < 0).any(axis=1)
+            total_nulo = ~(total > 0)
+            fuera_total = np.abs(total - 100.0) > self.tolerancia
+            fuera_rango = (x < _MIN) | (x > _MAX)
+            duras = faltante | negativo | total_nulo | fuera_total | fuera_rango.any(axis=1)
+
+            z = np.full(len(x), np.nan)
+            componente = np.zeros(len(x), dtype=int)
+            d2 = np.full(len(x), np.nan)
+            validas = self._normalizadas(x[~duras])
+            z[~duras], componente[~duras], d2[~duras] = self._atipicos(validas)
+            atipico_z = z > self.z_maximo
+            atipico_d2 = d2 > self.umbral_d2
+            self.historia = np.concatenate([self.historia, validas])[-self.ventana:]
+
+            filas = np.flatnonzero(duras)
+            self.revisadas += len(x)
+            self.rechazadas += len(filas)
+            motivos = []
+            for i in filas:
+                motivo = {}
+                if faltante[i]:
+                    motivo['faltantes'] = "faltan componentes"
+                if negativo[i]:
+                    motivo['negativos'] = "componentes negativos"
+                if total_nulo[i]:
+                    motivo['total'] = "total nulo"
+                elif fuera_total[i]:
+                    motivo['total'] = f"total {total[i]:.2f} %"
+                if fuera_rango[i].any():
+                    motivo['rango'] = "fuera de rango: " + ", ".join(
+                        COMPONENTES[j] for j in np.flatnonzero(fuera_rango[i]))
+                self.motivos.update(motivo.keys())
+                motivos.append("; ".join(motivo.values()))
+            rechazos = bloque.iloc[filas].assign(**{'Motivo': motivos, 'Total (%)': total[filas]})
+
+            # Los atípicos se conservan (marcados) para que una excursión real no salga del análisis
+            atipica = atipico_z | atipico_d2
+            marcadas = np.flatnonzero(atipica)
+            self.atipicas += len(marcadas)
+            self.motivos.update({k: n for k, n in (('z robusto', int(atipico_z.sum())),
+                                                   ('Mahalanobis', int(atipico_d2.sum()))) if n})
+            detalle = np.full(len(x), '', dtype=object)
+            for i in marcadas:
+                motivo = []
+                if atipico_z[i]:
+                    motivo.append(f"atípico en {COMPONENTES[componente[i]]} (z = {z[i]:.1f})")
+                if atipico_d2[i]:
+                    motivo.append(f"composición atípica (d² = {d2[i]:.1f})")
+                detalle[i] = "; ".join(motivo)
+            limpias = bloque[~duras].assign(**{'Atípico': atipica[~duras], 'Motivo atípico': detalle[~duras]})
+        return limpias, rechazos
+
+    def resumen(self):
+        """Filas revisadas, rechazadas y atípicas por motivo (una fila puede tener varios)."""
+        return pd.Series({'Revisadas': self.revisadas, 'Rechazadas': self.rechazadas, 'Atípicas': self.atipicas,
+                          **self.motivos}, name='Filas')
+
+
+def historia_reciente(historial, modulo, punto=None, ventana=VENTANA):
+    """Últimas `ventana` composiciones guardadas en el Historial para un módulo y punto (para `historia`)."""
+    return historial.ultimas(modulo, COMPONENTES, punto, ventana).fillna(0.0)
+
+
+def cribar(df, historia=None, **opciones):
+    """Revisa un DataFrame completo; devuelve (filas limpias con atípicos marcados, informe de rechazadas)."""
+    return ControlCalidad(historia, **opciones).revisar(df)
@@ -0,0 +1,161 @@
+"""Certificados verificables: cada muestra de un PDF lleva un QR con el hash de su contenido.
+
+El hash (blake2b de 16 bytes sobre la muestra, sus resultados, el contrato, las especificaciones
+validadas, el veredicto y la fecha de emisión, en forma canónica) se guarda al emitir el PDF en un
+índice SQLite (clave BLOB de 16 bytes, tabla WITHOUT ROWID): verificar un
+certificado es una sola búsqueda por clave, aun con millones emitidos.
+
+    python -m lts verificar 3f2a...c9       # o el texto leído del QR
+"""
+import functools
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+RUTA_CERTIFICADOS = os.environ.get("LTS_CERTIFICADOS", "certificados.db")
+# Si se define (p. ej. https://lab.petrogas/verificar), el QR es un enlace a la app con ?verificar=<código>
+URL_VERIFICACION = os.environ.get("LTS_URL_VERIFICACION", "")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS certificados (
+    codigo BLOB PRIMARY KEY,
+    fecha REAL NOT NULL,
+    muestra TEXT,
+    titulo TEXT,
+    cumple INTEGER,
+    datos TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+Certificado = namedtuple('Certificado', 'codigo fecha muestra titulo cumple datos')
+
+
+def _canonico(valor):
+    # 6 cifras significativas: el mismo resultado da el mismo hash aunque cambie el último bit del float
+    if isinstance(valor, (bool, np.bool_)):
+        return bool(valor)
+    if isinstance(valor, (int, float, np.number)):
+        return f"{float(valor):.6g}"
+    return str(valor)
+
+
+def _especificacion(regla):
+    return regla.texto() if hasattr(regla, 'texto') else str(regla)
+
+
+def certificado(muestra, resultados, titulo='', cumple=None, contrato=None):
+    """Certificado de una muestra emitido ahora.
+
+    El código cubre todo lo que el PDF afirma: muestra, título, resultados, contrato (por defecto el
+    de las reglas de 'Validación'), valor y texto de cada especificación, veredicto y fecha de
+    emisión. Dos informes distintos nunca comparten código, aunque coincidan los resultados.
+    """
+    fecha = time.time()
+    cumple = None if cumple is None else bool(cumple)
+    datos = {str(k): _canonico(v) for k, v in resultados.items() if k != 'Validación'}
+    validacion = resultados.get('Validación') or {}
+    if contrato is None:
+        contrato = next((r.contrato for _, r in validacion.values() if hasattr(r, 'contrato')), '')
+    especificaciones = {f"{p} ({_especificacion(r)})": _canonico(v) for p, (v, r) in validacion.items()}
+    contenido = json.dumps({'muestra': str(muestra), 'titulo': str(titulo), 'contrato': str(contrato),
+                            'resultados': datos, 'especificaciones': especificaciones, 'cumple': cumple,
+                            'fecha': repr(fecha)},
+                           sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    codigo = hashlib.blake2b(contenido.encode('utf-8'), digest_size=16).hexdigest()
+    if contrato:
+        datos['Contrato'] = str(contrato)
+    datos.update(especificaciones)
+    return Certificado(codigo, fecha, str(muestra), titulo, cumple, datos)
+
+
+def contenido_qr(codigo):
+    return f"{URL_VERIFICACION}?verificar={codigo}" if URL_VERIFICACION else f"LTS:{codigo}"
+
+
+def codigo_de(texto):
+    """Extrae el código de 32 hex de lo leído en un QR (enlace, 'LTS:...' o el código solo)."""
+    hallado = re.search(r'(?<![0-9a-f])[0-9a-f]{32}(?![0-9a-f])', str(texto).strip().lower())
+    return hallado.group(0) if hallado else None
+
+
+# --------------------------- QR --------------------------- #
+@functools.lru_cache(maxsize=4096)
+def imagen_qr(contenido):
+    """QR como imagen de fpdf ya codificada (gris de 1 bit, Flate), generada una vez por contenido.
+
+    Se devuelve el dict que fpdf arma al parsear una imagen, así cada PDF solo la registra
+    (ver PDFBase.certificar en lts.informes) sin volver a generar ni comprimir nada.
+    """
+    import qrcode
+
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, border=2)
+    qr.add_data(contenido)
+    qr.make(fit=True)
+    oscuro = np.array(qr.get_matrix(), dtype=bool)
+    filas = np.packbits(~oscuro, axis=1)  # 1 = blanco en DeviceGray
+    return {'w': oscuro.shape[1], 'h': oscuro.shape[0], 'cs': 'DeviceGray', 'bpc': 1,
+            'f': 'FlateDecode', 'data': zlib.compress(filas.tobytes())}
+
+
+# --------------------------- ÍNDICE --------------------------- #
+class IndiceCertificados:
+    """Índice en disco código -> registro de la muestra certificada."""
+
+    def __init__(self, ruta=RUTA_CERTIFICADOS):
+        self.ruta = ruta
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.executescript(ESQUEMA)
+        self._lock = threading.Lock()
+
+    def registrar(self, certificados):
+        """Graba en una transacción (registrar dos veces el mismo certificado no lo duplica)."""
+        filas = [(bytes.fromhex(c.codigo), c.fecha, c.muestra, c.titulo, None if c.cumple is None else int(c.cumple),
+                  json.dumps(c.datos, ensure_ascii=False, separators=(',', ':'))) for c in certificados]
+        if filas:
+            with self._lock, self._conexion:
+                self._conexion.executemany("INSERT OR IGNORE INTO certificados VALUES (?, ?, ?, ?, ?, ?)", filas)
+
+    def verificar(self, texto):
+        """Certificado registrado para un código (o texto de QR); None si no existe."""
+        codigo = codigo_de(texto)
+        if codigo is None:
+            return None
+        with self._lock:
+            fila = self._conexion.execute(
+                "SELECT fecha, muestra, titulo, cumple, datos FROM certificados WHERE codigo = ?",
+                (bytes.fromhex(codigo),)).fetchone()
+        if fila is None:
+            return None
+        fecha, muestra, titulo, cumple, datos = fila
+        return Certificado(codigo, fecha, muestra, titulo, None if cumple is None else bool(cumple), json.loads(datos))
+
+    def __len__(self):
+        with self._lock:
+            return self._conexion.execute("SELECT count(*) FROM certificados").fetchone()[0]
+
+
+_INDICES = {}
+_LOCK = threading.Lock()
+
+
+def obtener_indice(ruta=RUTA_CERTIFICADOS):
+    """Un índice (y una conexión) por archivo y por proceso.
+
+    La clave lleva el pid: un proceso hijo creado con fork nunca reutiliza la conexión SQLite
+    heredada del padre, que no se puede usar a través de un fork.
+    """
+    clave = (ruta, os.getpid())
+    with _LOCK:
+        if clave not in _INDICES:
+            _INDICES[clave] = IndiceCertificados(ruta)
+        return _INDICES[clave]
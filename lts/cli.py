@@ -0,0 +1,170 @@
+"""Entrada por línea de comandos: procesa análisis sin Streamlit.
+
+    python -m lts procesar carpeta_csv/ -o salida/ --pdf --workers 4
+    python -m lts escuchar --carpeta analizadores/ --puerto 5020
+    python -m lts verificar 3f2a...c9          (o '-' para leer códigos de stdin)
+
+Los módulos pesados (pandas, numpy, fpdf) se importan dentro de cada comando para que el
+arranque (p. ej. --help) no los cargue.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+
+def _procesar_archivo(ruta, salida, valor_dolar, contrato, pdf, perfil=None, historia=None):
+    from lts.calidad_datos import COLUMNAS_ATIPICO, cribar
+    from lts.gas import analizar_lote
+    from lts.importacion import leer_tabla
+
+    limpias, rechazos = cribar(leer_tabla(ruta, perfil), historia)
+    lote = analizar_lote(limpias, valor_dolar, contrato).join(limpias[COLUMNAS_ATIPICO])
+    base = Path(salida) / Path(ruta).stem
+    lote.to_csv(f"{base}_resultados.csv", index_label='Muestra')
+    if len(rechazos):
+        rechazos.to_csv(f"{base}_rechazos.csv", index_label='Muestra')
+    if pdf:
+        from lts.informes import generar_informe_lote
+
+        Path(f"{base}_informe.pdf").write_bytes(generar_informe_lote(
+            lote, f"Informe de Calidad - Gas Natural ({Path(ruta).name})", contrato=contrato))
+    return Path(ruta).name, len(lote), int((~lote['Cumple']).sum()), len(rechazos), int(lote['Atípico'].sum())
+
+
+def _historia(punto):
+    """Últimas composiciones guardadas del punto, para buscar atípicos; None si no hay historial."""
+    from lts.calidad_datos import historia_reciente
+    from lts.historial import RUTA_HISTORIAL, obtener_historial
+
+    if not os.path.exists(RUTA_HISTORIAL):
+        return None
+    return historia_reciente(obtener_historial(), "Gas Natural", punto)
+
+
+def comando_procesar(args):
+    archivos = sorted(r for r in Path(args.directorio).glob(args.patron)
+                      if not r.stem.endswith(('_resultados', '_rechazos')))
+    if not archivos:
+        print(f"No hay archivos '{args.patron}' en {args.directorio}", file=sys.stderr)
+        return 1
+    salida = Path(args.salida or args.directorio)
+    salida.mkdir(parents=True, exist_ok=True)
+    inicio = time.perf_counter()
+    total = fuera = rechazadas = atipicas = 0
+    historia = _historia(args.punto)
+    trabajos = [(str(r), str(salida), args.valor_dolar, args.contrato, args.pdf, args.perfil, historia)
+                for r in archivos]
+    if args.workers == 1:
+        ejecutor = None
+        pendientes = [(t[0], t) for t in trabajos]
+    else:
+        ejecutor = ProcessPoolExecutor(max_workers=args.workers)
+        pendientes = [(t[0], ejecutor.submit(_procesar_archivo, *t)) for t in trabajos]
+    fallidos = []
+    try:
+        # Un archivo con error (columnas que no coinciden, datos ilegibles) se informa y se sigue
+        for ruta, trabajo in pendientes:
+            try:
+                resultado = _procesar_archivo(*trabajo) if ejecutor is None else trabajo.result()
+            except Exception as error:
+                fallidos.append(ruta)
+                print(f"{Path(ruta).name}: ERROR {type(error).__name__}: {error}", file=sys.stderr)
+                continue
+            nombre, muestras, no_cumplen, descartadas, marcadas = resultado
+            total += muestras
+            fuera += no_cumplen
+            rechazadas += descartadas
+            atipicas += marcadas
+            print(f"{nombre}: {muestras} muestras, {no_cumplen} NO CUMPLEN, {descartadas} rechazadas, "
+                  f"{marcadas} atípicas")
+    finally:
+        if ejecutor is not None:
+            ejecutor.shutdown()
+    print(f"{len(archivos)} archivos, {total} muestras, {fuera} NO CUMPLEN, {rechazadas} rechazadas, "
+          f"{atipicas} atípicas en {time.perf_counter() - inicio:.2f} s")
+    if fallidos:
+        print(f"{len(fallidos)} archivos con error: {', '.join(Path(r).name for r in fallidos)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def comando_escuchar(args):
+    import asyncio
+
+    from lts.tiempo_real import AnalizadorTiempoReal
+
+    if not args.carpeta and not args.puerto:
+        print("Indicá --carpeta y/o --puerto", file=sys.stderr)
+        return 1
+
+    def imprimir(alarma):
+        print(f"{time.strftime('%H:%M:%S', time.localtime(alarma.fecha))} ALARMA {alarma.corriente}: "
+              f"{alarma.parametro} = {alarma.valor:.4g} (spec {alarma.especificacion})", flush=True)
+
+    servicio = AnalizadorTiempoReal(args.valor_dolar, al_alarmar=imprimir, contratos=[args.contrato])
+    try:
+        asyncio.run(servicio.ejecutar(args.carpeta, args.puerto, args.host))
+    except KeyboardInterrupt:
+        print(f"{servicio.lecturas} lecturas, {servicio.descartadas} descartadas")
+    return 0
+
+
+def comando_verificar(args):
+    from lts.certificados import obtener_indice
+
+    indice = obtener_indice(args.indice) if args.indice else obtener_indice()
+    codigos = sys.stdin.read().split() if args.codigos == ['-'] else args.codigos
+    invalidos = 0
+    for texto in codigos:
+        emitido = indice.verificar(texto)
+        if emitido is None:
+            invalidos += 1
+            print(f"{texto}: NO REGISTRADO")
+            continue
+        estado = {True: 'CUMPLE', False: 'NO CUMPLE', None: '-'}[emitido.cumple]
+        print(f"{emitido.codigo}: VÁLIDO - {emitido.muestra} ({emitido.titulo}), emitido "
+              f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(emitido.fecha))}, {estado}")
+        if args.detalle:
+            for parametro, valor in emitido.datos.items():
+                print(f"    {parametro}: {valor}")
+    return 1 if invalidos else 0
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog="python -m lts", description="Análisis de calidad - Planta LTS")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    procesar = sub.add_parser("procesar", help="Analiza todas las exportaciones de cromatografía de una carpeta")
+    procesar.add_argument("directorio")
+    procesar.add_argument("-o", "--salida", help="Carpeta de salida (por defecto, la de entrada)")
+    procesar.add_argument("--patron", default="*.csv", help="p. ej. '*.parquet' o '*.xlsx'")
+    procesar.add_argument("--perfil", help="Perfil de mapeo de columnas (perfiles_columnas.csv)")
+    procesar.add_argument("--valor-dolar", type=float, default=2.25)
+    procesar.add_argument("--contrato", default="General")
+    procesar.add_argument("--punto", help="Punto de muestreo cuya historia se usa para detectar atípicos")
+    procesar.add_argument("--pdf", action="store_true", help="Genera también el informe PDF del lote")
+    procesar.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    procesar.set_defaults(funcion=comando_procesar)
+
+    escuchar = sub.add_parser("escuchar", help="Valida en tiempo real las lecturas de analizadores en línea")
+    escuchar.add_argument("--carpeta", help="Carpeta donde los analizadores agregan filas a sus CSV")
+    escuchar.add_argument("--puerto", type=int, help="Puerto TCP que recibe una composición JSON por línea")
+    escuchar.add_argument("--host", default="127.0.0.1")
+    escuchar.add_argument("--valor-dolar", type=float, default=2.25)
+    escuchar.add_argument("--contrato", default="General")
+    escuchar.set_defaults(funcion=comando_escuchar)
+
+    verificar = sub.add_parser("verificar", help="Verifica certificados por código o texto de su QR")
+    verificar.add_argument("codigos", nargs="+", help="Códigos, enlaces o '-' para leerlos de stdin")
+    verificar.add_argument("--indice", help="Índice de certificados (por defecto LTS_CERTIFICADOS)")
+    verificar.add_argument("--detalle", action="store_true", help="Muestra los resultados certificados")
+    verificar.set_defaults(funcion=comando_verificar)
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    return args.funcion(args)
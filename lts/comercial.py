@@ -0,0 +1,151 @@
+"""Balance comercial: energía, PCS ponderado e ingreso cruzando el historial con volúmenes medidos.
+
+Cada registro de volumen (fecha, punto, Sm3) se valoriza con la última muestra de ese punto
+tomada antes de la medición (merge_asof). Los totales se guardan por (día, punto, contrato) y
+se agregan a cualquier nivel con un group-by; cuando llegan muestras o volúmenes nuevos solo se
+recalculan los días afectados de los puntos afectados.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from lts.especificaciones import CONTRATO_BASE
+from lts.gas import KCAL_POR_MJ
+from lts.recursos import MEMORIA_CACHE_MB, CacheLRU
+
+PARAMETRO_PCS = 'PCS (MJ/m3)'
+CLAVES = ['Día', 'Punto', 'Contrato']
+SUMAS = ['Volumen (Sm3)', 'Volumen sin muestra (Sm3)', 'Energía (MJ)', 'Ingreso (USD)', 'Mediciones']
+COLUMNAS_VOLUMEN = {'fecha': 'Fecha', 'punto': 'Punto', 'volumen': 'Volumen (Sm3)', 'volumen (sm3)': 'Volumen (Sm3)',
+                    'contrato': 'Contrato'}
+
+COMERCIAL = CacheLRU('comercial', max_entradas=16, max_mb=MEMORIA_CACHE_MB * 0.05)
+
+
+def leer_volumenes(archivo):
+    """CSV de mediciones con columnas Fecha, Punto, Volumen (Sm3) y, opcional, Contrato."""
+    volumenes = pd.read_csv(archivo)
+    volumenes = volumenes.rename(columns=lambda c: COLUMNAS_VOLUMEN.get(str(c).strip().lower(), c))
+    faltantes = {'Fecha', 'Punto', 'Volumen (Sm3)'} - set(volumenes.columns)
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el archivo de volúmenes: {', '.join(sorted(faltantes))}")
+    return volumenes
+
+
+def _normalizar_volumenes(volumenes):
+    v = pd.DataFrame({
+        'Fecha': pd.to_datetime(volumenes['Fecha']).astype('datetime64[ns]'),
+        'Punto': volumenes['Punto'].astype(str),
+        'Volumen (Sm3)': volumenes['Volumen (Sm3)'].astype('float64'),
+        'Contrato': volumenes['Contrato'].astype(str) if 'Contrato' in volumenes else CONTRATO_BASE,
+    })
+    return v.sort_values('Fecha', kind='stable')
+
+
+def valorizar(muestras, volumenes, precios, valor_dolar):
+    """Une cada volumen con la última muestra de su punto y calcula energía e ingreso por registro."""
+    if volumenes.empty:
+        return pd.DataFrame(columns=CLAVES + SUMAS)
+    cruzado = pd.merge_asof(volumenes, muestras, on='Fecha', by='Punto', direction='backward')
+    volumen = cruzado['Volumen (Sm3)'].to_numpy()
+    sin_muestra = np.isnan(cruzado[PARAMETRO_PCS].to_numpy())
+    energia = np.where(sin_muestra, 0.0, volumen * cruzado[PARAMETRO_PCS].to_numpy())
+    precio = cruzado['Contrato'].map(precios).fillna(valor_dolar).to_numpy(dtype=np.float64)
+    return pd.DataFrame({
+        'Día': cruzado['Fecha'].dt.normalize(),
+        'Punto': cruzado['Punto'],
+        'Contrato': cruzado['Contrato'],
+        'Volumen (Sm3)': volumen,
+        'Volumen sin muestra (Sm3)': np.where(sin_muestra, volumen, 0.0),
+        'Energía (MJ)': energia,
+        'Ingreso (USD)': energia * precio,
+        'Mediciones': 1,
+    })
+
+
+def agregar(valorizado, por=CLAVES):
+    """Suma por las claves pedidas y recalcula el PCS ponderado por volumen (energía / volumen valorizado)."""
+    por = list(por)
+    valorizado = valorizado.astype({c: 'float64' for c in SUMAS})
+    if por:
+        totales = valorizado.groupby(por, sort=True)[SUMAS].sum()
+    else:
+        totales = valorizado[SUMAS].sum().to_frame('Total').T
+    totales['Mediciones'] = totales['Mediciones'].astype(int)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        totales['PCS ponderado (MJ/m3)'] = totales['Energía (MJ)'] / (
+            totales['Volumen (Sm3)'] - totales['Volumen sin muestra (Sm3)'])
+    totales['PCS ponderado (kcal/m3)'] = totales['PCS ponderado (MJ/m3)'] * KCAL_POR_MJ
+    return totales
+
+
+class BalanceComercial:
+    """Totales diarios por punto y contrato, mantenidos en forma incremental."""
+
+    def __init__(self, volumenes, precios=None, valor_dolar=2.25, modulo='Gas Natural'):
+        self.volumenes = _normalizar_volumenes(volumenes)
+        self.precios = dict(precios or {})
+        self.valor_dolar = valor_dolar
+        self.modulo = modulo
+        self.muestras = pd.DataFrame({'Fecha': pd.Series(dtype='datetime64[ns]'),
+                                      'Punto': pd.Series(dtype=str), PARAMETRO_PCS: pd.Series(dtype='float64')})
+        self.totales = pd.DataFrame(columns=CLAVES + SUMAS).set_index(CLAVES)
+        self.ultimo_id = 0
+        self._lock = threading.Lock()
+        self._recalcular(self.volumenes)
+
+    def _recalcular(self, afectados):
+        """Recalcula los días >= al primer día afectado de cada punto afectado."""
+        desde = afectados.groupby('Punto')['Fecha'].min().dt.normalize()
+        vol = self.volumenes
+        limite = vol['Punto'].map(desde)
+        seleccion = vol[limite.notna() & (vol['Fecha'] >= limite)]
+        nuevos = agregar(valorizar(self.muestras, seleccion, self.precios, self.valor_dolar))[SUMAS]
+        viejos = self.totales.index.to_frame(index=False)
+        limite_viejo = viejos['Punto'].map(desde)
+        conservar = ~(limite_viejo.notna() & (viejos['Día'] >= limite_viejo)).to_numpy()
+        self.totales = pd.concat([self.totales[conservar], nuevos]).sort_index()
+
+    def agregar_muestras(self, muestras):
+        """muestras: DataFrame con Fecha, Punto y PCS (MJ/m3)."""
+        muestras = muestras.assign(Fecha=pd.to_datetime(muestras['Fecha']).astype('datetime64[ns]'),
+                                   Punto=muestras['Punto'].astype(str))
+        muestras = muestras[['Fecha', 'Punto', PARAMETRO_PCS]].dropna()
+        if muestras.empty:
+            return self
+        with self._lock:
+            self.muestras = pd.concat([self.muestras, muestras]).sort_values('Fecha', kind='stable')
+            self._recalcular(muestras)
+        return self
+
+    def agregar_volumenes(self, volumenes):
+        volumenes = _normalizar_volumenes(volumenes)
+        with self._lock:
+            self.volumenes = pd.concat([self.volumenes, volumenes]).sort_values('Fecha', kind='stable')
+            self._recalcular(volumenes)
+        return self
+
+    def actualizar(self, historial):
+        """Incorpora solo las muestras del historial con id mayor a la última procesada."""
+        serie = historial.serie(self.modulo, PARAMETRO_PCS, desde_id=self.ultimo_id)
+        if not serie.empty:
+            self.ultimo_id = int(serie['id'].iloc[-1])
+            self.agregar_muestras(serie.dropna(subset=['punto']).rename(
+                columns={'fecha': 'Fecha', 'punto': 'Punto', 'valor': PARAMETRO_PCS}))
+        return self
+
+    def resumen(self, por=CLAVES):
+        with self._lock:
+            totales = self.totales.reset_index()
+        return agregar(totales, por)
+
+
+def obtener_balance(historial, volumenes, clave, precios=None, valor_dolar=2.25):
+    """Balance compartido por proceso para un archivo de volúmenes (clave = su huella) y precios."""
+    precios = dict(precios or {})
+    clave = (historial.ruta, clave, tuple(sorted(precios.items())), valor_dolar)
+    balance = COMERCIAL.obtener(clave, lambda: BalanceComercial(volumenes, precios, valor_dolar))
+    balance.actualizar(historial)
+    COMERCIAL.actualizar(clave)  # las muestras y los totales crecen con el historial
+    return balance
@@ -0,0 +1,181 @@
+import csv
+import logging
+import os
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RUTA_ESPECIFICACIONES = os.environ.get(
+    "LTS_ESPECIFICACIONES", str(Path(__file__).resolve().parent / "especificaciones.csv"))
+CONTRATO_BASE = "General"
+OPERADORES = {'<', '<=', '>', '>=', 'rango'}
+
+logger = logging.getLogger("lts.especificaciones")
+
+
+class Regla(namedtuple('Regla', 'producto contrato parametro columna operador valor valor_max unidad')):
+    """Un límite de la tabla: `columna` es el nombre del valor en los resultados (por defecto, el parámetro)."""
+    __slots__ = ()
+
+    @property
+    def limites(self):
+        """(mínimo, máximo, mínimo estricto, máximo estricto); ±inf si el lado es abierto."""
+        if self.operador == 'rango':
+            return self.valor, self.valor_max, False, False
+        if self.operador in ('<', '<='):
+            return -np.inf, self.valor, False, self.operador == '<'
+        return self.valor, np.inf, self.operador == '>', False
+
+    def cumple(self, valor):
+        minimo, maximo, min_estricto, max_estricto = self.limites
+        sobre = valor > minimo if min_estricto else valor >= minimo
+        bajo = valor < maximo if max_estricto else valor <= maximo
+        return sobre & bajo
+
+    def texto(self):
+        if self.operador == 'rango':
+            texto = f"{self.valor:g}-{self.valor_max:g}"
+        else:
+            texto = f"{self.operador} {self.valor:g}"
+        return f"{texto} {self.unidad}".strip()
+
+
+def _numero(texto):
+    return float(texto) if texto not in (None, '') else None
+
+
+def leer_reglas(ruta):
+    reglas = []
+    with open(ruta, newline='', encoding='utf-8') as f:
+        for fila in csv.DictReader(f):
+            if fila['operador'] not in OPERADORES:
+                raise ValueError(f"Operador desconocido '{fila['operador']}' para {fila['parametro']} en {ruta}")
+            regla = Regla(
+                fila['producto'], fila['contrato'] or CONTRATO_BASE, fila['parametro'],
+                fila['columna'] or fila['parametro'], fila['operador'],
+                _numero(fila['valor']), _numero(fila['valor_max']), fila['unidad'] or '')
+            if regla.valor is None or (regla.operador == 'rango' and regla.valor_max is None):
+                raise ValueError(f"Falta el límite de {regla.parametro} en {ruta}")
+            reglas.append(regla)
+    return reglas
+
+
+class ReglasCompiladas:
+    """Reglas de un producto (uno o varios contratos) compiladas a arrays de límites.
+
+    evaluar() arma la matriz muestras x reglas con los valores y resuelve todas las comparaciones
+    en una sola pasada; veredicto() reduce por contrato con np.logical_and.reduceat.
+    """
+
+    def __init__(self, reglas):
+        self.reglas = sorted(reglas, key=lambda r: r.contrato)
+        limites = [r.limites for r in self.reglas]
+        self.minimo = np.array([l[0] for l in limites], dtype=np.float64)
+        self.maximo = np.array([l[1] for l in limites], dtype=np.float64)
+        self.min_estricto = np.array([l[2] for l in limites], dtype=bool)
+        self.max_estricto = np.array([l[3] for l in limites], dtype=bool)
+        self.contratos = sorted({r.contrato for r in self.reglas})
+
+    def _aplicables(self, columnas):
+        return [i for i, r in enumerate(self.reglas) if r.columna in columnas]
+
+    def evaluar(self, df):
+        """Matriz booleana muestras x reglas aplicables (las reglas sin columna en df se omiten)."""
+        indices = self._aplicables(df.columns)
+        columnas = list(dict.fromkeys(self.reglas[i].columna for i in indices))
+        posicion = {c: j for j, c in enumerate(columnas)}
+        valores = df[columnas].to_numpy(dtype=np.float64)[:, [posicion[self.reglas[i].columna] for i in indices]]
+        sobre = np.where(self.min_estricto[indices], valores > self.minimo[indices], valores >= self.minimo[indices])
+        bajo = np.where(self.max_estricto[indices], valores < self.maximo[indices], valores <= self.maximo[indices])
+        return sobre & bajo, [self.reglas[i] for i in indices]
+
+    def banderas(self, df):
+        """DataFrame con una columna '<parámetro> cumple' por regla (con prefijo de contrato si hay varios)."""
+        ok, reglas = self.evaluar(df)
+        nombres = [f"{r.parametro} cumple" if len(self.contratos) == 1 else f"{r.contrato} | {r.parametro} cumple"
+                   for r in reglas]
+        return pd.DataFrame(ok, index=df.index, columns=nombres)
+
+    def veredicto(self, df):
+        """DataFrame booleano muestras x contratos: True si la muestra cumple todas las reglas del contrato."""
+        ok, reglas = self.evaluar(df)
+        if not reglas:
+            return pd.DataFrame(index=df.index)
+        contratos = [r.contrato for r in reglas]
+        inicios = [i for i, c in enumerate(contratos) if i == 0 or c != contratos[i - 1]]
+        return pd.DataFrame(np.logical_and.reduceat(ok, inicios, axis=1), index=df.index,
+                            columns=[contratos[i] for i in inicios])
+
+    def evaluar_valores(self, valores):
+        """Para una sola muestra: {columna: valor} -> {parámetro: (valor, cumple)} en el orden de `valores`."""
+        por_columna = {**{r.parametro: r for r in self.reglas}, **{r.columna: r for r in self.reglas}}
+        return {k: (v, bool(por_columna[k].cumple(v))) if k in por_columna else (v, None)
+                for k, v in valores.items()}
+
+
+class TablaEspecificaciones:
+    """Tabla de límites por producto y contrato leída de un CSV; se recarga sola cuando cambia el archivo.
+
+    Si el archivo queda ilegible (p. ej. a mitad de una edición) se siguen usando las últimas
+    reglas válidas y el problema queda en self.error hasta la próxima recarga correcta.
+    """
+
+    def __init__(self, ruta=RUTA_ESPECIFICACIONES):
+        self.ruta = ruta
+        self.version = None
+        self.error = None
+        self._reglas = []
+        self._compiladas = {}
+        self._lock = threading.Lock()
+        self._verificar()
+
+    def _verificar(self):
+        try:
+            version = os.stat(self.ruta).st_mtime_ns
+        except OSError as error:
+            if self.version is None:
+                raise
+            self.error = f"No se puede leer {self.ruta}: {error}"
+            return
+        if version != self.version:
+            with self._lock:
+                if version != self.version:
+                    try:
+                        reglas = leer_reglas(self.ruta)
+                    except (OSError, ValueError, KeyError, csv.Error) as error:
+                        if self.version is None:
+                            raise  # sin reglas anteriores no hay con qué seguir
+                        self.error = f"{self.ruta} tiene errores; se siguen usando las reglas anteriores ({error})"
+                        logger.warning(self.error)
+                        self.version = version  # no volver a leerlo hasta que cambie otra vez
+                        return
+                    self._reglas = reglas
+                    self._compiladas = {}
+                    self.error = None
+                    self.version = version
+
+    def reglas(self, producto, contrato=CONTRATO_BASE):
+        self._verificar()
+        return [r for r in self._reglas if r.producto == producto and r.contrato == contrato]
+
+    def contratos(self, producto):
+        self._verificar()
+        return sorted({r.contrato for r in self._reglas if r.producto == producto})
+
+    def compilar(self, producto, contratos=(CONTRATO_BASE,)):
+        """Reglas compiladas del producto; contratos=None toma todos. Se cachean hasta el próximo cambio."""
+        self._verificar()
+        clave = (producto, None if contratos is None else tuple(contratos))
+        compiladas = self._compiladas.get(clave)
+        if compiladas is None:
+            compiladas = ReglasCompiladas([
+                r for r in self._reglas
+                if r.producto == producto and (contratos is None or r.contrato in contratos)])
+            self._compiladas[clave] = compiladas
+        return compiladas
+
+
+TABLA = TablaEspecificaciones()
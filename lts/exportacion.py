@@ -0,0 +1,87 @@
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from lts.certificados import obtener_indice
+
+# Cada trabajo es (nombre_archivo, tipo, kwargs); el tipo elige la función de lts.informes que
+# arma el PDF. Se resuelve al renderizar para no importar fpdf hasta que haga falta.
+RENDERIZADORES = {
+    'laboratorio': 'informe_laboratorio',
+    'muestra': 'informe_muestra',
+}
+
+
+def _renderizar(trabajo):
+    from lts import informes
+
+    nombre, tipo, kwargs = trabajo
+    return nombre, getattr(informes, RENDERIZADORES[tipo])(**kwargs)
+
+
+def _lotes(trabajos, tamano):
+    lote = []
+    for trabajo in trabajos:
+        lote.append(trabajo)
+        if len(lote) == tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _renderizar_lote(lote):
+    # Corre en un proceso hijo: los certificados vuelven al principal para registrarlos allí
+    from lts.informes import certificados_diferidos
+
+    with certificados_diferidos() as certificados:
+        archivos = [_renderizar(t) for t in lote]
+    return archivos, certificados
+
+
+def exportar_zip(trabajos, destino, max_workers=None, progreso=None, tamano_lote=16):
+    """Renderiza los PDFs en paralelo y los escribe en un ZIP a medida que van terminando.
+
+    trabajos: lista de (nombre_archivo, tipo, kwargs). destino: ruta o archivo binario abierto.
+    progreso: callable opcional progreso(hechos, total), invocado en el proceso principal.
+    Los trabajos se mandan en lotes para amortizar el costo de serialización entre procesos,
+    y nunca hay más de 2 * max_workers lotes en vuelo, así que la memoria queda acotada. Los
+    certificados de los PDF se registran en el índice desde este proceso.
+    """
+    trabajos = list(trabajos)
+    total = len(trabajos)
+    max_workers = max_workers or os.cpu_count() or 1
+    hechos = 0
+    # Los PDF ya salen comprimidos por fpdf: guardarlos sin recomprimir
+    with zipfile.ZipFile(destino, 'w', zipfile.ZIP_STORED) as zf:
+        if max_workers == 1:
+            for trabajo in trabajos:
+                nombre, datos = _renderizar(trabajo)
+                zf.writestr(nombre, datos)
+                hechos += 1
+                if progreso:
+                    progreso(hechos, total)
+            return total
+
+        # spawn: el servidor de Streamlit tiene hilos (historial, tiempo real, locks de caché) y un
+        # hijo creado con fork puede heredar uno de esos locks tomado y bloquearse
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as ejecutor:
+            pendientes = []
+            lotes = _lotes(trabajos, tamano_lote)
+            for lote in lotes:
+                pendientes.append(ejecutor.submit(_renderizar_lote, lote))
+                if len(pendientes) >= 2 * max_workers:
+                    break
+            while pendientes:
+                archivos, certificados = pendientes.pop(0).result()
+                obtener_indice().registrar(certificados)
+                for nombre, datos in archivos:
+                    zf.writestr(nombre, datos)
+                    hechos += 1
+                if progreso:
+                    progreso(hechos, total)
+                siguiente = next(lotes, None)
+                if siguiente is not None:
+                    pendientes.append(ejecutor.submit(_renderizar_lote, siguiente))
+    return total
@@ -0,0 +1,186 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from lts.especificaciones import CONTRATO_BASE, TABLA
+from lts.instrumentacion import etapa
+from lts.propiedades import propiedades_reales
+
+# --------------------------- CONSTANTES --------------------------- #
+PM = {
+    'CH4': 16.04, 'C2H6': 30.07, 'C3H8': 44.10,
+    'i-C4H10': 58.12, 'n-C4H10': 58.12, 'i-C5H12': 72.15, 'n-C5H12': 72.15,
+    'C6+': 86.00, 'N2': 28.01, 'CO2': 44.01, 'H2S': 34.08, 'O2': 32.00
+}
+HHV = {
+    'CH4': 39.82, 'C2H6': 70.6, 'C3H8': 101.0,
+    'i-C4H10': 131.6, 'n-C4H10': 131.6,
+    'i-C5H12': 161.0, 'n-C5H12': 161.0,
+    'C6+': 190.0
+}
+R = 8.314
+PM_aire = 28.96
+T_std = 288.15
+P_std = 101325
+KCAL_POR_MJ = 239.006
+
+COMPONENTES = list(PM)
+RESULTADOS = [
+    'PM', 'PCS (MJ/m3)', 'PCS (kcal/m3)', 'Gamma', 'Wobbe', 'Densidad (kg/m3)', 'Z',
+    'Dew Point estimado (C)', 'CO2 (%)', 'H2S ppm', 'Carga H2S (kg/kg)', 'Ingreso estimado (USD/m3)'
+]
+INERTES = ['N2', 'CO2', 'O2']
+
+# Matriz componentes x propiedades [PM, HHV], armada una sola vez al importar
+PROPIEDADES = np.array([[PM[k], HHV.get(k, 0.0)] for k in COMPONENTES])
+_IDX = {k: i for i, k in enumerate(COMPONENTES)}
+_IDX_INERTES = [_IDX[k] for k in INERTES]
+
+PRODUCTO = 'Gas Natural'
+
+
+def reglas(contrato=CONTRATO_BASE, columnas=None):
+    """Reglas del contrato que aplican a los resultados de este módulo (o a `columnas`, si se indica)."""
+    columnas = set(RESULTADOS) | {'Inertes totales', 'O2 (%)'} if columnas is None else set(columnas)
+    return [r for r in TABLA.reglas(PRODUCTO, contrato) if r.columna in columnas]
+
+
+def _reales(fracciones, pm_muestra, hhv_ideal):
+    return propiedades_reales(fracciones, COMPONENTES, pm_muestra, hhv_ideal, P_std, R, T_std, PM_aire)
+
+
+# --------------------------- MUESTRA INDIVIDUAL --------------------------- #
+def analizar_composicion(composicion, valor_dolar=2.25, contrato=CONTRATO_BASE):
+    composicion = {k: float(v) for k, v in composicion.items() if k in PM}
+    total = sum(composicion.values())
+    if not total > 0:
+        raise ValueError(f"La composición suma {total:g} %: no se puede normalizar")
+    fracciones = {k: v / total for k, v in composicion.items()}
+    pm_muestra = sum(fracciones[k] * PM[k] for k in fracciones)
+    hhv_ideal = sum(fracciones.get(k, 0) * HHV.get(k, 0) for k in HHV)
+    reales = _reales(np.array([fracciones.get(k, 0.0) for k in COMPONENTES]), pm_muestra, hhv_ideal)
+    densidad = float(reales['Densidad (kg/m3)'])
+    hhv_total = float(reales['PCS (MJ/m3)'])
+    gamma = PM_aire / pm_muestra
+    wobbe = float(reales['Wobbe'])
+    dew_point = float(reales['Dew Point estimado (C)'])
+    api_h2s_ppm = composicion.get('H2S', 0) * 1e4
+    carga_h2s = (api_h2s_ppm * PM['H2S'] / 1e6) / (pm_muestra * 1e3)
+    ingreso = hhv_total * valor_dolar
+    resultados = {
+        'PM': pm_muestra,
+        'PCS (MJ/m3)': hhv_total,
+        'PCS (kcal/m3)': hhv_total * KCAL_POR_MJ,
+        'Gamma': gamma,
+        'Wobbe': wobbe,
+        'Densidad (kg/m3)': densidad,
+        'Z': float(reales['Z']),
+        'Dew Point estimado (C)': dew_point,
+        'CO2 (%)': composicion.get('CO2', 0),
+        'H2S ppm': api_h2s_ppm,
+        'Carga H2S (kg/kg)': carga_h2s,
+        'Ingreso estimado (USD/m3)': ingreso,
+    }
+    valores = valores_a_validar(composicion, resultados)
+    resultados['Validación'] = {r.parametro: (valores[r.columna], r) for r in reglas(contrato)}
+    return resultados
+
+
+def valores_a_validar(composicion, resultados):
+    """Resultados de una muestra más lo que solo se valida (inertes y O2), por columna de regla."""
+    return dict(resultados, **{
+        'Inertes totales': sum(float(composicion.get(k, 0)) for k in INERTES),
+        'O2 (%)': float(composicion.get('O2', 0)),
+    })
+
+
+# --------------------------- LOTE VECTORIZADO --------------------------- #
+def matriz_composicion(df):
+    """Devuelve la matriz muestras x COMPONENTES (float64); los componentes ausentes valen 0."""
+    x = np.zeros((len(df), len(COMPONENTES)))
+    for k in COMPONENTES:
+        if k in df.columns:
+            x[:, _IDX[k]] = df[k].to_numpy(dtype=np.float64)
+    return x
+
+
+def analizar_lote(df, valor_dolar=2.25, contrato=CONTRATO_BASE):
+    """Versión vectorizada de analizar_composicion sobre todas las filas de df.
+
+    Devuelve un DataFrame con una fila por muestra (mismo índice que df), las columnas de
+    analizar_composicion, el valor de cada parámetro validado, una columna booleana
+    '<parámetro> cumple' por especificación y 'Cumple' con el veredicto global.
+    """
+    x = matriz_composicion(df)
+    total = x.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fracciones = x / total[:, None]
+        pm_muestra, hhv_ideal = (fracciones @ PROPIEDADES).T
+        reales = _reales(fracciones, pm_muestra, hhv_ideal)
+        hhv_total = reales['PCS (MJ/m3)']
+        gamma = PM_aire / pm_muestra
+        carga_h2s_factor = PM['H2S'] / 1e6 / (pm_muestra * 1e3)
+    co2 = x[:, _IDX['CO2']]
+    api_h2s_ppm = x[:, _IDX['H2S']] * 1e4
+    pcs_kcal = hhv_total * KCAL_POR_MJ
+
+    resultados = pd.DataFrame({
+        'PM': pm_muestra,
+        'PCS (MJ/m3)': hhv_total,
+        'PCS (kcal/m3)': pcs_kcal,
+        'Gamma': gamma,
+        'Wobbe': reales['Wobbe'],
+        'Densidad (kg/m3)': reales['Densidad (kg/m3)'],
+        'Z': reales['Z'],
+        'Dew Point estimado (C)': reales['Dew Point estimado (C)'],
+        'CO2 (%)': co2,
+        'H2S ppm': api_h2s_ppm,
+        'Carga H2S (kg/kg)': api_h2s_ppm * carga_h2s_factor,
+        'Ingreso estimado (USD/m3)': hhv_total * valor_dolar,
+    }, index=df.index)
+
+    resultados['Inertes totales'] = x[:, _IDX_INERTES].sum(axis=1)
+    resultados['O2 (%)'] = x[:, _IDX['O2']]
+    with etapa('validación'):
+        banderas = TABLA.compilar(PRODUCTO, [contrato]).banderas(resultados)
+    resultados = resultados.join(banderas)
+    resultados['Cumple'] = banderas.to_numpy().all(axis=1)
+    return resultados
+
+
+def banderas_lote(contrato=CONTRATO_BASE):
+    """Para Historial.registrar_lote: columna de valor -> columna de cumplimiento."""
+    return {r.columna: f"{r.parametro} cumple" for r in reglas(contrato)}
+
+
+def parametros_historial(resultados):
+    """Convierte el dict de analizar_composicion a {columna: (valor, cumple)} para el Historial."""
+    parametros = {k: (v, None) for k, v in resultados.items() if k != 'Validación'}
+    for valor, regla in resultados['Validación'].values():
+        parametros[regla.columna] = (valor, bool(regla.cumple(valor)))
+    return parametros
+
+
+def fila_a_resultados(fila, contrato=CONTRATO_BASE):
+    """Reconstruye el dict de analizar_composicion a partir de una fila de analizar_lote."""
+    resultados = {k: fila[k] for k in RESULTADOS}
+    resultados['Validación'] = {r.parametro: (fila[r.columna], r) for r in reglas(contrato)}
+    return resultados
+
+
+def analizar_csv(contenido, valor_dolar=2.25, contrato=CONTRATO_BASE):
+    """Analiza un CSV subido (bytes): la primera fila como muestra principal y, si hay más, el lote completo."""
+    with etapa('ingesta'):
+        df = pd.read_csv(io.BytesIO(contenido))
+    return analizar_tabla(df, valor_dolar, contrato)
+
+
+def analizar_tabla(df, valor_dolar=2.25, contrato=CONTRATO_BASE):
+    """Como analizar_csv, sobre un DataFrame ya leído (p. ej. con lts.importacion.leer_tabla)."""
+    with etapa('análisis'):
+        fila = df.iloc[0]
+        composicion = {k: fila[k] for k in PM if k in fila}
+        resultados = analizar_composicion(composicion, valor_dolar, contrato)
+        lote = analizar_lote(df, valor_dolar, contrato) if len(df) > 1 else None
+    return resultados, lote
@@ -0,0 +1,266 @@
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+from dateutil import tz
+
+RUTA_HISTORIAL = os.environ.get("LTS_HISTORIAL", "historial.db")
+REINTENTOS = 5  # intentos de grabar un lote con la base bloqueada (p. ej. la CLI escribiendo a la vez)
+
+logger = logging.getLogger("lts.historial")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS muestras (
+    id INTEGER PRIMARY KEY,
+    modulo TEXT NOT NULL,
+    punto TEXT,
+    fecha REAL NOT NULL,
+    operador TEXT,
+    muestra_por TEXT,
+    observaciones TEXT,
+    cumple INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_muestras_modulo_punto_fecha ON muestras (modulo, punto, fecha);
+CREATE INDEX IF NOT EXISTS ix_muestras_fuera_de_spec ON muestras (modulo, punto, fecha) WHERE cumple = 0;
+CREATE TABLE IF NOT EXISTS valores (
+    muestra_id INTEGER NOT NULL REFERENCES muestras (id),
+    parametro TEXT NOT NULL,
+    valor REAL,
+    cumple INTEGER,
+    PRIMARY KEY (muestra_id, parametro)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_valores_parametro ON valores (parametro, muestra_id);
+"""
+
+
+def _epoch(fecha):
+    """Segundos desde 1970 (UTC). Una fecha sin zona es hora local, como las de la UI y las planillas."""
+    if fecha is None:
+        return time.time()
+    if isinstance(fecha, (int, float)):
+        return float(fecha)
+    fecha = pd.Timestamp(fecha)
+    if pd.isna(fecha):
+        return time.time()  # sin fecha legible: como fecha=None, la hora de registro
+    # datetime.timestamp() interpreta una fecha naive como hora local (con su horario de verano)
+    return fecha.timestamp() if fecha.tzinfo is not None else fecha.to_pydatetime().timestamp()
+
+
+def _a_fecha_local(epoch):
+    """Columna de epochs -> datetime naive en hora local, comparable con las fechas de entrada."""
+    return pd.to_datetime(epoch, unit='s', utc=True).dt.tz_convert(tz.tzlocal()).dt.tz_localize(None)
+
+
+def _conectar(ruta):
+    conexion = sqlite3.connect(ruta, check_same_thread=False, timeout=10)
+    conexion.execute("PRAGMA journal_mode=WAL")
+    conexion.execute("PRAGMA synchronous=NORMAL")
+    return conexion
+
+
+class Historial:
+    """Historial de muestras de solo-agregado sobre SQLite.
+
+    Las escrituras se encolan y un hilo de fondo las graba en lotes (una transacción por lote),
+    así la UI no espera al disco. Con la base bloqueada el lote se reintenta; si igual falla se
+    descarta (self.descartadas, self.error) y el hilo sigue atendiendo la cola. Cada muestra es
+    una fila en `muestras` y sus parámetros, filas en `valores`.
+    """
+
+    def __init__(self, ruta=RUTA_HISTORIAL, tamano_lote=500, intervalo=0.5):
+        self.ruta = ruta
+        self.tamano_lote = tamano_lote
+        self.intervalo = intervalo
+        with _conectar(ruta) as conexion:
+            conexion.executescript(ESQUEMA)
+        self._cola = queue.Queue()
+        self.error = None
+        self.descartadas = 0
+        self._escritor = threading.Thread(target=self._escribir, name="historial-escritor", daemon=True)
+        self._escritor.start()
+
+    # --------------------------- ESCRITURA --------------------------- #
+    def registrar(self, modulo, parametros, punto=None, fecha=None, operador=None,
+                  muestra_por=None, observaciones=None):
+        """Encola una muestra. parametros: {nombre: (valor, cumple)}; cumple puede ser None."""
+        self._cola.put((modulo, punto, _epoch(fecha), operador, muestra_por, observaciones,
+                        [(k, v, c) for k, (v, c) in parametros.items()]))
+
+    def registrar_lote(self, modulo, lote, banderas=None, punto=None, fechas=None, operador=None):
+        """Encola todas las filas de un DataFrame de resultados (p. ej. analizar_lote).
+
+        banderas: {columna de valor: columna booleana de cumplimiento}.
+        """
+        banderas = banderas or {}
+        columnas = [c for c in lote.columns if pd.api.types.is_numeric_dtype(lote[c])
+                    and not pd.api.types.is_bool_dtype(lote[c])]
+        ahora = time.time()
+        fechas = [ahora] * len(lote) if fechas is None else [_epoch(f) for f in fechas]
+        datos = {c: lote[c].to_numpy() for c in columnas}
+        oks = {c: lote[b].to_numpy() for c, b in banderas.items()}
+        for i in range(len(lote)):
+            self._cola.put((modulo, punto, fechas[i], operador, None, None,
+                            [(c, float(datos[c][i]), bool(oks[c][i]) if c in oks else None)
+                             for c in columnas]))
+
+    def _escribir(self):
+        conexion = _conectar(self.ruta)
+        while True:
+            pendientes = [self._cola.get()]
+            limite = time.monotonic() + self.intervalo
+            while len(pendientes) < self.tamano_lote:
+                try:
+                    pendientes.append(self._cola.get(timeout=max(0.0, limite - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self._grabar_con_reintentos(conexion, pendientes)
+            except Exception as error:
+                # El hilo nunca muere: un lote que no se pudo grabar se descarta y queda registrado
+                self.error = error
+                self.descartadas += len(pendientes)
+                logger.exception("No se pudieron grabar %d muestras en %s", len(pendientes), self.ruta)
+            finally:
+                for _ in pendientes:
+                    self._cola.task_done()
+
+    def _grabar_con_reintentos(self, conexion, pendientes):
+        for intento in range(REINTENTOS):
+            try:
+                return self._grabar(conexion, pendientes)
+            except sqlite3.OperationalError:  # "database is locked" y similares: transitorios
+                if intento == REINTENTOS - 1:
+                    raise
+                time.sleep(0.2 * 2 ** intento)
+
+    @staticmethod
+    def _grabar(conexion, pendientes):
+        with conexion:
+            for modulo, punto, fecha, operador, muestra_por, observaciones, parametros in pendientes:
+                cumple = all(c is not False for _, _, c in parametros)
+                cursor = conexion.execute(
+                    "INSERT INTO muestras (modulo, punto, fecha, operador, muestra_por, observaciones, cumple)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (modulo, punto, fecha, operador, muestra_por, observaciones, int(cumple)))
+                muestra_id = cursor.lastrowid
+                conexion.executemany(
+                    "INSERT INTO valores (muestra_id, parametro, valor, cumple) VALUES (?, ?, ?, ?)",
+                    [(muestra_id, k, v, None if c is None else int(c)) for k, v, c in parametros])
+
+    def esperar(self):
+        """Bloquea hasta que todo lo encolado esté grabado."""
+        self._cola.join()
+
+    # --------------------------- CONSULTAS --------------------------- #
+    def consultar(self, modulo=None, punto=None, desde=None, hasta=None, solo_fuera_de_spec=False,
+                  parametros=None):
+        """Devuelve una fila por muestra con sus parámetros como columnas, ordenada por fecha."""
+        filtros, argumentos = [], []
+        for condicion, valor in (("m.modulo = ?", modulo), ("m.punto = ?", punto)):
+            if valor is not None:
+                filtros.append(condicion)
+                argumentos.append(valor)
+        if desde is not None:
+            filtros.append("m.fecha >= ?")
+            argumentos.append(_epoch(desde))
+        if hasta is not None:
+            filtros.append("m.fecha < ?")
+            argumentos.append(_epoch(hasta))
+        if solo_fuera_de_spec:
+            filtros.append("m.cumple = 0")
+        if parametros:
+            filtros.append(f"v.parametro IN ({', '.join('?' * len(parametros))})")
+            argumentos.extend(parametros)
+        sql = (
+            "SELECT m.id, m.modulo, m.punto, m.fecha, m.operador, m.cumple, v.parametro, v.valor"
+            " FROM muestras m JOIN valores v ON v.muestra_id = m.id"
+            + (" WHERE " + " AND ".join(filtros) if filtros else "")
+        )
+        with _conectar(self.ruta) as conexion:
+            largo = pd.read_sql_query(sql, conexion, params=argumentos)
+        if largo.empty:
+            return pd.DataFrame(columns=['id', 'modulo', 'punto', 'fecha', 'operador', 'cumple'])
+        meta = largo.drop(columns=['parametro', 'valor']).drop_duplicates('id').set_index('id')
+        ancho = meta.join(largo.set_index(['id', 'parametro'])['valor'].unstack()).sort_values('fecha')
+        ancho.columns.name = None
+        ancho['fecha'] = _a_fecha_local(ancho['fecha'])
+        ancho['cumple'] = ancho['cumple'].astype(bool)
+        return ancho.reset_index()
+
+    def serie(self, modulo, parametro, punto=None, desde_id=0):
+        """Valores de un parámetro en orden de llegada (id), solo las muestras con id > desde_id."""
+        sql = (
+            "SELECT m.id, m.fecha, m.punto, v.valor, v.cumple FROM valores v JOIN muestras m ON m.id = v.muestra_id"
+            " WHERE v.parametro = ? AND v.muestra_id > ? AND m.modulo = ?"
+        )
+        argumentos = [parametro, desde_id, modulo]
+        if punto is not None:
+            sql += " AND m.punto = ?"
+            argumentos.append(punto)
+        with _conectar(self.ruta) as conexion:
+            serie = pd.read_sql_query(sql + " ORDER BY v.muestra_id", conexion, params=argumentos)
+        serie['fecha'] = _a_fecha_local(serie['fecha'])
+        return serie
+
+    def ultimas(self, modulo, parametros, punto=None, n=500):
+        """Las `n` muestras más recientes que tienen el primero de `parametros`, en orden de fecha.
+
+        Una fila por muestra con `parametros` como columnas (NaN si una muestra no trae alguno).
+        """
+        recientes = (
+            "SELECT m.id FROM muestras m WHERE m.modulo = ?"
+            + (" AND m.punto = ?" if punto is not None else "")
+            + " AND EXISTS (SELECT 1 FROM valores w WHERE w.muestra_id = m.id AND w.parametro = ?)"
+            " ORDER BY m.fecha DESC LIMIT ?"
+        )
+        sql = (
+            "SELECT m.id, m.fecha, v.parametro, v.valor FROM muestras m JOIN valores v ON v.muestra_id = m.id"
+            f" WHERE m.id IN ({recientes}) AND v.parametro IN ({', '.join('?' * len(parametros))})"
+        )
+        argumentos = [modulo] + ([punto] if punto is not None else []) + [parametros[0], n] + list(parametros)
+        with _conectar(self.ruta) as conexion:
+            largo = pd.read_sql_query(sql, conexion, params=argumentos)
+        ancho = largo.pivot(index=['id', 'fecha'], columns='parametro', values='valor')
+        ancho = ancho.reindex(columns=list(parametros)).sort_index(level='fecha').reset_index(drop=True)
+        ancho.columns.name = None
+        return ancho
+
+    def parametros(self, modulo):
+        sql = ("SELECT DISTINCT v.parametro FROM valores v JOIN muestras m ON m.id = v.muestra_id"
+               " WHERE m.modulo = ? ORDER BY v.parametro")
+        with _conectar(self.ruta) as conexion:
+            return [fila[0] for fila in conexion.execute(sql, (modulo,))]
+
+    def puntos(self, modulo=None):
+        sql = "SELECT DISTINCT punto FROM muestras WHERE punto IS NOT NULL"
+        argumentos = []
+        if modulo is not None:
+            sql += " AND modulo = ?"
+            argumentos.append(modulo)
+        with _conectar(self.ruta) as conexion:
+            return [fila[0] for fila in conexion.execute(sql + " ORDER BY punto", argumentos)]
+
+
+_HISTORIALES = {}
+_LOCK = threading.Lock()
+
+
+def obtener_historial(ruta=RUTA_HISTORIAL):
+    """Un Historial (y un hilo escritor) por archivo y por proceso."""
+    with _LOCK:
+        if ruta not in _HISTORIALES:
+            _HISTORIALES[ruta] = Historial(ruta)
+        return _HISTORIALES[ruta]
+
+
+def inicio_trimestre_anterior(hoy=None):
+    hoy = hoy or datetime.now()
+    mes = 3 * ((hoy.month - 1) // 3) + 1
+    fin = datetime(hoy.year, mes, 1)
+    inicio = datetime(fin.year - (fin.month == 1), (fin.month - 4) % 12 + 1, 1)
+    return inicio, fin
@@ -0,0 +1,239 @@
+"""Importación de exportaciones de cromatografía / LIMS en CSV, XLSX o Parquet.
+
+Las columnas de origen ("Metano %mol", "i-Butano", ...) se llevan a los nombres de PM con un
+perfil de mapeo guardado por fuente (perfiles_columnas.csv) o, si no hay perfil, por sinónimos.
+Solo se leen las columnas mapeadas (proyección en Parquet, usecols en CSV/XLSX), los archivos
+en disco se abren con memory-map y las tablas ya leídas se cachean por hash del contenido.
+"""
+import csv
+import functools
+import hashlib
+import io
+import mmap
+import os
+import re
+import threading
+import unicodedata
+from pathlib import Path
+
+import pandas as pd
+
+from lts.gas import PM
+from lts.instrumentacion import etapa
+from lts.recursos import MEMORIA_CACHE_MB, CacheLRU
+
+RUTA_PERFILES = os.environ.get(
+    "LTS_PERFILES", str(Path(__file__).resolve().parent / "perfiles_columnas.csv"))
+FORMATOS = ['csv', 'xlsx', 'parquet']
+COLUMNA_FECHA = 'Fecha'
+DESTINOS = list(PM) + [COLUMNA_FECHA]
+
+# Nombres normalizados (ver _normalizar) que se reconocen sin perfil
+SINONIMOS = {
+    **{re.sub('[^a-z0-9]', '', k.lower()): k for k in PM},
+    'metano': 'CH4', 'etano': 'C2H6', 'propano': 'C3H8',
+    'isobutano': 'i-C4H10', 'ibutano': 'i-C4H10', 'nbutano': 'n-C4H10', 'normalbutano': 'n-C4H10',
+    'isopentano': 'i-C5H12', 'ipentano': 'i-C5H12', 'npentano': 'n-C5H12', 'normalpentano': 'n-C5H12',
+    'hexanos': 'C6+', 'hexanosmas': 'C6+', 'c6mas': 'C6+',
+    'nitrogeno': 'N2', 'dioxidodecarbono': 'CO2', 'sulfurodehidrogeno': 'H2S', 'acidosulfhidrico': 'H2S',
+    'oxigeno': 'O2',
+    'fecha': COLUMNA_FECHA, 'fechademuestreo': COLUMNA_FECHA, 'fechahora': COLUMNA_FECHA,
+    'timestamp': COLUMNA_FECHA,
+}
+
+IMPORTACIONES = CacheLRU('importación', max_entradas=32, max_mb=MEMORIA_CACHE_MB * 0.3)
+
+
+def _normalizar(nombre):
+    texto = unicodedata.normalize('NFKD', str(nombre)).encode('ascii', 'ignore').decode().lower()
+    texto = re.sub(r'\(.*?\)|%\s*mol(ar)?|\bmol(ar)?\b|%', '', texto)
+    return re.sub('[^a-z0-9]', '', texto)
+
+
+# --------------------------- PERFILES DE MAPEO --------------------------- #
+class TablaPerfiles:
+    """Perfiles columna de origen -> componente, leídos de un CSV; se recargan cuando cambia el archivo."""
+
+    def __init__(self, ruta=RUTA_PERFILES):
+        self.ruta = ruta
+        self.version = None
+        self._perfiles = {}
+        self._lock = threading.Lock()
+        self._verificar()
+
+    def _verificar(self):
+        version = os.stat(self.ruta).st_mtime_ns if os.path.exists(self.ruta) else 0
+        if version != self.version:
+            with self._lock:
+                if version != self.version:
+                    perfiles = {}
+                    if version:
+                        with open(self.ruta, newline='', encoding='utf-8') as f:
+                            for fila in csv.DictReader(f):
+                                perfiles.setdefault(fila['perfil'], {})[fila['columna']] = fila['componente']
+                    self._perfiles = perfiles
+                    self.version = version
+
+    def nombres(self):
+        self._verificar()
+        return sorted(self._perfiles)
+
+    def mapeo(self, perfil):
+        self._verificar()
+        return dict(self._perfiles.get(perfil, {}))
+
+    def guardar(self, perfil, mapeo):
+        """Reemplaza (o crea) el perfil con {columna de origen: componente}."""
+        desconocidos = set(mapeo.values()) - set(DESTINOS)
+        if desconocidos:
+            raise ValueError(f"Componentes desconocidos en el perfil '{perfil}': {sorted(desconocidos)}")
+        self._verificar()
+        with self._lock:
+            perfiles = dict(self._perfiles, **{perfil: dict(mapeo)})
+            with open(self.ruta, 'w', newline='', encoding='utf-8') as f:
+                escritor = csv.writer(f)
+                escritor.writerow(['perfil', 'columna', 'componente'])
+                for nombre in sorted(perfiles):
+                    escritor.writerows((nombre, origen, destino) for origen, destino in perfiles[nombre].items())
+        self._verificar()
+
+
+PERFILES = TablaPerfiles()
+
+
+@functools.lru_cache(maxsize=256)
+def _resolver(columnas, perfil, version):
+    guardado = PERFILES.mapeo(perfil) if perfil else {}
+    mapeo, usados = {}, set()
+    for columna in columnas:
+        destino = guardado.get(columna) or SINONIMOS.get(_normalizar(columna))
+        if destino and destino not in usados:
+            mapeo[columna] = destino
+            usados.add(destino)
+    return mapeo
+
+
+def resolver_mapeo(columnas, perfil=None):
+    """{columna de origen: componente} para un encabezado; se cachea por encabezado y perfil."""
+    PERFILES._verificar()
+    return dict(_resolver(tuple(columnas), perfil, PERFILES.version))
+
+
+def mapeo_de_componentes(columnas, perfil=None):
+    """resolver_mapeo, con ValueError si ninguna columna corresponde a un componente."""
+    mapeo = resolver_mapeo(columnas, perfil)
+    if not any(destino in PM for destino in mapeo.values()):
+        raise ValueError(f"Ninguna columna coincide con un componente ({', '.join(list(columnas)[:8])}...); "
+                         "definí un perfil de mapeo para esta fuente")
+    return mapeo
+
+
+# --------------------------- LECTURA --------------------------- #
+def formato_de(nombre, contenido=b''):
+    sufijo = Path(str(nombre or '')).suffix.lower().lstrip('.')
+    if sufijo in ('xlsx', 'xlsm', 'xls'):
+        return 'xlsx'
+    if sufijo in ('parquet', 'pq'):
+        return 'parquet'
+    if contenido[:4] == b'PAR1':
+        return 'parquet'
+    if contenido[:4] == b'PK\x03\x04':
+        return 'xlsx'
+    return 'csv'
+
+
+def dialecto_csv(muestra):
+    """(separador, separador decimal) de un CSV a partir de sus primeros bytes; ';' implica coma decimal."""
+    texto = muestra.decode('utf-8', errors='replace')
+    try:
+        separador = csv.Sniffer().sniff(texto.split('\n', 1)[0], delimiters=',;\t').delimiter
+    except csv.Error:
+        separador = ','
+    return separador, ',' if separador == ';' else '.'
+
+
+def _encabezado(fuente, formato, muestra):
+    if formato == 'parquet':
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(fuente, memory_map=isinstance(fuente, str)).schema_arrow.names
+    if formato == 'xlsx':
+        return list(pd.read_excel(fuente, nrows=0).columns)
+    separador, _ = dialecto_csv(muestra)
+    return list(pd.read_csv(io.BytesIO(muestra), sep=separador, nrows=0).columns)
+
+
+def _leer(fuente, formato, columnas, muestra):
+    if formato == 'parquet':
+        import pyarrow.parquet as pq
+
+        return pq.read_table(fuente, columns=columnas, memory_map=isinstance(fuente, str)).to_pandas()
+    if formato == 'xlsx':
+        return pd.read_excel(fuente, usecols=columnas)
+    separador, decimal = dialecto_csv(muestra)
+    return pd.read_csv(fuente, sep=separador, decimal=decimal, usecols=columnas,
+                       memory_map=isinstance(fuente, str))
+
+
+def _a_fecha(serie):
+    """ISO 8601 primero (2026-01-02 es el 2 de enero); solo lo que no sea ISO se lee día/mes/año."""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    fechas = pd.to_datetime(serie, errors='coerce', format='ISO8601')
+    pendientes = fechas.isna() & serie.notna()
+    if pendientes.any():
+        fechas[pendientes] = pd.to_datetime(serie[pendientes], errors='coerce', dayfirst=True)
+    return fechas
+
+
+def _a_tipos(df):
+    """Componentes a float64 (acepta coma decimal en columnas de texto) y la fecha a datetime."""
+    for columna in df.columns:
+        if columna == COLUMNA_FECHA:
+            df[columna] = _a_fecha(df[columna])
+        elif not pd.api.types.is_numeric_dtype(df[columna]):
+            df[columna] = pd.to_numeric(df[columna].astype(str).str.replace(',', '.', regex=False), errors='coerce')
+        else:
+            df[columna] = df[columna].astype('float64')
+    return df
+
+
+def _importar(fuente, formato, muestra, perfil):
+    encabezado = _encabezado(fuente, formato, muestra)
+    if hasattr(fuente, 'seek'):
+        fuente.seek(0)
+    mapeo = mapeo_de_componentes(encabezado, perfil)
+    df = _leer(fuente, formato, list(mapeo), muestra).rename(columns=mapeo)
+    return _a_tipos(df)[[d for d in DESTINOS if d in df.columns]]
+
+
+def columnas_de(fuente, nombre=None):
+    """Encabezado de una exportación (bytes o archivo subido) sin leer los datos."""
+    contenido = fuente.getvalue() if hasattr(fuente, 'getvalue') else bytes(fuente)
+    formato = formato_de(nombre or getattr(fuente, 'name', None), contenido[:4])
+    return _encabezado(io.BytesIO(contenido), formato, contenido[:65536])
+
+
+def leer_tabla(fuente, perfil=None, nombre=None):
+    """Lee una exportación (ruta, bytes o archivo subido de Streamlit) como DataFrame con columnas de PM.
+
+    Las rutas se abren con memory-map (el hash del contenido se calcula sobre el mapa, sin
+    copiarlo) y el resultado se cachea por hash del contenido, perfil y versión de los perfiles.
+    """
+    PERFILES._verificar()
+    if isinstance(fuente, (str, Path)):
+        ruta = str(fuente)
+        with open(ruta, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            digesto = hashlib.blake2b(mapa, digest_size=16).hexdigest()
+            muestra = mapa[:65536]
+        formato = formato_de(ruta, muestra)
+        clave = (digesto, perfil, PERFILES.version)
+        with etapa('ingesta'):
+            return IMPORTACIONES.obtener(clave, lambda: _importar(ruta, formato, muestra, perfil))
+    contenido = fuente.getvalue() if hasattr(fuente, 'getvalue') else bytes(fuente)
+    nombre = nombre or getattr(fuente, 'name', None)
+    formato = formato_de(nombre, contenido[:4])
+    clave = (hashlib.blake2b(contenido, digest_size=16).hexdigest(), perfil, PERFILES.version)
+    with etapa('ingesta'):
+        return IMPORTACIONES.obtener(
+            clave, lambda: _importar(io.BytesIO(contenido), formato, contenido[:65536], perfil))
@@ -0,0 +1,109 @@
+"""Incertidumbre de las propiedades del gas por Monte Carlo.
+
+Cada muestra se perturba N veces con el error de repetibilidad del cromatógrafo (σ absoluto en
+% molar por componente) y todas las composiciones de un bloque de muestras se evalúan en una
+sola pasada de NumPy (arrays float32 muestras x sorteos x componentes). El tamaño del bloque se elige
+para no pasar de `memoria_mb`, así 10k sorteos x 1k muestras corre en segundos con memoria acotada.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from lts.especificaciones import CONTRATO_BASE
+from lts.gas import (COMPONENTES, INERTES, KCAL_POR_MJ, PM_aire, P_std, PROPIEDADES, R, T_std,
+                     matriz_composicion, reglas)
+from lts.instrumentacion import etapa
+from lts.propiedades import matriz_coeficientes, propiedades_reales
+
+# Repetibilidad típica de un GC de proceso (σ en % molar absoluto); H2S: 0.5 ppm
+SIGMA_REPETIBILIDAD = {
+    'CH4': 0.10, 'C2H6': 0.03, 'C3H8': 0.02,
+    'i-C4H10': 0.01, 'n-C4H10': 0.01, 'i-C5H12': 0.005, 'n-C5H12': 0.005,
+    'C6+': 0.005, 'N2': 0.03, 'CO2': 0.02, 'H2S': 0.00005, 'O2': 0.005
+}
+PROPIEDADES_MC = ['PCS (kcal/m3)', 'Wobbe', 'Densidad (kg/m3)', 'Gamma',
+                  'CO2 (%)', 'Inertes totales', 'O2 (%)', 'H2S ppm']
+MEMORIA_MC_MB = float(os.environ.get("LTS_MC_MB", 256))
+
+_I = {k: i for i, k in enumerate(COMPONENTES)}
+# [PM, HHV, √b] por componente en float32: PM, PCS ideal y Σ xi·√bi son lineales en la composición,
+# así que se calculan con un solo producto sin armar el array de fracciones normalizadas
+_LINEALES = np.column_stack([PROPIEDADES, matriz_coeficientes(tuple(COMPONENTES))[:, 0]]).astype(np.float32)
+
+
+def _propiedades(composiciones):
+    """Propiedades de PROPIEDADES_MC para un array (..., COMPONENTES) de composiciones en % molar."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pm, hhv, raiz_b = np.moveaxis(composiciones @ _LINEALES, -1, 0) / composiciones.sum(axis=-1)
+        reales = propiedades_reales(None, COMPONENTES, pm, hhv, P_std, R, T_std, PM_aire, rocio=False,
+                                    z=1.0 - raiz_b ** 2)
+        gamma = PM_aire / pm
+    return {
+        'PCS (kcal/m3)': reales['PCS (MJ/m3)'] * KCAL_POR_MJ,
+        'Wobbe': reales['Wobbe'],
+        'Densidad (kg/m3)': reales['Densidad (kg/m3)'],
+        'Gamma': gamma,
+        'CO2 (%)': composiciones[..., _I['CO2']],
+        'Inertes totales': composiciones[..., [_I[k] for k in INERTES]].sum(axis=-1),
+        'O2 (%)': composiciones[..., _I['O2']],
+        'H2S ppm': composiciones[..., _I['H2S']] * 1e4,
+    }
+
+
+def incertidumbre_lote(df, sorteos=10_000, sigma=None, escala=1.0, nivel=0.95, contrato=CONTRATO_BASE,
+                       semilla=None, memoria_mb=MEMORIA_MC_MB):
+    """Monte Carlo sobre cada fila de df (columnas de componentes en % molar).
+
+    sigma: {componente: σ} (por defecto SIGMA_REPETIBILIDAD), multiplicado por `escala`. Los
+    componentes informados en 0 (no detectados) no se perturban; el resto se trunca en 0 y se
+    normaliza como en analizar_lote.
+    Devuelve, por muestra y para cada propiedad, la media, el desvío y el intervalo de
+    confianza al `nivel` pedido ('<propiedad> IC inf' / 'IC sup'), la probabilidad de estar
+    fuera de cada especificación ('P(fuera) <parámetro>') y 'P(no cumple)' global.
+    """
+    sigma = dict(SIGMA_REPETIBILIDAD, **(sigma or {}))
+    desvios = (np.array([sigma[k] for k in COMPONENTES]) * escala).astype(np.float32)
+    x = matriz_composicion(df).astype(np.float32)
+    aplicables = [r for r in reglas(contrato) if r.columna in PROPIEDADES_MC]
+    cuantiles = [(1 - nivel) / 2, (1 + nivel) / 2]
+    # Bytes por muestra: composiciones float32 (perturbadas en el mismo array del ruido), productos
+    # lineales e inertes, propiedades (x3 por temporales y cuantiles) y banderas
+    por_muestra = sorteos * (len(COMPONENTES) * 4 + 3 * 4 * 2 + len(PROPIEDADES_MC) * 4 * 3 + len(aplicables) + 8)
+    bloque = max(1, int(memoria_mb * 2 ** 20 // por_muestra))
+    rng = np.random.default_rng(semilla)
+
+    salida = {}
+    for nombre in PROPIEDADES_MC:
+        for sufijo in ('media', 'σ', 'IC inf', 'IC sup'):
+            salida[f"{nombre} {sufijo}"] = np.empty(len(x))
+    for regla in aplicables:
+        salida[f"P(fuera) {regla.parametro}"] = np.empty(len(x))
+    salida['P(no cumple)'] = np.empty(len(x))
+
+    with etapa('incertidumbre'):
+        for inicio in range(0, len(x), bloque):
+            tramo = slice(inicio, inicio + bloque)
+            composiciones = rng.standard_normal((len(x[tramo]), sorteos, len(COMPONENTES)), dtype=np.float32)
+            composiciones *= desvios * (x[tramo, None, :] > 0)
+            composiciones += x[tramo, None, :]
+            np.maximum(composiciones, 0.0, out=composiciones)
+            valores = _propiedades(composiciones)
+            del composiciones
+            for nombre, v in valores.items():
+                salida[f"{nombre} media"][tramo] = v.mean(axis=1)
+                salida[f"{nombre} σ"][tramo] = v.std(axis=1, ddof=1)
+                salida[f"{nombre} IC inf"][tramo], salida[f"{nombre} IC sup"][tramo] = np.quantile(
+                    v, cuantiles, axis=1)
+            cumple = np.ones(valores['PCS (kcal/m3)'].shape, dtype=bool)
+            for regla in aplicables:
+                ok = regla.cumple(valores[regla.columna])
+                salida[f"P(fuera) {regla.parametro}"][tramo] = 1.0 - ok.mean(axis=1)
+                cumple &= ok
+            salida['P(no cumple)'][tramo] = 1.0 - cumple.mean(axis=1)
+    return pd.DataFrame(salida, index=df.index)
+
+
+def incertidumbre_composicion(composicion, sorteos=10_000, **opciones):
+    """incertidumbre_lote para una sola composición ({componente: % molar}); devuelve una Series."""
+    return incertidumbre_lote(pd.DataFrame([composicion]), sorteos, **opciones).iloc[0]
@@ -0,0 +1,326 @@
+import contextlib
+import contextvars
+import copy
+import functools
+import os
+from datetime import datetime
+from pathlib import Path
+
+from fpdf import FPDF
+
+from lts.certificados import certificado, contenido_qr, imagen_qr, obtener_indice
+from lts.especificaciones import CONTRATO_BASE
+from lts.gas import fila_a_resultados, reglas
+from lts.instrumentacion import etapa
+
+LOGO_PATH = str(Path(__file__).resolve().parent.parent / "LOGO PETROGAS.png")
+LOGO_LABORATORIO = "logopetrogas.png"
+# TTF Unicode opcional (p. ej. DejaVuSans.ttf): con ella el texto va tal cual, sin sanitizar
+FUENTE_TTF = os.environ.get("LTS_FUENTE_TTF")
+
+COLUMNAS_RESUMEN = [
+    'PM', 'PCS (kcal/m3)', 'Wobbe', 'Gamma', 'Densidad (kg/m3)',
+    'CO2 (%)', 'Inertes totales', 'O2 (%)', 'H2S ppm'
+]
+# Resultados que se informan como estimación y quedan fuera del certificado: el punto de rocío
+# con K de Wilson sobreestima a alta presión (p. ej. ~27 °C para 90 % CH4 con 0.1 % C6+)
+ESTIMACIONES = {
+    'Dew Point estimado (C)': "Punto de rocío HC a 5500 kPa, °C (estimación orientativa con K de Wilson; no certificado)",
+}
+VERDE = (198, 239, 206)
+ROJO = (255, 199, 206)
+
+
+@functools.lru_cache(maxsize=None)
+def _imagen_parseada(ruta):
+    # fpdf solo cachea imágenes dentro de un mismo documento; esto lo extiende a todo el proceso
+    try:
+        return FPDF()._parsepng(ruta)
+    except Exception:
+        return None
+
+
+# --------------------------- TEXTO LATIN-1 --------------------------- #
+# Las fuentes base de fpdf solo cubren latin-1. Una sola tabla de traducción, armada al importar,
+# reemplaza lo que tiene equivalente legible; lo que quede fuera de latin-1 sale como '?'.
+_TRADUCCION = str.maketrans({
+    **{chr(0x2080 + i): str(i) for i in range(10)},                   # subíndices ₀-₉
+    "⁰": "^0", **{chr(0x2074 + i): f"^{i + 4}" for i in range(6)},   # ⁰ ⁴-⁹ (¹²³ ya son latin-1)
+    "“": '"', "”": '"', "„": '"', "‘": "'", "’": "'", "‚": "'", "′": "'", "″": '"',
+    "–": "-", "—": "-", "‒": "-", "−": "-", "•": "-", "…": "...", "\u00a0": " ", "\u2009": " ",
+    "→": "->", "←": "<-", "↔": "<->", "⇒": "=>", "↑": "^", "↓": "v",
+    "≠": "!=", "≥": ">=", "≤": "<=", "≈": "~", "∆": "Delta ", "Δ": "Delta ", "√": "raiz ", "∞": "inf",
+    "✓": "OK", "✔": "OK", "✅": "OK", "✗": "NO", "✘": "NO", "❌": "NO", "⚠": "ATENCION",
+    "€": "EUR", "™": "(TM)", "\ufe0f": None, "\u200b": None,
+})
+
+
+@functools.lru_cache(maxsize=8192)
+def _a_latin1(texto):
+    # En un informe masivo se repiten sobre todo rótulos y unidades: se traducen una sola vez
+    texto = texto.translate(_TRADUCCION)
+    try:
+        texto.encode('latin-1')
+        return texto
+    except UnicodeEncodeError:
+        return texto.encode('latin-1', errors='replace').decode('latin-1')
+
+
+def limpiar_pdf_texto(texto):
+    """Lleva el texto a latin-1 en una sola pasada (str.translate) para las fuentes base de fpdf."""
+    texto = texto if isinstance(texto, str) else str(texto)
+    return texto if texto.isascii() else _a_latin1(texto)
+
+
+_DIFERIDOS = contextvars.ContextVar("lts_certificados_diferidos", default=None)
+
+
+@contextlib.contextmanager
+def certificados_diferidos():
+    """Junta los certificados de los PDF generados adentro en lugar de registrarlos.
+
+    Lo usan los procesos hijos de lts.exportacion: devuelven la lista y el proceso principal la
+    registra, así ninguna conexión SQLite cruza un fork.
+    """
+    pendientes = []
+    token = _DIFERIDOS.set(pendientes)
+    try:
+        yield pendientes
+    finally:
+        _DIFERIDOS.reset(token)
+
+
+def pdf_a_bytes(pdf):
+    """Bytes del PDF; los certificados que lleve quedan registrados en el índice de verificación."""
+    with etapa('pdf'):
+        salida = pdf.output(dest='S')
+        certificados = getattr(pdf, 'certificados', None)
+        if certificados:
+            pendientes = _DIFERIDOS.get()
+            if pendientes is None:
+                obtener_indice().registrar(certificados)
+            else:
+                pendientes.extend(certificados)
+        return salida.encode('latin1') if isinstance(salida, str) else bytes(salida)
+
+
+class PDFBase(FPDF):
+    """FPDF que nunca falla por caracteres fuera de latin-1.
+
+    Con `fuente_ttf` (o LTS_FUENTE_TTF) registra esa TTF Unicode en lugar de Arial y el texto no
+    se sanitiza; sin ella, todo texto pasa por limpiar_pdf_texto.
+    """
+
+    def __init__(self, *args, fuente_ttf=FUENTE_TTF, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fuente_unicode = None
+        if fuente_ttf and os.path.exists(fuente_ttf):
+            base = os.path.splitext(fuente_ttf)[0]
+            for estilo, sufijos in (('', ()), ('B', ('-Bold',)), ('I', ('-Oblique', '-Italic'))):
+                variante = next((base + s + '.ttf' for s in sufijos if os.path.exists(base + s + '.ttf')), fuente_ttf)
+                self.add_font('LTSUnicode', estilo, variante, uni=True)
+            self.fuente_unicode = 'LTSUnicode'
+        self.certificados = []
+
+    def set_font(self, family, style='', size=0):
+        if self.fuente_unicode and family.lower() in ('arial', 'helvetica'):
+            family, style = self.fuente_unicode, style.upper().replace('U', '')[:1]
+        super().set_font(family, style, size)
+
+    def normalize_text(self, txt):
+        return txt if self.unifontsubset else limpiar_pdf_texto(txt)
+
+    def certificar(self, muestra, resultados, cumple=None, lado=22):
+        """Dibuja el QR del certificado de la muestra arriba a la derecha y lo anota para registrarlo."""
+        emitido = certificado(muestra, resultados, getattr(self, 'titulo', ''), cumple)
+        nombre = f"qr_{emitido.codigo}.png"
+        if nombre not in self.images:
+            info = dict(imagen_qr(contenido_qr(emitido.codigo)))
+            info['i'] = len(self.images) + 1
+            self.images[nombre] = info
+        self.image(nombre, self.w - self.r_margin - lado, self.y, lado, lado)
+        self.certificados.append(emitido)
+        return emitido
+
+
+class _PDFConLogo(PDFBase):
+    def _registrar_imagen(self, ruta):
+        if ruta in self.images:
+            return True
+        info = _imagen_parseada(ruta)
+        if info is None:
+            return False
+        info = copy.copy(info)
+        info['i'] = len(self.images) + 1
+        self.images[ruta] = info
+        return True
+
+
+class InformePDF(_PDFConLogo):
+    def __init__(self, titulo, orientation='P', logo=LOGO_PATH):
+        super().__init__(orientation=orientation)
+        self.titulo = titulo
+        self.logo = logo
+        self.set_auto_page_break(True, margin=15)
+
+    def header(self):
+        if self.logo and self._registrar_imagen(self.logo):
+            self.image(self.logo, x=10, y=8, w=25)
+        self.set_font('Arial', 'B', 12)
+        self.cell(0, 10, self.titulo, 0, 1, 'C')
+        self.ln(5)
+
+    def add_sample(self, nombre, resultados):
+        validacion = resultados.get('Validación')
+        cumple = all(regla.cumple(valor) for valor, regla in validacion.values()) if validacion else None
+        emitido = self.certificar(nombre, {k: v for k, v in resultados.items() if k not in ESTIMACIONES}, cumple)
+        self.set_font('Arial', '', 10)
+        self.cell(0, 10, f"Muestra: {nombre}", 0, 1)
+        for k, v in resultados.items():
+            if k != 'Validación' and k not in ESTIMACIONES:
+                try:
+                    self.cell(0, 8, f"{k}: {v:.4f}" if isinstance(v, float) else f"{k}: {v}", 0, 1)
+                except Exception:
+                    self.cell(0, 8, f"{k}: [ERROR AL MOSTRAR]", 0, 1)
+        self.set_font('Arial', 'I', 8)
+        for k, etiqueta in ESTIMACIONES.items():
+            if k in resultados:
+                self.cell(0, 6, f"{etiqueta}: {resultados[k]:.1f}", 0, 1)
+        self.ln(3)
+        if validacion:
+            self.set_font('Arial', 'B', 10)
+            self.cell(0, 8, 'Validación de parámetros:', 0, 1)
+            self.set_font('Arial', '', 10)
+            for param, (valor, regla) in validacion.items():
+                estado = 'CUMPLE' if regla.cumple(valor) else 'NO CUMPLE'
+                self.cell(0, 8, f"{estado} {param}: {valor:.2f} ({regla.texto()})", 0, 1)
+        self.set_font('Arial', 'I', 7)
+        self.cell(0, 5, f"Certificado {emitido.codigo} - verificable con el QR o con 'python -m lts verificar'", 0, 1)
+        self.ln(5)
+
+    # --------------------------- TABLA DE LOTE --------------------------- #
+    def tabla_resumen(self, lote, columnas=COLUMNAS_RESUMEN, nombres=None, contrato=CONTRATO_BASE):
+        """Una fila por muestra; las celdas de parámetros validados se sombrean según CUMPLE/NO CUMPLE."""
+        nombres = list(lote.index.astype(str)) if nombres is None else list(nombres)
+        bandera_de = {r.columna: f"{r.parametro} cumple" for r in reglas(contrato)}
+        banderas = {col: lote[bandera_de[col]].to_numpy() for col in columnas if col in bandera_de}
+        valores = {col: lote[col].to_numpy() for col in columnas}
+        global_ok = lote['Cumple'].to_numpy()
+
+        ancho_util = self.w - self.l_margin - self.r_margin
+        ancho_nombre, ancho_estado = 30, 24
+        ancho = (ancho_util - ancho_nombre - ancho_estado) / len(columnas)
+        alto = 5
+
+        def encabezado():
+            self.set_font('Arial', 'B', 7)
+            self.set_fill_color(220, 220, 220)
+            self.cell(ancho_nombre, alto, 'Muestra', 1, 0, 'C', True)
+            for col in columnas:
+                self.cell(ancho, alto, col, 1, 0, 'C', True)
+            self.cell(ancho_estado, alto, 'Estado', 1, 1, 'C', True)
+            self.set_font('Arial', '', 7)
+
+        encabezado()
+        limite = self.page_break_trigger
+        for i, nombre in enumerate(nombres):
+            if self.y + alto > limite:
+                self.add_page()
+                encabezado()
+            self.cell(ancho_nombre, alto, nombre[:20], 1, 0, 'L')
+            for col in columnas:
+                bandera = banderas.get(col)
+                if bandera is not None:
+                    self.set_fill_color(*(VERDE if bandera[i] else ROJO))
+                self.cell(ancho, alto, f"{valores[col][i]:.4g}", 1, 0, 'R', bandera is not None)
+            self.set_fill_color(*(VERDE if global_ok[i] else ROJO))
+            self.cell(ancho_estado, alto, 'CUMPLE' if global_ok[i] else 'NO CUMPLE', 1, 1, 'C', True)
+
+    def especificaciones(self, contrato=CONTRATO_BASE):
+        self.ln(3)
+        self.set_font('Arial', 'B', 8)
+        self.cell(0, 5, f'Especificaciones (contrato {contrato}):', 0, 1)
+        self.set_font('Arial', '', 8)
+        for regla in reglas(contrato):
+            self.cell(0, 4, f"{regla.parametro}: {regla.texto()}", 0, 1)
+
+
+def generar_informe_lote(lote, titulo="Informe de Calidad - Gas Natural", nombres=None, detalle=False,
+                         contrato=CONTRATO_BASE):
+    """Arma un único PDF con la tabla resumen de un resultado de analizar_lote y, opcionalmente,
+    una página de detalle por muestra. Devuelve los bytes del PDF."""
+    pdf = InformePDF(titulo, orientation='L')
+    pdf.add_page()
+    pdf.tabla_resumen(lote, nombres=nombres, contrato=contrato)
+    pdf.especificaciones(contrato)
+    if detalle:
+        nombres = list(lote.index.astype(str)) if nombres is None else list(nombres)
+        for nombre, (_, fila) in zip(nombres, lote.iterrows()):
+            pdf.add_page()
+            pdf.add_sample(nombre, fila_a_resultados(fila, contrato))
+    return pdf_a_bytes(pdf)
+
+
+def informe_muestra(titulo, nombre, resultados):
+    """PDF de una sola muestra (mismo formato que el botón de descarga de app_final.py)."""
+    pdf = InformePDF(titulo)
+    pdf.add_page()
+    pdf.add_sample(nombre, resultados)
+    return pdf_a_bytes(pdf)
+
+
+# --------------------------- INFORME DE LABORATORIO --------------------------- #
+class InformeLaboratorio(_PDFConLogo):
+    titulo = "Informe de análisis de laboratorio"
+
+    def __init__(self, logo=LOGO_LABORATORIO):
+        super().__init__()
+        self.logo = logo
+
+    def header(self):
+        if self._registrar_imagen(self.logo):
+            self.image(self.logo, 10, 8, 33)
+        self.set_font("Arial", "B", 12)
+        self.cell(0, 10, "INFORME DE ANÁLISIS DE LABORATORIO", 0, 1, "C")
+        self.set_font("Arial", "", 10)
+        self.cell(0, 10, f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M')}", 0, 1, "R")
+        self.ln(5)
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font("Arial", "I", 8)
+        self.cell(0, 10, "Confidencial - Uso interno PETROGAS", 0, 0, "C")
+
+    def add_section(self, title, content):
+        self.set_font("Arial", "B", 11)
+        self.cell(0, 10, title, 0, 1)
+        self.set_font("Arial", "", 10)
+        if isinstance(content, dict):
+            for k, v in content.items():
+                self.cell(0, 8, f"{k}: {v}", 0, 1)
+        else:
+            self.multi_cell(0, 8, str(content))
+        self.ln(2)
+
+
+def informe_laboratorio(operador, explicacion, resultados, observaciones, muestreo_en, muestra_por,
+                        validacion=None):
+    """PDF de un análisis de app_simple.py con el QR de su certificado.
+
+    validacion: {parámetro: (valor, regla)} de las especificaciones evaluadas, como la 'Validación'
+    de analizar_composicion; sus textos, el contrato y el veredicto entran en el certificado.
+    """
+    pdf = InformeLaboratorio()
+    pdf.add_page()
+    cumple = all(regla.cumple(valor) for valor, regla in validacion.values()) if validacion else None
+    emitido = pdf.certificar(muestreo_en or "Muestra", {
+        'Operador': operador, 'Muestra tomada por': muestra_por, **resultados, 'Validación': validacion}, cumple)
+    pdf.add_section("Operador", operador)
+    pdf.add_section("Muestreo en", muestreo_en)
+    pdf.add_section("Muestra tomada por", muestra_por)
+    pdf.add_section("Explicación técnica", explicacion)
+    pdf.add_section("Resultados", resultados)
+    pdf.add_section("Observaciones", observaciones or "Sin observaciones.")
+    pdf.set_font("Arial", "I", 7)
+    pdf.cell(0, 5, f"Certificado {emitido.codigo} - verificable con el QR o con 'python -m lts verificar'", 0, 1)
+    return pdf_a_bytes(pdf)
@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+
+from lts.calidad_datos import COLUMNAS_ATIPICO, ControlCalidad
+from lts.especificaciones import CONTRATO_BASE
+from lts.gas import PM, analizar_lote
+from lts.importacion import COLUMNA_FECHA, dialecto_csv, formato_de, leer_tabla, mapeo_de_componentes
+from lts.instrumentacion import etapa
+
+COLUMNAS_FECHA = ['Fecha', 'fecha', 'Fecha/Hora', 'Timestamp', 'timestamp']
+TAMANO_BLOQUE = 100_000
+MAX_EJEMPLOS = 1000  # filas rechazadas / atípicas que se guardan como ejemplo (el resto solo se cuenta)
+
+
+def _rebobinar(archivo):
+    if hasattr(archivo, 'seek'):
+        archivo.seek(0)
+
+
+def detectar_columna_fecha(archivo):
+    """Nombre de la columna de fecha de un CSV o de un DataFrame ya leído; None si no tiene."""
+    if isinstance(archivo, pd.DataFrame):
+        columnas = archivo.columns
+    else:
+        columnas = pd.read_csv(archivo, nrows=0).columns
+        _rebobinar(archivo)
+    return next((c for c in COLUMNAS_FECHA if c in columnas), None)
+
+
+def _muestra(archivo, n=65536):
+    """Primeros bytes de una ruta o de un archivo abierto (que queda rebobinado)."""
+    if hasattr(archivo, 'read'):
+        muestra = archivo.read(n)
+        _rebobinar(archivo)
+        return muestra
+    with open(archivo, 'rb') as f:
+        return f.read(n)
+
+
+def leer_por_bloques(archivo, columna_fecha=None, tamano_bloque=TAMANO_BLOQUE, dtype=np.float64, mapeo=None,
+                     separador=',', decimal='.'):
+    """Itera el CSV en bloques leyendo solo las columnas de PM (y la fecha, si se indica).
+
+    Con `mapeo` ({columna de origen: componente}) se leen esas columnas y se renombran.
+    """
+    mapeo = {k: v for k, v in (mapeo or {k: k for k in PM}).items() if v in PM}
+    columnas = set(mapeo) | ({columna_fecha} if columna_fecha else set())
+    bloques = pd.read_csv(
+        archivo,
+        sep=separador,
+        decimal=decimal,
+        usecols=lambda c: c in columnas,
+        dtype={k: dtype for k in mapeo},
+        chunksize=tamano_bloque,
+    )
+    return (bloque.rename(columns=mapeo) for bloque in bloques)
+
+
+class AgregadorDiario:
+    """Acumula min/max/media diarios de PCS y Wobbe y el conteo de muestras fuera de especificación.
+
+    El estado es una fila por día, así que la memoria no depende del tamaño del archivo; de las
+    filas rechazadas y atípicas se cuentan todas (self.control) y se guardan las primeras
+    `max_ejemplos` de cada tipo.
+    """
+
+    VARIABLES = ['PCS (kcal/m3)', 'Wobbe']
+
+    def __init__(self, max_ejemplos=MAX_EJEMPLOS):
+        self._parcial = None
+        self.muestras = 0
+        self.fuera_de_spec = 0
+        self.control = ControlCalidad()
+        self.max_ejemplos = max_ejemplos
+        self._rechazos = []
+        self._atipicos = []
+
+    def agregar(self, resultados, fechas=None):
+        if fechas is None:
+            dia = pd.Series('Total', index=resultados.index)
+        else:
+            dia = pd.to_datetime(fechas, errors='coerce').dt.normalize()
+        bloque = resultados[self.VARIABLES].copy()
+        bloque['NO CUMPLE'] = ~resultados['Cumple']
+        g = bloque.groupby(dia.to_numpy())
+        parcial = pd.concat({
+            'min': g[self.VARIABLES].min(),
+            'max': g[self.VARIABLES].max(),
+            'suma': g[self.VARIABLES].sum(),
+            'n': g[self.VARIABLES].count(),
+        }, axis=1)
+        parcial[('NO CUMPLE', '')] = g['NO CUMPLE'].sum()
+        parcial[('Muestras', '')] = g.size()
+        self._parcial = parcial if self._parcial is None else self._combinar(self._parcial, parcial)
+        self.muestras += len(resultados)
+        self.fuera_de_spec += int(bloque['NO CUMPLE'].sum())
+
+    @staticmethod
+    def _combinar(a, b):
+        indice = a.index.union(b.index)
+        a, b = a.reindex(indice), b.reindex(indice)
+        combinado = a.copy()
+        combinado['min'] = np.fmin(a['min'], b['min'])
+        combinado['max'] = np.fmax(a['max'], b['max'])
+        for col in ['suma', 'n', 'NO CUMPLE', 'Muestras']:
+            combinado[col] = a[col].fillna(0) + b[col].fillna(0)
+        return combinado
+
+    def _ejemplos(self, guardadas, filas):
+        faltan = self.max_ejemplos - sum(len(f) for f in guardadas)
+        if faltan > 0 and len(filas):
+            guardadas.append(filas.iloc[:faltan].copy())  # copia: no retener el bloque entero
+
+    def rechazar(self, rechazos):
+        self._ejemplos(self._rechazos, rechazos)
+
+    def informe_rechazos(self):
+        """Primeras `max_ejemplos` filas descartadas por el control de datos, con su motivo."""
+        return pd.concat(self._rechazos) if self._rechazos else pd.DataFrame()
+
+    def marcar_atipicos(self, resultados):
+        self._ejemplos(self._atipicos, resultados[resultados['Atípico']])
+
+    def informe_atipicos(self):
+        """Primeras `max_ejemplos` filas atípicas (analizadas igual) con su motivo y su veredicto."""
+        return pd.concat(self._atipicos) if self._atipicos else pd.DataFrame()
+
+    def resumen(self):
+        if self._parcial is None:
+            return pd.DataFrame()
+        p = self._parcial.sort_index()
+        resumen = pd.DataFrame(index=p.index)
+        for var in self.VARIABLES:
+            resumen[f"{var} min"] = p[('min', var)]
+            resumen[f"{var} max"] = p[('max', var)]
+            resumen[f"{var} media"] = p[('suma', var)] / p[('n', var)]
+        resumen['Muestras'] = p[('Muestras', '')].astype(int)
+        resumen['NO CUMPLE'] = p[('NO CUMPLE', '')].astype(int)
+        resumen.index.name = 'Día'
+        return resumen
+
+
+def _bloques_de_tabla(archivo, perfil, tamano_bloque):
+    df = leer_tabla(archivo, perfil)
+    return (df.iloc[i:i + tamano_bloque] for i in range(0, len(df), tamano_bloque))
+
+
+def procesar_historico(archivo, valor_dolar=2.25, tamano_bloque=TAMANO_BLOQUE, dtype=np.float64, perfil=None,
+                       contrato=CONTRATO_BASE):
+    """Procesa un histórico de cromatografía por bloques y devuelve el AgregadorDiario resultante.
+
+    Cada muestra se valida contra las especificaciones de `contrato`.
+
+    Los CSV se leen por bloques; XLSX y Parquet se leen enteros con leer_tabla (con proyección
+    de columnas) y se procesan en tramos del mismo tamaño. Cada bloque pasa antes por el control
+    de datos del agregador (su ventana de historia sigue de un bloque al otro) y solo se analizan
+    las filas limpias; las primeras rechazadas quedan en agregador.informe_rechazos() y las
+    primeras atípicas, que se analizan igual, en agregador.informe_atipicos().
+    """
+    agregador = AgregadorDiario()
+    if formato_de(getattr(archivo, 'name', archivo)) != 'csv':
+        columna_fecha = COLUMNA_FECHA
+        bloques = _bloques_de_tabla(archivo, perfil, tamano_bloque)
+    else:
+        # Mismo dialecto (';' con coma decimal) y mismo error sin columnas reconocibles que leer_tabla
+        separador, decimal = dialecto_csv(_muestra(archivo))
+        encabezado = pd.read_csv(archivo, sep=separador, nrows=0).columns
+        _rebobinar(archivo)
+        mapeo = mapeo_de_componentes(encabezado, perfil)
+        columna_fecha = next((c for c, d in mapeo.items() if d == COLUMNA_FECHA), None) \
+            or next((c for c in COLUMNAS_FECHA if c in encabezado), None)
+        bloques = leer_por_bloques(archivo, columna_fecha, tamano_bloque, dtype, mapeo, separador, decimal)
+    while True:
+        with etapa('ingesta'):
+            bloque = next(bloques, None)
+        if bloque is None:
+            break
+        bloque, rechazos = agregador.control.revisar(bloque)
+        agregador.rechazar(rechazos)
+        with etapa('análisis'):
+            resultados = analizar_lote(bloque, valor_dolar, contrato).join(bloque[COLUMNAS_ATIPICO])
+            agregador.marcar_atipicos(resultados)
+            agregador.agregar(resultados, bloque[columna_fecha] if columna_fecha in bloque else None)
+    return agregador
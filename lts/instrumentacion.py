@@ -0,0 +1,108 @@
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import time
+from collections import deque
+
+logger = logging.getLogger("lts.instrumentacion")
+
+_ACTIVA = contextvars.ContextVar("lts_instrumentacion", default=None)
+_NULO = contextlib.nullcontext()
+_PAGINA_MB = os.sysconf("SC_PAGE_SIZE") / 2**20 if hasattr(os, "sysconf") else None
+
+
+def rss_mb():
+    """RSS actual del proceso en MB (en Linux desde /proc; si no, el pico de getrusage; NaN en Windows)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGINA_MB
+    except (OSError, TypeError):
+        pass
+    try:
+        import resource  # solo Unix
+    except ImportError:
+        return float('nan')
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Instrumentacion:
+    """Tiempos y deltas de memoria por etapa para una sesión (o para un proceso en la CLI)."""
+
+    def __init__(self, max_registros=1000):
+        self.registros = deque(maxlen=max_registros)
+        self.ejecucion = []
+        self.totales = {}
+
+    def iniciar_ejecucion(self):
+        self.ejecucion = []
+
+    @contextlib.contextmanager
+    def etapa(self, nombre):
+        memoria = rss_mb()
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            registro = {
+                'etapa': nombre,
+                'segundos': time.perf_counter() - inicio,
+                'memoria_mb': rss_mb() - memoria,
+                'fecha': time.time(),
+            }
+            self.registros.append(registro)
+            self.ejecucion.append(registro)
+            total = self.totales.setdefault(nombre, {'llamadas': 0, 'segundos': 0.0, 'maximo': 0.0})
+            total['llamadas'] += 1
+            total['segundos'] += registro['segundos']
+            total['maximo'] = max(total['maximo'], registro['segundos'])
+            logger.debug("etapa=%s segundos=%.6f memoria_mb=%.2f", nombre, registro['segundos'],
+                         registro['memoria_mb'])
+
+    def json_lineas(self):
+        return "\n".join(json.dumps(r, ensure_ascii=False) for r in self.registros)
+
+    def prometheus(self):
+        lineas = [
+            "# HELP lts_etapa_llamadas_total Ejecuciones de cada etapa.",
+            "# TYPE lts_etapa_llamadas_total counter",
+        ]
+        lineas += [f'lts_etapa_llamadas_total{{etapa="{e}"}} {t["llamadas"]}' for e, t in self.totales.items()]
+        lineas += [
+            "# HELP lts_etapa_segundos_total Tiempo acumulado de cada etapa.",
+            "# TYPE lts_etapa_segundos_total counter",
+        ]
+        lineas += [f'lts_etapa_segundos_total{{etapa="{e}"}} {t["segundos"]:.6f}' for e, t in self.totales.items()]
+        lineas += [
+            "# HELP lts_etapa_segundos_max Duración máxima observada de cada etapa.",
+            "# TYPE lts_etapa_segundos_max gauge",
+        ]
+        lineas += [f'lts_etapa_segundos_max{{etapa="{e}"}} {t["maximo"]:.6f}' for e, t in self.totales.items()]
+        return "\n".join(lineas) + "\n"
+
+
+def activar(instrumentacion):
+    """Activa la instrumentación en el contexto actual (None la desactiva)."""
+    _ACTIVA.set(instrumentacion)
+    if instrumentacion is not None:
+        instrumentacion.iniciar_ejecucion()
+
+
+def etapa(nombre):
+    """Context manager de medición; si no hay instrumentación activa no hace nada."""
+    instrumentacion = _ACTIVA.get()
+    return _NULO if instrumentacion is None else instrumentacion.etapa(nombre)
+
+
+def panel_depuracion(st, instrumentacion):
+    """Dibuja en la barra lateral las etapas de la última ejecución y las descargas de métricas."""
+    import pandas as pd
+
+    with st.sidebar.expander("🐞 Tiempos por etapa", expanded=True):
+        if instrumentacion.ejecucion:
+            st.dataframe(pd.DataFrame(instrumentacion.ejecucion)[['etapa', 'segundos', 'memoria_mb']])
+        st.download_button("Logs (JSON)", instrumentacion.json_lineas(), file_name="lts_etapas.jsonl",
+                           mime="application/json")
+        st.download_button("Métricas (Prometheus)", instrumentacion.prometheus(), file_name="lts_metricas.prom",
+                           mime="text/plain")
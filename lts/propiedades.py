@@ -0,0 +1,92 @@
+import functools
+
+import numpy as np
+
+# --------------------------- COEFICIENTES POR COMPONENTE --------------------------- #
+# Factor de sumación √b a 15 °C (ISO 6976 / GPA 2172) y propiedades críticas para las K de Wilson.
+# C6+ se representa con n-hexano.
+SUMACION = {
+    'CH4': 0.0447, 'C2H6': 0.0922, 'C3H8': 0.1338,
+    'i-C4H10': 0.1789, 'n-C4H10': 0.1871, 'i-C5H12': 0.2280, 'n-C5H12': 0.2510,
+    'C6+': 0.3286, 'N2': 0.0173, 'CO2': 0.0748, 'H2S': 0.0922, 'O2': 0.0283
+}
+CRITICAS = {  # Tc (K), Pc (kPa), factor acéntrico
+    'CH4': (190.56, 4599.0, 0.011), 'C2H6': (305.32, 4872.0, 0.099), 'C3H8': (369.83, 4248.0, 0.152),
+    'i-C4H10': (407.80, 3640.0, 0.186), 'n-C4H10': (425.12, 3796.0, 0.200),
+    'i-C5H12': (460.40, 3381.0, 0.229), 'n-C5H12': (469.70, 3370.0, 0.252),
+    'C6+': (507.60, 3025.0, 0.301), 'N2': (126.20, 3394.0, 0.037), 'CO2': (304.13, 7377.0, 0.224),
+    'H2S': (373.10, 8963.0, 0.090), 'O2': (154.58, 5043.0, 0.022)
+}
+Z_AIRE = 0.99958
+P_ROCIO = 5500.0  # kPa, presión de referencia del punto de rocío de hidrocarburos
+T_MIN, T_MAX = 120.0, 500.0  # K, intervalo de búsqueda del punto de rocío
+
+
+@functools.lru_cache(maxsize=None)
+def matriz_coeficientes(componentes):
+    """Matriz componentes x [√b, Tc, Pc, ω], armada una vez por tupla de componentes."""
+    return np.array([[SUMACION[k], *CRITICAS[k]] for k in componentes])
+
+
+def factor_z(fracciones, componentes):
+    """Z a condiciones estándar: Z = 1 - (Σ xi·√bi)²."""
+    raiz_b = matriz_coeficientes(tuple(componentes))[:, 0]
+    return 1.0 - (fracciones @ raiz_b) ** 2
+
+
+def punto_rocio(fracciones, componentes, presion=P_ROCIO, tolerancia=1e-3, iteraciones=50):
+    """Punto de rocío de hidrocarburos (°C) a `presion` kPa, resolviendo Σ zi/Ki(T) = 1 con K de Wilson.
+
+    Newton vectorizado sobre todas las muestras a la vez, hasta que el paso de todas quede bajo
+    `tolerancia` K; NaN si no hay raíz en [T_MIN, T_MAX].
+    """
+    coef = matriz_coeficientes(tuple(componentes))
+    tc, pc, w = coef[:, 1], coef[:, 2], coef[:, 3]
+    a = 5.373 * (1.0 + w)
+    # ln Ki = ln(Pc/P) + a·(1 - Tc/T) es lineal en u = 1/T: ln Ki = c - b·u
+    b = a * tc
+    c = np.log(pc / presion) + a
+    z = np.atleast_2d(fracciones)
+
+    def exceso(u):
+        # ln Σ zi/Ki y su derivada en u: creciente y convexa, así Newton desde u = 1/T_MIN (lado
+        # positivo) baja monótonamente hasta la raíz sin pasarse ni salir del intervalo
+        terminos = z * np.exp(b * u[:, None] - c)
+        suma = terminos.sum(axis=1)
+        return np.log(suma), (terminos @ b) / suma
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        u = np.full(len(z), 1.0 / T_MIN)
+        valido = (exceso(u)[0] > 0) & (exceso(np.full(len(z), 1.0 / T_MAX))[0] < 0)
+        for _ in range(iteraciones):
+            f, derivada = exceso(u)
+            paso = np.where(valido, f / derivada, 0.0)
+            u -= paso
+            if not (paso / u ** 2 > tolerancia).any():  # ΔT ≈ Δu·T²
+                break
+        t = np.where(valido, 1.0 / u, np.nan) - 273.15
+    return t if np.ndim(fracciones) == 2 else t[0]
+
+
+def propiedades_reales(fracciones, componentes, pm, hhv_ideal, presion_std, r, t_std, pm_aire, rocio=True, z=None):
+    """Propiedades de gas real a condiciones estándar a partir de fracciones molares normalizadas.
+
+    pm en g/mol y hhv_ideal en MJ/m3; devuelve Z, densidad (kg/m3), PCS real (MJ/m3),
+    densidad relativa, Wobbe (MJ/m3) y punto de rocío de hidrocarburos (°C). Con rocio=False se
+    omite el punto de rocío (lo más caro cuando hay millones de composiciones);
+    si además se pasa `z` ya calculado, `fracciones` no se usa.
+    """
+    z = factor_z(fracciones, componentes) if z is None else z
+    densidad = (pm / 1000.0) * presion_std / (z * r * t_std)
+    pcs = hhv_ideal / z
+    densidad_relativa = (pm / pm_aire) * (Z_AIRE / z)
+    propiedades = {
+        'Z': z,
+        'Densidad (kg/m3)': densidad,
+        'PCS (MJ/m3)': pcs,
+        'Densidad relativa': densidad_relativa,
+        'Wobbe': pcs / np.sqrt(densidad_relativa),
+    }
+    if rocio:
+        propiedades['Dew Point estimado (C)'] = punto_rocio(fracciones, componentes)
+    return propiedades
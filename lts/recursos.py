@@ -0,0 +1,189 @@
+import base64
+import functools
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+# Los módulos importados sobreviven a los reruns de Streamlit: todo lo que vive acá se
+# calcula una vez por proceso (equivalente a st.cache_resource, sin depender de Streamlit).
+# Con varios usuarios en el mismo servidor, LTS_CACHE_MB acota la memoria de los caches.
+MEMORIA_CACHE_MB = float(os.environ.get("LTS_CACHE_MB", 512))
+
+CSS = """
+    <style>
+        .stApp { background-color: #1e1e1e; color: white; }
+        .stButton>button, .stDownloadButton>button {
+            background-color: #0d6efd; color: white; border-radius: 8px; border: none;
+        }
+        input, textarea, .stTextInput, .stTextArea, .stNumberInput input {
+            background-color: #2e2e2e !important; color: white !important; border: 1px solid #555 !important;
+        }
+        .stSelectbox div { background-color: #2e2e2e !important; color: white !important; }
+    </style>
+"""
+
+CACHES = {}
+
+
+def tamano_aproximado(valor):
+    """Bytes aproximados de un valor cacheado: buffers de numpy/pandas más la cáscara de Python."""
+    if isinstance(valor, (bytes, bytearray, str)):
+        return sys.getsizeof(valor)
+    if hasattr(valor, 'memory_usage'):  # DataFrame / Series
+        uso = valor.memory_usage(index=True)
+        return int(uso.sum()) if hasattr(uso, 'sum') else int(uso)
+    if hasattr(valor, 'nbytes'):  # ndarray, TablaResultados
+        return int(valor.nbytes)
+    if isinstance(valor, (tuple, list)):
+        return sys.getsizeof(valor) + sum(tamano_aproximado(v) for v in valor)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamano_aproximado(k) + tamano_aproximado(v) for k, v in valor.items())
+    if hasattr(valor, '__dict__'):
+        return sys.getsizeof(valor) + tamano_aproximado(vars(valor))
+    return sys.getsizeof(valor)
+
+
+class CacheLRU:
+    """Cache LRU en memoria del proceso, compartido por todas las sesiones.
+
+    Desaloja por cantidad de entradas y por memoria (`max_mb`, estimada con tamano_aproximado al
+    guardar y, para valores que crecen, de nuevo con actualizar(clave)). Si varias sesiones piden la misma clave a la vez, solo una la calcula y el resto
+    espera ese resultado.
+    """
+
+    def __init__(self, nombre, max_entradas=64, max_mb=None):
+        self.nombre = nombre
+        self.max_entradas = max_entradas
+        self.max_bytes = max_mb * 2**20 if max_mb else None
+        self._datos = OrderedDict()  # clave -> (valor, bytes)
+        self._en_curso = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        CACHES[nombre] = self
+
+    def _acierto(self, clave):
+        self._datos.move_to_end(clave)
+        self.aciertos += 1
+        return self._datos[clave][0]
+
+    def obtener(self, clave, calcular):
+        with self._lock:
+            if clave in self._datos:
+                return self._acierto(clave)
+            evento = self._en_curso.get(clave)
+            if evento is None:
+                self.fallos += 1
+                evento = self._en_curso[clave] = threading.Event()
+                propio = True
+            else:
+                propio = False
+        if not propio:
+            evento.wait()
+            with self._lock:
+                if clave in self._datos:
+                    return self._acierto(clave)
+            return self.obtener(clave, calcular)  # el cálculo falló o la entrada ya se desalojó
+        try:
+            valor = calcular()
+            self._guardar(clave, valor, tamano_aproximado(valor))
+        finally:
+            with self._lock:
+                self._en_curso.pop(clave).set()
+        return valor
+
+    def _guardar(self, clave, valor, tamano):
+        with self._lock:
+            if self.max_bytes and tamano > self.max_bytes:
+                return  # más grande que todo el cache: se devuelve sin guardar
+            if clave in self._datos:
+                self.bytes -= self._datos.pop(clave)[1]
+            self._datos[clave] = (valor, tamano)
+            self.bytes += tamano
+            self._desalojar()
+
+    def _desalojar(self):
+        while len(self._datos) > self.max_entradas or (self.max_bytes and self.bytes > self.max_bytes):
+            self.bytes -= self._datos.popitem(last=False)[1][1]
+            self.desalojos += 1
+
+    def actualizar(self, clave):
+        """Vuelve a medir una entrada que creció después de guardarse (p. ej. una Tendencia) y desaloja.
+
+        Si la entrada sola ya no entra en el cache, se descarta: quien la tiene la sigue usando,
+        pero la próxima vez se recalcula.
+        """
+        with self._lock:
+            if clave not in self._datos:
+                return
+            valor, anterior = self._datos.pop(clave)
+            self.bytes -= anterior
+            tamano = tamano_aproximado(valor)
+            if self.max_bytes and tamano > self.max_bytes:
+                self.desalojos += 1
+                return
+            self._datos[clave] = (valor, tamano)
+            self.bytes += tamano
+            self._desalojar()
+
+    def contiene(self, clave):
+        with self._lock:
+            return clave in self._datos
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self.bytes = 0
+
+    def estadisticas(self):
+        return {
+            'cache': self.nombre,
+            'entradas': len(self._datos),
+            'MB': round(self.bytes / 2**20, 2),
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'desalojos': self.desalojos,
+        }
+
+
+def estadisticas_caches():
+    filas = [cache.estadisticas() for cache in CACHES.values()]
+    for funcion in (logo_base64,):
+        info = funcion.cache_info()
+        filas.append({'cache': funcion.__name__, 'entradas': info.currsize,
+                      'aciertos': info.hits, 'fallos': info.misses})
+    return filas
+
+
+def huella(contenido, *parametros):
+    """Clave de cache: hash del contenido del archivo subido más los parámetros que afectan el cálculo."""
+    return (hashlib.blake2b(contenido, digest_size=16).hexdigest(),) + parametros
+
+
+@functools.lru_cache(maxsize=None)
+def logo_base64(ruta):
+    if not Path(ruta).exists():
+        return None
+    return base64.b64encode(Path(ruta).read_bytes()).decode("utf-8")
+
+
+ANALISIS = CacheLRU('análisis', max_entradas=256, max_mb=MEMORIA_CACHE_MB * 0.4)
+INFORMES = CacheLRU('informes PDF', max_entradas=512, max_mb=MEMORIA_CACHE_MB * 0.2)
+
+
+def descarga_diferida(st, etiqueta, clave, generar, nombre_archivo, mime="application/pdf"):
+    """Botón de descarga que recién genera los bytes cuando el usuario los pide.
+
+    Muestra "Preparar ..." y, al pulsarlo, genera con `generar()` (memoizado en INFORMES bajo
+    `clave`) y ofrece la descarga. Si esa clave ya se generó antes, la descarga aparece directo.
+    Así las ediciones en los widgets solo recalculan el análisis, no el informe.
+    """
+    id_widget = hashlib.blake2b(repr(clave).encode(), digest_size=8).hexdigest()
+    if INFORMES.contiene(clave) or st.button(f"⚙️ Preparar {etiqueta}", key=f"preparar_{id_widget}"):
+        st.download_button(f"📥 Descargar {etiqueta}", data=INFORMES.obtener(clave, generar),
+                           file_name=nombre_archivo, mime=mime, key=f"descargar_{id_widget}")
@@ -0,0 +1,156 @@
+"""Contenedor columnar de resultados de Gas Natural.
+
+Un dict de resultados (12 floats con claves str, más fecha y veredicto) ocupa unos 800 bytes
+por muestra, y más de 1 KB con 'Validación'. Acá cada muestra es una fila de columnas float64 de esquema fijo (RESULTADOS) más la
+fecha (datetime64[ns]) y el veredicto (bool): 105 bytes. Las columnas son contiguas
+(orden Fortran), así que a_pandas/a_arrow/columna devuelven vistas sin copiar.
+"""
+import numpy as np
+import pandas as pd
+
+from lts.gas import RESULTADOS
+
+ATRIBUTOS = (
+    'pm', 'pcs_mj', 'pcs_kcal', 'gamma', 'wobbe', 'densidad', 'z',
+    'dew_point', 'co2', 'h2s_ppm', 'carga_h2s', 'ingreso'
+)
+_COLUMNA = dict(zip(RESULTADOS, range(len(RESULTADOS))))
+
+
+class Muestra:
+    """Resultados de una sola muestra, sin dict por instancia."""
+    __slots__ = ATRIBUTOS + ('fecha', 'cumple')
+
+    def __init__(self, valores, fecha=None, cumple=True):
+        for atributo, valor in zip(ATRIBUTOS, valores):
+            setattr(self, atributo, float(valor))
+        self.fecha = pd.Timestamp(fecha) if fecha is not None else pd.Timestamp.now()
+        self.cumple = bool(cumple)
+
+    @classmethod
+    def desde_resultados(cls, resultados, fecha=None, cumple=True):
+        return cls([resultados[k] for k in RESULTADOS], fecha, cumple)
+
+    def a_dict(self):
+        return dict(zip(RESULTADOS, (getattr(self, a) for a in ATRIBUTOS)), Fecha=self.fecha, Cumple=self.cumple)
+
+    def __repr__(self):
+        return f"Muestra({self.fecha}, PCS={self.pcs_kcal:.1f} kcal/m3, cumple={self.cumple})"
+
+
+def _fecha_ns(fecha):
+    if fecha is None:
+        return np.datetime64('now', 'ns')
+    if isinstance(fecha, (int, float)):
+        return np.datetime64(int(fecha * 1e9), 'ns')
+    return np.datetime64(pd.Timestamp(fecha).to_datetime64(), 'ns')
+
+
+class TablaResultados:
+    """Resultados de muchas muestras en columnas float64/bool.
+
+    Creciente (se duplica la capacidad al llenarse) o circular: en modo circular cada fila se
+    escribe dos veces (en i e i + capacidad) para que las últimas `capacidad` muestras estén
+    siempre en un tramo contiguo y en orden cronológico.
+    """
+
+    def __init__(self, capacidad=1024, circular=False):
+        self.capacidad = capacidad
+        self.circular = circular
+        self._reservar(2 * capacidad if circular else capacidad)
+        self._escritas = 0
+
+    def _reservar(self, filas, anteriores=0):
+        valores = np.empty((filas, len(RESULTADOS)), order='F')
+        fecha = np.empty(filas, dtype='datetime64[ns]')
+        cumple = np.empty(filas, dtype=bool)
+        if anteriores:
+            valores[:anteriores] = self._valores[:anteriores]
+            fecha[:anteriores] = self._fecha[:anteriores]
+            cumple[:anteriores] = self._cumple[:anteriores]
+        self._valores, self._fecha, self._cumple = valores, fecha, cumple
+
+    def _tramo(self):
+        if not self.circular or self._escritas <= self.capacidad:
+            return slice(0, self._escritas)
+        inicio = self._escritas % self.capacidad
+        return slice(inicio, inicio + self.capacidad)
+
+    def __len__(self):
+        return min(self._escritas, self.capacidad) if self.circular else self._escritas
+
+    # ---- ESCRITURA ----
+    def _escribir(self, valores, fecha, cumple):
+        if self.circular:
+            i = self._escritas % self.capacidad
+            filas = (i, i + self.capacidad)
+        else:
+            if self._escritas == len(self._fecha):
+                self._reservar(2 * len(self._fecha), self._escritas)
+            filas = (self._escritas,)
+        for fila in filas:
+            self._valores[fila] = valores
+            self._fecha[fila] = fecha
+            self._cumple[fila] = cumple
+        self._escritas += 1
+
+    def agregar(self, resultados, fecha=None, cumple=True):
+        """Agrega un dict de resultados (como el de analizar_composicion) o una Muestra."""
+        if isinstance(resultados, Muestra):
+            valores = [getattr(resultados, a) for a in ATRIBUTOS]
+            fecha, cumple = resultados.fecha, resultados.cumple
+        else:
+            valores = [resultados[k] for k in RESULTADOS]
+        self._escribir(valores, _fecha_ns(fecha), cumple)
+
+    def extender(self, lote, fechas=None):
+        """Agrega las filas de un DataFrame de analizar_lote."""
+        valores = lote[RESULTADOS].to_numpy(dtype=np.float64)
+        cumple = lote['Cumple'].to_numpy(dtype=bool) if 'Cumple' in lote else np.ones(len(lote), bool)
+        fechas = (np.full(len(lote), np.datetime64('now', 'ns')) if fechas is None
+                  else pd.to_datetime(fechas).to_numpy(dtype='datetime64[ns]'))
+        if self.circular:
+            for fila in zip(valores, fechas, cumple):
+                self._escribir(*fila)
+            return
+        nuevas = self._escritas + len(lote)
+        if nuevas > len(self._fecha):
+            self._reservar(max(nuevas, 2 * len(self._fecha)), self._escritas)
+        self._valores[self._escritas:nuevas] = valores
+        self._fecha[self._escritas:nuevas] = fechas
+        self._cumple[self._escritas:nuevas] = cumple
+        self._escritas = nuevas
+
+    @classmethod
+    def desde_lote(cls, lote, fechas=None):
+        tabla = cls(capacidad=max(len(lote), 1))
+        tabla.extender(lote, fechas)
+        return tabla
+
+    # ---- LECTURA (vistas, sin copias) ----
+    def __getitem__(self, i):
+        tramo = self._tramo()
+        fila = range(tramo.start, tramo.stop)[i]
+        return Muestra(self._valores[fila], self._fecha[fila], self._cumple[fila])
+
+    def columna(self, nombre):
+        tramo = self._tramo()
+        if nombre == 'Fecha':
+            return self._fecha[tramo]
+        if nombre == 'Cumple':
+            return self._cumple[tramo]
+        return self._valores[tramo, _COLUMNA[nombre]]
+
+    def a_pandas(self):
+        # Un dict de columnas con copy=False deja cada columna como bloque propio, sin consolidar
+        return pd.DataFrame({n: self.columna(n) for n in RESULTADOS + ['Fecha', 'Cumple']}, copy=False)
+
+    def a_arrow(self):
+        import pyarrow as pa
+
+        nombres = RESULTADOS + ['Fecha', 'Cumple']
+        return pa.table([pa.array(self.columna(n)) for n in nombres], names=nombres)
+
+    @property
+    def nbytes(self):
+        return self._valores.nbytes + self._fecha.nbytes + self._cumple.nbytes
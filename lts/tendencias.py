@@ -0,0 +1,180 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from lts.recursos import MEMORIA_CACHE_MB, CacheLRU
+
+# Parámetros que se grafican por defecto en cada módulo
+PARAMETROS_TENDENCIA = {
+    'Gas Natural': ['PCS (kcal/m3)', 'Wobbe', 'CO2 (%)', 'H2S ppm', 'H2S (ppm)'],
+    'MEG': ['Concentración (%wt)'],
+    'TEG': ['Concentración (%wt)'],
+    'Aminas': ['Carga ácida rica', 'Carga ácida pobre'],
+}
+MAX_PUNTOS = 2000
+
+
+def lttb(x, y, umbral=MAX_PUNTOS):
+    """Largest-Triangle-Three-Buckets: índices de los puntos a conservar para graficar la serie."""
+    n = len(x)
+    if umbral >= n or umbral < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    bordes = np.linspace(1, n - 1, umbral - 1).astype(np.int64)
+    elegidos = np.empty(umbral, dtype=np.int64)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    a = 0
+    for i in range(umbral - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        siguiente_fin = bordes[i + 2] if i + 2 < len(bordes) else n
+        xm = x[fin:siguiente_fin].mean() if siguiente_fin > fin else x[-1]
+        ym = y[fin:siguiente_fin].mean() if siguiente_fin > fin else y[-1]
+        area = np.abs((x[a] - xm) * (y[inicio:fin] - y[a]) - (x[a] - x[inicio:fin]) * (ym - y[a]))
+        a = inicio + int(np.argmax(area))
+        elegidos[i + 1] = a
+    return elegidos
+
+
+class Tendencia:
+    """Estadísticos de control de un parámetro, actualizados solo con las muestras nuevas.
+
+    Mantiene media/σ acumuladas (Welford) para los límites de Shewhart (±3σ), una ventana móvil
+    de `ventana` muestras, el estado del EWMA y el conteo de incumplimientos de especificación.
+    """
+
+    def __init__(self, ventana=30, lambda_ewma=0.2, L=3.0):
+        self.ventana = ventana
+        self.lambda_ewma = lambda_ewma
+        self.L = L
+        self.ultimo_id = 0
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.ewma = None
+        self.fuera_de_spec = 0
+        self._cola = np.empty(0)
+        self._bloques = []
+        self._lock = threading.Lock()
+
+    @property
+    def sigma(self):
+        return np.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else np.nan
+
+    def agregar(self, serie):
+        """serie: DataFrame con id, fecha, valor, cumple (ver Historial.serie)."""
+        if serie.empty:
+            return
+        self.fuera_de_spec += int((serie['cumple'] == 0).sum())
+        self.ultimo_id = int(serie['id'].iloc[-1])
+        valores = serie['valor'].to_numpy(dtype=np.float64)
+        finitos = np.isfinite(valores)
+        if not finitos.all():
+            # Un NULL/NaN (p. ej. punto de rocío sin raíz) dejaría en NaN para siempre la media y σ
+            # acumuladas, la ventana y el EWMA: esas muestras no entran en los estadísticos
+            serie, valores = serie[finitos], valores[finitos]
+        k = len(valores)
+        if not k:
+            return
+
+        # Welford por bloques (Chan et al.) para media y σ acumuladas
+        media_b = valores.mean()
+        m2_b = ((valores - media_b) ** 2).sum()
+        delta = media_b - self.media
+        total = self.n + k
+        self.media += delta * k / total
+        self.m2 += m2_b + delta ** 2 * self.n * k / total
+        indice = np.arange(self.n + 1, total + 1)
+        self.n = total
+
+        # Ventana móvil: cola de las últimas ventana-1 muestras + bloque nuevo, con sumas acumuladas
+        extendido = np.concatenate([self._cola, valores])
+        s1 = np.concatenate([[0.0], np.cumsum(extendido)])
+        s2 = np.concatenate([[0.0], np.cumsum(extendido ** 2)])
+        fin = np.arange(len(self._cola) + 1, len(extendido) + 1)
+        inicio = np.maximum(fin - self.ventana, 0)
+        cuenta = fin - inicio
+        media_movil = (s1[fin] - s1[inicio]) / cuenta
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = (s2[fin] - s2[inicio] - cuenta * media_movil ** 2) / (cuenta - 1)
+        sigma_movil = np.sqrt(np.clip(var, 0, None))
+        self._cola = extendido[-(self.ventana - 1):] if self.ventana > 1 else np.empty(0)
+
+        ewma = np.empty(k)
+        z = valores[0] if self.ewma is None else self.ewma
+        lam = self.lambda_ewma
+        for i, v in enumerate(valores):
+            z = lam * v + (1 - lam) * z
+            ewma[i] = z
+        self.ewma = z
+
+        self._bloques.append(pd.DataFrame({
+            'fecha': serie['fecha'].to_numpy(),
+            'valor': valores,
+            'media móvil': media_movil,
+            'σ móvil': sigma_movil,
+            'EWMA': ewma,
+            'n': indice,
+        }))
+
+    def actualizar(self, historial, modulo, parametro, punto=None):
+        with self._lock:
+            self.agregar(historial.serie(modulo, parametro, punto, desde_id=self.ultimo_id))
+        return self
+
+    def datos(self):
+        if len(self._bloques) > 1:
+            self._bloques = [pd.concat(self._bloques, ignore_index=True)]
+        return self._bloques[0] if self._bloques else pd.DataFrame(
+            columns=['fecha', 'valor', 'media móvil', 'σ móvil', 'EWMA', 'n'])
+
+    def limites(self):
+        """Límites de control con la media y σ acumuladas hasta ahora."""
+        sigma = self.sigma
+        return {
+            'LC': self.media,
+            'LCS': self.media + 3 * sigma,
+            'LCI': self.media - 3 * sigma,
+            'σ': sigma,
+        }
+
+    def grafico(self, max_puntos=MAX_PUNTOS):
+        """Serie reducida con LTTB y con las líneas de control, lista para st.line_chart."""
+        datos = self.datos()
+        if datos.empty:
+            return datos.set_index('fecha')
+        x = datos['fecha'].to_numpy().astype('datetime64[ns]').astype(np.int64)
+        reducidos = datos.iloc[lttb(x, datos['valor'].to_numpy(), max_puntos)].copy()
+        lim = self.limites()
+        lam, L, sigma = self.lambda_ewma, self.L, lim['σ']
+        ancho_ewma = L * sigma * np.sqrt(lam / (2 - lam) * (1 - (1 - lam) ** (2 * reducidos['n'].to_numpy())))
+        reducidos['LCS'] = lim['LCS']
+        reducidos['LCI'] = lim['LCI']
+        reducidos['EWMA LCS'] = lim['LC'] + ancho_ewma
+        reducidos['EWMA LCI'] = lim['LC'] - ancho_ewma
+        return reducidos.drop(columns=['n', 'σ móvil']).set_index('fecha')
+
+    def resumen(self):
+        datos = self.datos()
+        lim = self.limites()
+        fuera_control = int(((datos['valor'] > lim['LCS']) | (datos['valor'] < lim['LCI'])).sum()) if self.n else 0
+        return {
+            'Muestras': self.n,
+            'Media': float(self.media),
+            'σ': float(lim['σ']),
+            'Fuera de especificación': self.fuera_de_spec,
+            'Fuera de control (Shewhart)': fuera_control,
+        }
+
+
+TENDENCIAS = CacheLRU('tendencias', max_entradas=128, max_mb=MEMORIA_CACHE_MB * 0.1)
+
+
+def obtener_tendencia(historial, modulo, parametro, punto=None, ventana=30):
+    """Tendencia compartida por proceso; cada llamada solo incorpora las muestras nuevas."""
+    clave = (historial.ruta, modulo, parametro, punto, ventana)
+    tendencia = TENDENCIAS.obtener(clave, lambda: Tendencia(ventana=ventana))
+    tendencia.actualizar(historial, modulo, parametro, punto)
+    TENDENCIAS.actualizar(clave)  # la serie crece con cada muestra nueva
+    return tendencia
@@ -0,0 +1,267 @@
+"""Ingesta en tiempo real de los analizadores en línea (cromatógrafos, H2S, punto de rocío).
+
+Un único event loop de asyncio atiende todas las corrientes:
+
+- una carpeta vigilada donde cada analizador agrega filas a su CSV (la corriente es el nombre
+  del archivo; de cada archivo se leen solo las líneas nuevas), y
+- un socket TCP local que recibe una composición JSON por línea, p. ej.
+  {"corriente": "GC-01", "CH4": 91.2, "C2H6": 4.1, ...} (sustituto de Modbus).
+
+Cada lectura pasa por analizar_composicion y por las reglas de todos los contratos (o de los
+indicados); las últimas lecturas de cada corriente quedan en un buffer circular para la UI con el
+veredicto de cada contrato, y cada parámetro fuera de especificación genera una alarma apenas
+llega la lectura. El servicio es uno por fuente: cada lector elige el contrato con el que mira
+los datos. De los CSV que ya existen al arrancar solo se leen las filas que se agreguen después.
+"""
+import asyncio
+import csv
+import io
+import json
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from pathlib import Path
+
+import pandas as pd
+
+from lts.especificaciones import CONTRATO_BASE, TABLA
+from lts.gas import PM, PRODUCTO, analizar_composicion, reglas, valores_a_validar
+from lts.resultados import TablaResultados
+
+CAPACIDAD = 500
+INTERVALO_CARPETA = 0.25  # s entre barridos de la carpeta: acota la demora de una alarma
+HOST = '127.0.0.1'
+PUERTO = 5020
+MAX_SERVICIOS = 4
+
+Alarma = namedtuple('Alarma', 'fecha corriente contrato parametro valor especificacion')
+
+
+class AnalizadorTiempoReal:
+    """Buffers circulares por corriente y alarmas; seguro para leer desde otro hilo (la UI)."""
+
+    def __init__(self, valor_dolar=2.25, capacidad=CAPACIDAD, al_alarmar=None, contratos=None):
+        self.contratos = contratos  # None: todos los contratos de la tabla, releídos en cada lectura
+        self.valor_dolar = valor_dolar
+        self.capacidad = capacidad
+        self.al_alarmar = al_alarmar
+        self.buffers = {}
+        self.veredictos = {}
+        self.alarmas = deque(maxlen=capacidad)
+        self.lecturas = 0
+        self.descartadas = 0
+        self.error = None
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._loop = None
+        self._tarea = None
+        self._detenido = False
+
+    # ---- PROCESAMIENTO ----
+    def procesar(self, corriente, composicion, fecha=None):
+        fecha = fecha or time.time()
+        try:
+            resultados = analizar_composicion(composicion, self.valor_dolar)
+        except (ValueError, TypeError, ZeroDivisionError):
+            with self._lock:
+                self.descartadas += 1
+            return None
+        del resultados['Validación']
+        valores = valores_a_validar(composicion, resultados)
+        veredicto, alarmas = {}, []
+        for contrato in self.contratos or TABLA.contratos(PRODUCTO):
+            fuera = [Alarma(fecha, corriente, contrato, r.parametro, valores[r.columna], r.texto())
+                     for r in reglas(contrato) if not r.cumple(valores[r.columna])]
+            veredicto[contrato] = not fuera
+            alarmas.extend(fuera)
+        with self._lock:
+            if corriente not in self.buffers:
+                self.buffers[corriente] = TablaResultados(self.capacidad, circular=True)
+                self.veredictos[corriente] = deque(maxlen=self.capacidad)
+            self.buffers[corriente].agregar(resultados, fecha, all(veredicto.values()))
+            self.veredictos[corriente].append(veredicto)
+            self.alarmas.extend(alarmas)
+            self.lecturas += 1
+        if self.al_alarmar:
+            for alarma in alarmas:
+                self.al_alarmar(alarma)
+        return resultados
+
+    # ---- FUENTES ----
+    def _leer_nuevas(self, ruta, posiciones):
+        """Devuelve las filas completas agregadas a `ruta` desde la última lectura."""
+        desde, columnas = posiciones.get(ruta, (0, None))
+        with open(ruta, 'rb') as f:
+            f.seek(0, io.SEEK_END)
+            if f.tell() < desde:  # archivo truncado o reemplazado: se relee desde el principio
+                desde, columnas = 0, None
+            f.seek(desde)
+            datos = f.read()
+        completo = datos.rfind(b'\n') + 1
+        if not completo:
+            return []
+        lineas = datos[:completo].decode('utf-8', errors='replace').splitlines()
+        posiciones[ruta] = (desde + completo, columnas)
+        if columnas is None:
+            columnas = next(csv.reader(lineas[:1]), None)
+            lineas = lineas[1:]
+            posiciones[ruta] = (desde + completo, columnas)
+        return [dict(zip(columnas, valores)) for valores in csv.reader(lineas) if valores]
+
+    @staticmethod
+    def _al_final(ruta, posiciones):
+        """Registra `ruta` a partir de su última línea completa (con el encabezado ya leído)."""
+        with open(ruta, 'rb') as f:
+            encabezado = f.readline()
+            if not encabezado.endswith(b'\n'):
+                return
+            fin = f.seek(0, io.SEEK_END)
+            inicio = max(fin - 65536, len(encabezado))
+            f.seek(inicio)
+            cola = f.read()
+        columnas = next(csv.reader([encabezado.decode('utf-8', errors='replace')]), None)
+        posiciones[ruta] = (inicio + cola.rfind(b'\n') + 1 if b'\n' in cola else len(encabezado), columnas)
+
+    async def vigilar_carpeta(self, carpeta, patron='*.csv', intervalo=INTERVALO_CARPETA):
+        # Lo escrito antes de arrancar no se reprocesa (ni dispara alarmas viejas); los archivos
+        # que aparezcan después se leen desde el principio
+        posiciones = {}
+        for ruta in Path(carpeta).glob(patron):
+            try:
+                self._al_final(ruta, posiciones)
+            except OSError:
+                continue
+        while True:
+            for ruta in Path(carpeta).glob(patron):
+                try:
+                    filas = self._leer_nuevas(ruta, posiciones)
+                except OSError:
+                    continue
+                for fila in filas:
+                    self.procesar(ruta.stem, {k: v for k, v in fila.items() if k in PM and v != ''})
+            await asyncio.sleep(intervalo)
+
+    async def _atender(self, lector, escritor):
+        origen = '{}:{}'.format(*escritor.get_extra_info('peername')[:2])
+        try:
+            async for linea in lector:
+                try:
+                    dato = json.loads(linea)
+                    if not isinstance(dato, dict):
+                        raise ValueError("se esperaba un objeto JSON")
+                    corriente = str(dato.pop('corriente', origen))
+                except ValueError:
+                    with self._lock:
+                        self.descartadas += 1
+                    continue
+                self.procesar(corriente, dato)
+        except asyncio.CancelledError:
+            pass  # servicio detenido: la conexión se cierra sin error
+        finally:
+            escritor.close()
+
+    async def servir(self, host=HOST, puerto=PUERTO):
+        servidor = await asyncio.start_server(self._atender, host, puerto)
+        async with servidor:
+            await servidor.serve_forever()
+
+    async def ejecutar(self, carpeta=None, puerto=None, host=HOST):
+        tareas = []
+        if carpeta:
+            tareas.append(self.vigilar_carpeta(carpeta))
+        if puerto:
+            tareas.append(self.servir(host, puerto))
+        await asyncio.gather(*tareas)
+
+    def iniciar(self, carpeta=None, puerto=None, host=HOST):
+        """Corre `ejecutar` en un hilo daemon con su propio event loop (para Streamlit).
+
+        Si el loop termina con error (p. ej. el puerto ya está en uso) queda en self.error.
+        """
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._correr, args=(carpeta, puerto, host),
+                                          daemon=True, name='lts-tiempo-real')
+            self._hilo.start()
+        return self
+
+    def _correr(self, carpeta, puerto, host):
+        try:
+            asyncio.run(self._principal(carpeta, puerto, host))
+        except asyncio.CancelledError:
+            pass
+        except Exception as error:
+            self.error = error
+
+    async def _principal(self, carpeta, puerto, host):
+        self._loop, self._tarea = asyncio.get_running_loop(), asyncio.current_task()
+        if not self._detenido:
+            await self.ejecutar(carpeta, puerto, host)
+
+    def detener(self, espera=2.0):
+        """Cancela el event loop del hilo: cierra el socket y deja de vigilar la carpeta."""
+        self._detenido = True
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._tarea.cancel)
+            except RuntimeError:  # el loop ya terminó
+                pass
+        if self._hilo is not None:
+            self._hilo.join(espera)
+
+    @property
+    def activo(self):
+        return self._hilo is not None and self._hilo.is_alive() and not self._detenido
+
+    # ---- LECTURA PARA LA UI ----
+    def corrientes(self):
+        with self._lock:
+            return sorted(self.buffers)
+
+    def datos(self, corriente, contrato=CONTRATO_BASE):
+        # Copia: el event loop sigue escribiendo sobre el mismo buffer circular
+        with self._lock:
+            if corriente not in self.buffers:
+                return pd.DataFrame()
+            datos = self.buffers[corriente].a_pandas().copy()
+            datos['Cumple'] = [v.get(contrato, True) for v in self.veredictos[corriente]]
+        return datos
+
+    def ultimas(self, contrato=CONTRATO_BASE):
+        """Última lectura de cada corriente, con el veredicto de `contrato`."""
+        with self._lock:
+            filas = {c: dict(b[-1].a_dict(), Cumple=self.veredictos[c][-1].get(contrato, True))
+                     for c, b in self.buffers.items() if len(b)}
+        return pd.DataFrame.from_dict(filas, orient='index')
+
+    def ultimas_alarmas(self, n=50, contrato=None):
+        """Últimas `n` alarmas (de `contrato`, si se indica), la más reciente primero."""
+        with self._lock:
+            alarmas = [a for a in self.alarmas if contrato is None or a.contrato == contrato][-n:][::-1]
+        df = pd.DataFrame(alarmas, columns=Alarma._fields)
+        df['fecha'] = pd.to_datetime(df['fecha'], unit='s')
+        return df
+
+
+_ANALIZADORES = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def obtener_analizador(carpeta=None, puerto=None, host=HOST):
+    """Un servicio (y un event loop) por fuente en todo el proceso; el contrato lo elige cada lector.
+
+    Un servicio anterior que use el mismo puerto o la misma carpeta se detiene antes de crear el
+    nuevo, uno caído (p. ej. por un error al abrir el puerto) se reemplaza, y nunca quedan más de
+    MAX_SERVICIOS corriendo: se detiene el usado hace más tiempo.
+    """
+    clave = (str(carpeta) if carpeta else None, puerto)
+    with _LOCK:
+        servicio = _ANALIZADORES.get(clave)
+        if servicio is None or not servicio.activo:
+            for otra in [c for c in _ANALIZADORES if c == clave or (puerto and c[1] == puerto)
+                         or (clave[0] and c[0] == clave[0])]:
+                _ANALIZADORES.pop(otra).detener()
+            servicio = _ANALIZADORES[clave] = AnalizadorTiempoReal().iniciar(carpeta, puerto, host)
+        _ANALIZADORES.move_to_end(clave)
+        while len(_ANALIZADORES) > MAX_SERVICIOS:
+            _ANALIZADORES.popitem(last=False)[1].detener()
+        return servicio
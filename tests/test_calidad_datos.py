@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lts.calidad_datos import ControlCalidad, cribar, historia_reciente
+from lts.gas import COMPONENTES
+from lts.historial import Historial
+
+BASE = np.array([90.0, 5.0, 2.0, 0.4, 0.5, 0.15, 0.1, 0.05, 0.8, 1.0, 0.0002, 0.0])
+
+
+def _limpias(n, semilla=0):
+    rng = np.random.default_rng(semilla)
+    x = BASE * (1 + rng.normal(0, 0.01, (n, len(BASE))))
+    x[:, 0] += 100.0 - x.sum(axis=1)
+    return pd.DataFrame(x, columns=COMPONENTES)
+
+
+def test_controles_duros_rechazan_con_motivo():
+    df = _limpias(5)
+    df.loc[0, 'CH4'] = np.nan
+    df.loc[1, 'N2'] = -0.1
+    df.loc[2, COMPONENTES] = df.loc[2, COMPONENTES] / 100   # fracciones en lugar de %
+    df.loc[3, ['CH4', 'CO2']] = [df.loc[3, 'CH4'] - 24.0, 25.0]
+    limpias, rechazos = cribar(df)
+    assert limpias.index.tolist() == [4]
+    assert rechazos.index.tolist() == [0, 1, 2, 3]
+    motivos = rechazos['Motivo'].tolist()
+    assert 'faltan componentes' in motivos[0]
+    assert 'componentes negativos' in motivos[1]
+    assert motivos[2].startswith('total 1.00 %')
+    assert motivos[3] == 'fuera de rango: CO2'
+
+
+def test_atipico_se_marca_y_se_conserva():
+    df = _limpias(200)
+    df.loc[150, ['CH4', 'CO2']] = [df.loc[150, 'CH4'] - 3.0, df.loc[150, 'CO2'] + 3.0]
+    control = ControlCalidad()
+    limpias, rechazos = control.revisar(df)
+    assert rechazos.empty and len(limpias) == 200
+    assert limpias['Atípico'].tolist() == [i == 150 for i in range(200)]
+    assert 'CO2' in limpias.at[150, 'Motivo atípico']
+    assert control.resumen()['Atípicas'] == 1
+
+
+def test_carga_chica_se_compara_con_la_historia():
+    nueva = _limpias(5, semilla=1)
+    nueva.loc[2, ['CH4', 'CO2']] = [nueva.loc[2, 'CH4'] - 3.0, nueva.loc[2, 'CO2'] + 3.0]
+    sin_historia, _ = cribar(nueva)
+    assert not sin_historia['Atípico'].any()
+    con_historia, _ = cribar(nueva, historia=_limpias(300))
+    assert con_historia['Atípico'].tolist() == [False, False, True, False, False]
+
+
+def test_revisar_por_bloques_igual_a_todo_junto():
+    df = _limpias(600)
+    df.loc[[120, 480], 'N2'] += 2.0
+    df.loc[[120, 480], 'CH4'] -= 2.0
+    todo, _ = cribar(df)
+    control = ControlCalidad()
+    bloques = pd.concat([control.revisar(df.iloc[i:i + 150])[0] for i in range(0, 600, 150)])
+    pd.testing.assert_frame_equal(bloques, todo)
+
+
+def test_historia_reciente_desde_el_historial(tmp_path):
+    historial = Historial(str(tmp_path / 'h.db'))
+    guardadas = _limpias(10).drop(columns=['O2'])
+    for i, fila in guardadas.iterrows():
+        historial.registrar('Gas Natural', {k: (v, None) for k, v in fila.items()}, punto='A',
+                            fecha=pd.Timestamp('2024-01-01') + pd.Timedelta(hours=i))
+    historial.registrar('Gas Natural', {'CH4': (1.0, None)}, punto='B')
+    historial.esperar()
+    historia = historia_reciente(historial, 'Gas Natural', 'A', ventana=4)
+    assert list(historia.columns) == COMPONENTES
+    assert historia['CH4'].to_numpy() == pytest.approx(guardadas['CH4'].iloc[-4:].to_numpy())
+    assert (historia['O2'] == 0.0).all()
@@ -0,0 +1,48 @@
+from lts.certificados import IndiceCertificados, certificado, codigo_de, contenido_qr
+from lts.especificaciones import TABLA
+from lts.gas import analizar_composicion
+
+GAS = {'CH4': 90.0, 'C2H6': 5.0, 'C3H8': 2.0, 'n-C4H10': 0.5, 'N2': 1.5, 'CO2': 1.0}
+
+
+def test_emitir_y_verificar(tmp_path):
+    indice = IndiceCertificados(str(tmp_path / 'certificados.db'))
+    resultados = analizar_composicion(GAS)
+    emitido = certificado("M-1", resultados, "Informe de Calidad", cumple=True)
+    indice.registrar([emitido, emitido])  # registrar dos veces no duplica
+    assert len(indice) == 1
+
+    for texto in (emitido.codigo, contenido_qr(emitido.codigo), f"https://lab/verificar?verificar={emitido.codigo}",
+                  emitido.codigo.upper()):
+        verificado = indice.verificar(texto)
+        assert verificado == emitido._replace(datos=verificado.datos)
+    datos = indice.verificar(emitido.codigo).datos
+    assert datos['Contrato'] == 'General'
+    assert datos['PCS (kcal/m3)'] == f"{resultados['PCS (kcal/m3)']:.6g}"
+    assert any(k.startswith('CO2 (%) (') for k in datos)
+
+
+def test_codigo_desconocido_o_ilegible(tmp_path):
+    indice = IndiceCertificados(str(tmp_path / 'certificados.db'))
+    indice.registrar([certificado("M-1", analizar_composicion(GAS))])
+    assert indice.verificar('0' * 32) is None
+    assert indice.verificar('no es un código') is None
+    assert codigo_de('LTS:' + 'a' * 33) is None
+
+
+def test_el_codigo_cubre_lo_que_afirma_el_informe():
+    resultados = analizar_composicion(GAS)
+    base = certificado("M-1", resultados, cumple=True)
+    otro_valor = dict(resultados, **{'PCS (kcal/m3)': resultados['PCS (kcal/m3)'] + 1})
+    regla = TABLA.reglas('Gas Natural')[0]
+    otra_regla = dict(resultados, **{'Validación': {
+        **resultados['Validación'], regla.parametro: (resultados['Validación'][regla.parametro][0],
+                                                      regla._replace(valor=regla.valor + 1))}})
+    codigos = {base.codigo,
+               certificado("M-2", resultados, cumple=True).codigo,
+               certificado("M-1", otro_valor, cumple=True).codigo,
+               certificado("M-1", otra_regla, cumple=True).codigo,
+               certificado("M-1", resultados, cumple=False).codigo,
+               certificado("M-1", resultados, cumple=True, contrato='Exportación').codigo,
+               certificado("M-1", resultados, cumple=True).codigo}  # misma muestra, otra emisión
+    assert len(codigos) == 7
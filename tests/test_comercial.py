@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lts.comercial import CLAVES, PARAMETRO_PCS, BalanceComercial, agregar, valorizar
+from lts.historial import Historial
+
+PRECIOS = {'Exportación': 3.1}
+
+
+def _volumenes(desde, horas, semilla):
+    rng = np.random.default_rng(semilla)
+    fechas = pd.date_range(desde, periods=horas, freq='h')
+    return pd.DataFrame({
+        'Fecha': np.repeat(fechas, 3),
+        'Punto': np.tile(['A', 'B', 'C'], horas),
+        'Volumen (Sm3)': rng.uniform(800, 1200, 3 * horas),
+        'Contrato': rng.choice(['General', 'Exportación'], 3 * horas),
+    })
+
+
+def _muestras(fechas, semilla):
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({'Fecha': pd.to_datetime(fechas), 'Punto': rng.choice(['A', 'B', 'C'], len(fechas)),
+                         PARAMETRO_PCS: rng.normal(39.5, 0.3, len(fechas))})
+
+
+def _guardar(historial, muestras):
+    for _, fila in muestras.iterrows():
+        historial.registrar('Gas Natural', {PARAMETRO_PCS: (fila[PARAMETRO_PCS], None)}, punto=fila['Punto'],
+                            fecha=fila['Fecha'])
+    historial.esperar()
+
+
+def test_incremental_igual_a_recalcular_todo(tmp_path):
+    historial = Historial(str(tmp_path / 'h.db'))
+    volumenes = _volumenes('2024-01-01', 120, semilla=0)
+    tandas = [
+        _muestras(pd.date_range('2024-01-01 02:00', periods=20, freq='5h'), semilla=1),
+        _muestras(pd.date_range('2024-01-02 07:00', periods=8, freq='3h'), semilla=2),  # días ya valorizados
+        _muestras(['2024-01-01 00:30', '2024-01-04 12:00'], semilla=3),
+    ]
+    incremental = BalanceComercial(volumenes.iloc[:200], PRECIOS)
+    for i, tanda in enumerate(tandas):
+        _guardar(historial, tanda)
+        incremental.actualizar(historial)
+        if i == 1:
+            incremental.agregar_volumenes(volumenes.iloc[200:])
+
+    completo = BalanceComercial(volumenes, PRECIOS).actualizar(historial)
+    pd.testing.assert_frame_equal(incremental.resumen(), completo.resumen())
+
+    muestras = pd.concat(tandas).sort_values('Fecha', kind='stable')
+    directo = agregar(valorizar(muestras, volumenes.assign(Fecha=pd.to_datetime(volumenes['Fecha'])), PRECIOS, 2.25))
+    total = incremental.resumen(por=[])
+    assert total['Volumen (Sm3)'].iloc[0] == pytest.approx(volumenes['Volumen (Sm3)'].sum())
+    assert total['Energía (MJ)'].iloc[0] == pytest.approx(directo['Energía (MJ)'].sum())
+    assert total['Ingreso (USD)'].iloc[0] == pytest.approx(directo['Ingreso (USD)'].sum())
+    assert list(incremental.resumen().index.names) == CLAVES
+
+
+def test_volumen_sin_muestra_previa_se_informa_aparte():
+    volumenes = pd.DataFrame({'Fecha': ['2024-01-01 00:00', '2024-01-01 06:00'], 'Punto': ['A', 'A'],
+                              'Volumen (Sm3)': [100.0, 200.0]})
+    balance = BalanceComercial(volumenes).agregar_muestras(_muestras(['2024-01-01 03:00'], semilla=0).assign(Punto='A'))
+    total = balance.resumen(por=[]).iloc[0]
+    assert total['Volumen sin muestra (Sm3)'] == 100.0
+    assert total['PCS ponderado (MJ/m3)'] == pytest.approx(total['Energía (MJ)'] / 200.0)
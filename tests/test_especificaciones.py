@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lts.especificaciones import Regla, ReglasCompiladas, TablaEspecificaciones
+
+
+def _regla(parametro, operador, valor, valor_max=None, contrato='General'):
+    return Regla('Gas Natural', contrato, parametro, parametro, operador, valor, valor_max, '')
+
+
+REGLAS = [
+    _regla('CO2 (%)', '<', 2.0),
+    _regla('O2 (%)', '<=', 0.2),
+    _regla('PCS (kcal/m3)', 'rango', 8850, 12200),
+    _regla('PCS (kcal/m3)', '>', 9000, contrato='Exportación'),
+    _regla('CO2 (%)', '>=', 0.5, contrato='Exportación'),
+]
+
+
+@pytest.fixture
+def valores():
+    return pd.DataFrame({
+        'CO2 (%)': [1.0, 2.0, 0.4, 1.9999],
+        'O2 (%)': [0.1, 0.2, 0.3, 0.0],
+        'PCS (kcal/m3)': [9500, 8850, 9000, 12200.1],
+    }, index=['a', 'b', 'c', 'd'])
+
+
+def test_compiladas_coinciden_con_regla_cumple(valores):
+    compiladas = ReglasCompiladas(REGLAS)
+    ok, reglas = compiladas.evaluar(valores)
+    esperado = np.column_stack([r.cumple(valores[r.columna].to_numpy()) for r in reglas])
+    np.testing.assert_array_equal(ok, esperado)
+
+
+def test_limites_estrictos_y_cerrados(valores):
+    banderas = ReglasCompiladas(REGLAS[:3]).banderas(valores)
+    assert banderas['CO2 (%) cumple'].tolist() == [True, False, True, True]      # '<' excluye el límite
+    assert banderas['O2 (%) cumple'].tolist() == [True, True, False, True]       # '<=' lo incluye
+    assert banderas['PCS (kcal/m3) cumple'].tolist() == [True, True, True, False]  # rango cerrado
+
+
+def test_veredicto_por_contrato(valores):
+    veredicto = ReglasCompiladas(REGLAS).veredicto(valores)
+    assert list(veredicto.columns) == ['Exportación', 'General']
+    assert veredicto['General'].tolist() == [True, False, False, False]
+    assert veredicto['Exportación'].tolist() == [True, False, False, True]
+
+
+def test_reglas_sin_columna_se_omiten():
+    compiladas = ReglasCompiladas(REGLAS)
+    banderas = compiladas.banderas(pd.DataFrame({'O2 (%)': [0.1, 0.5]}))
+    assert list(banderas.columns) == ['General | O2 (%) cumple']
+    assert banderas.iloc[:, 0].tolist() == [True, False]
+
+
+def test_tabla_recarga_al_cambiar_el_archivo(tmp_path):
+    ruta = tmp_path / 'especificaciones.csv'
+    encabezado = "producto,contrato,parametro,columna,operador,valor,valor_max,unidad\n"
+    ruta.write_text(encabezado + "Gas Natural,,CO2 (%),,<,2,,%\n", encoding='utf-8')
+    tabla = TablaEspecificaciones(str(ruta))
+    assert [r.texto() for r in tabla.reglas('Gas Natural')] == ['< 2 %']
+    ruta.write_text(encabezado + "Gas Natural,,CO2 (%),,<,3,,%\nGas Natural,B,CO2 (%),,<,1,,%\n", encoding='utf-8')
+    tabla.version = None  # mismo mtime posible en sistemas de archivos con poca resolución
+    assert [r.texto() for r in tabla.reglas('Gas Natural')] == ['< 3 %']
+    assert tabla.contratos('Gas Natural') == ['B', 'General']
+    assert tabla.compilar('Gas Natural', None).veredicto(pd.DataFrame({'CO2 (%)': [0.5, 2.5]})).to_dict('list') == {
+        'B': [True, False], 'General': [True, True]}
+
+
+def test_tabla_con_errores_conserva_las_ultimas_reglas(tmp_path):
+    ruta = tmp_path / 'especificaciones.csv'
+    encabezado = "producto,contrato,parametro,columna,operador,valor,valor_max,unidad\n"
+    ruta.write_text(encabezado + "Gas Natural,,CO2 (%),,<,2,,%\n", encoding='utf-8')
+    tabla = TablaEspecificaciones(str(ruta))
+    ruta.write_text(encabezado + "Gas Natural,,CO2 (%),,<,dos,,%\n", encoding='utf-8')  # a mitad de la edición
+    tabla.version = -1
+    assert [r.texto() for r in tabla.reglas('Gas Natural')] == ['< 2 %']
+    assert 'se siguen usando las reglas anteriores' in tabla.error
+    ruta.write_text(encabezado + "Gas Natural,,CO2 (%),,<,3,,%\n", encoding='utf-8')
+    tabla.version = -1
+    assert [r.texto() for r in tabla.reglas('Gas Natural')] == ['< 3 %']
+    assert tabla.error is None
+
+
+def test_un_limite_por_parametro_en_la_tabla_del_repo():
+    reglas = TablaEspecificaciones().reglas('Gas Natural')
+    columnas = [r.columna for r in reglas]
+    assert len(columnas) == len(set(columnas))
+    assert TablaEspecificaciones().compilar('Gas Natural').evaluar_valores({'H2S (ppm)': 2.05, 'CO2 (%)': 1.0}) == {
+        'H2S (ppm)': (2.05, False), 'CO2 (%)': (1.0, True)}
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lts.gas import COMPONENTES, RESULTADOS, analizar_composicion, analizar_lote, reglas
+
+
+@pytest.fixture
+def muestras():
+    rng = np.random.default_rng(1)
+    base = np.array([88, 6, 2.5, 0.5, 0.6, 0.2, 0.15, 0.05, 1.2, 1.8, 0.0002, 0.01])
+    x = np.abs(base + rng.normal(0, 1, (300, len(COMPONENTES))) * base * 0.3)
+    df = pd.DataFrame(x, columns=COMPONENTES)
+    df.loc[5, 'CO2'] = 2.0        # justo en el límite '<'
+    df.loc[6] = 0.0
+    df.loc[6, 'C6+'] = 100.0      # sin punto de rocío en el intervalo
+    return df
+
+
+def test_lote_igual_a_composicion(muestras):
+    lote = analizar_lote(muestras, 2.5)
+    for i, fila in muestras.iterrows():
+        resultados = analizar_composicion(fila.to_dict(), 2.5)
+        for k in RESULTADOS:
+            assert lote.at[i, k] == pytest.approx(resultados[k], rel=1e-9, nan_ok=True), (i, k)
+        for parametro, (valor, regla) in resultados['Validación'].items():
+            assert lote.at[i, f"{parametro} cumple"] == bool(regla.cumple(valor)), (i, parametro)
+        assert lote.at[i, 'Cumple'] == all(regla.cumple(v) for v, regla in resultados['Validación'].values())
+
+
+def test_casos_borde_del_lote(muestras):
+    lote = analizar_lote(muestras)
+    assert not lote.at[5, 'CO2 (%) cumple']
+    assert np.isnan(lote.at[6, 'Dew Point estimado (C)'])
+    assert list(lote.index) == list(muestras.index)
+    assert {f"{r.parametro} cumple" for r in reglas()} <= set(lote.columns)
+
+
+def test_composicion_sin_total_no_se_analiza():
+    with pytest.raises(ValueError):
+        analizar_composicion({k: 0.0 for k in COMPONENTES})
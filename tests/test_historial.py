@@ -0,0 +1,76 @@
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from lts.calidad_datos import cribar
+from lts.gas import analizar_lote, banderas_lote
+from lts.historial import Historial
+from lts.importacion import leer_tabla
+from lts.ingesta import detectar_columna_fecha
+
+
+@pytest.fixture
+def hora_argentina(monkeypatch):
+    monkeypatch.setenv('TZ', 'America/Argentina/Buenos_Aires')  # UTC-3, sin horario de verano
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_fecha_naive_es_hora_local(tmp_path, hora_argentina):
+    historial = Historial(str(tmp_path / 'h.db'))
+    historial.registrar('Gas', {'PCS': (9300.0, True)}, fecha='2024-05-01 08:00')
+    historial.esperar()
+    fila = historial.consultar('Gas').iloc[0]
+    assert fila['fecha'] == pd.Timestamp('2024-05-01 08:00')
+    with sqlite3.connect(str(tmp_path / 'h.db')) as conexion:
+        epoch = conexion.execute("SELECT fecha FROM muestras").fetchone()[0]
+    assert epoch == pd.Timestamp('2024-05-01 11:00', tz='UTC').timestamp()
+    assert len(historial.consultar('Gas', desde='2024-05-01 08:00', hasta='2024-05-01 08:01')) == 1
+
+
+def test_escritor_espera_la_base_bloqueada(tmp_path):
+    ruta = str(tmp_path / 'h.db')
+    historial = Historial(ruta, intervalo=0.0)
+    otra = sqlite3.connect(ruta, isolation_level=None, check_same_thread=False)
+    otra.execute("BEGIN EXCLUSIVE")
+    historial.registrar('Gas', {'PCS': (9300.0, True)})
+    threading.Timer(0.5, otra.rollback).start()
+    historial.esperar()
+    assert len(historial.consultar('Gas')) == 1
+    otra.close()
+
+
+def test_escritor_sobrevive_a_un_error(tmp_path, monkeypatch):
+    historial = Historial(str(tmp_path / 'h.db'), intervalo=0.0)
+    grabar = Historial._grabar
+
+    def fallar_una_vez(conexion, pendientes):
+        monkeypatch.setattr(Historial, '_grabar', staticmethod(grabar))
+        raise sqlite3.DatabaseError("disco lleno")
+
+    monkeypatch.setattr(Historial, '_grabar', staticmethod(fallar_una_vez))
+    historial.registrar('Gas', {'PCS': (1.0, True)})
+    historial.esperar()
+    assert historial.descartadas == 1 and isinstance(historial.error, sqlite3.DatabaseError)
+    historial.registrar('Gas', {'PCS': (2.0, True)})
+    historial.esperar()
+    assert historial.consultar('Gas')['PCS'].tolist() == [2.0]
+
+
+def test_lote_con_fecha_se_guarda_con_sus_fechas(tmp_path):
+    csv = ("Fecha,CH4,C2H6,C3H8,i-C4H10,n-C4H10,i-C5H12,n-C5H12,C6+,N2,CO2,H2S,O2\n"
+           "2024-03-01 06:00,90.0,5.0,2.0,0.4,0.5,0.15,0.1,0.05,0.8,1.0,0.0002,0.0\n"
+           "2024-03-01 12:00,89.5,5.3,2.1,0.4,0.5,0.15,0.1,0.05,0.9,1.0,0.0002,0.0\n"
+           "2024-03-02 06:00,90.2,4.9,2.0,0.4,0.5,0.15,0.1,0.05,0.7,1.0,0.0002,0.0\n")
+    limpias, _ = cribar(leer_tabla(csv.encode(), nombre='lote.csv'))
+    fechas = limpias[detectar_columna_fecha(limpias)]
+    historial = Historial(str(tmp_path / 'h.db'))
+    historial.registrar_lote('Gas', analizar_lote(limpias), banderas_lote(), fechas=fechas)
+    historial.esperar()
+    guardadas = historial.consultar('Gas')['fecha']
+    assert guardadas.tolist() == pd.to_datetime(['2024-03-01 06:00', '2024-03-01 12:00', '2024-03-02 06:00']).tolist()
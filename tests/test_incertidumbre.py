@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lts.incertidumbre import SIGMA_REPETIBILIDAD, incertidumbre_composicion, incertidumbre_lote
+
+BASE = {'CH4': 90.5, 'C2H6': 5.0, 'C3H8': 2.0, 'n-C4H10': 0.5, 'N2': 0.5}
+SORTEOS = 20_000
+
+
+def _con_co2(co2):
+    return dict(BASE, CH4=BASE['CH4'] + 2.0 - co2, CO2=co2)
+
+
+@pytest.mark.parametrize('co2, esperada', [
+    (2.0, 0.5),                                   # en el límite: la mitad de los sorteos queda fuera
+    (2.0 - 2 * SIGMA_REPETIBILIDAD['CO2'], 0.0228),  # 2σ por debajo: P(Z > 2)
+    (1.0, 0.0),                                   # lejos del límite
+])
+def test_probabilidad_de_incumplir_el_co2(co2, esperada):
+    fila = incertidumbre_composicion(_con_co2(co2), SORTEOS, semilla=7)
+    assert fila['P(fuera) CO2 (%)'] == pytest.approx(esperada, abs=0.01)
+    assert fila['P(no cumple)'] == pytest.approx(esperada, abs=0.01)
+    assert fila['CO2 (%) σ'] == pytest.approx(SIGMA_REPETIBILIDAD['CO2'], rel=0.05)
+    assert fila['CO2 (%) IC inf'] < co2 < fila['CO2 (%) IC sup']
+
+
+def test_no_detectados_no_se_perturban():
+    fila = incertidumbre_composicion(_con_co2(1.0), 1000, semilla=7)
+    assert fila['H2S ppm σ'] == 0.0 and fila['O2 (%) σ'] == 0.0
+
+
+def test_misma_semilla_mismo_resultado_en_bloques():
+    df = pd.DataFrame([_con_co2(c) for c in (1.9, 2.0, 2.05)])
+    entero = incertidumbre_lote(df, 2000, semilla=3)
+    por_fila = incertidumbre_lote(df, 2000, semilla=3, memoria_mb=0.01)  # bloques de una muestra
+    pd.testing.assert_frame_equal(entero, por_fila)
+    assert entero['P(no cumple)'].is_monotonic_increasing
+    assert not np.allclose(entero, incertidumbre_lote(df, 2000, semilla=4))
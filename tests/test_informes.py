@@ -0,0 +1,26 @@
+import pytest
+
+from lts.certificados import IndiceCertificados
+from lts.gas import analizar_composicion
+from lts.informes import ESTIMACIONES, InformePDF, pdf_a_bytes
+
+GAS = {'CH4': 90.0, 'C2H6': 5.0, 'C3H8': 2.0, 'n-C4H10': 0.5, 'C6+': 0.1, 'N2': 1.4, 'CO2': 1.0}
+
+
+@pytest.fixture
+def indice(tmp_path, monkeypatch):
+    indice = IndiceCertificados(str(tmp_path / 'certificados.db'))
+    monkeypatch.setattr('lts.informes.obtener_indice', lambda: indice)
+    return indice
+
+
+def test_punto_de_rocio_se_informa_como_estimacion_y_no_se_certifica(indice):
+    resultados = analizar_composicion(GAS)
+    pdf = InformePDF("Informe")
+    pdf.add_page()
+    pdf.add_sample("M-1", resultados)
+    pdf_a_bytes(pdf)
+    emitido = indice.verificar(pdf.certificados[0].codigo)
+    assert emitido is not None
+    assert not set(ESTIMACIONES) & set(emitido.datos)
+    assert 'PCS (kcal/m3)' in emitido.datos
@@ -0,0 +1,44 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lts.gas import COMPONENTES
+from lts.importacion import leer_tabla
+from lts.ingesta import MAX_EJEMPLOS, procesar_historico
+
+BASE = np.array([90.0, 5.0, 2.0, 0.4, 0.5, 0.15, 0.1, 0.05, 0.8, 1.0, 0.0002, 0.0])
+
+
+def _csv(filas, escala=1.0, sep=',', decimal='.'):
+    x = np.tile(BASE * escala, (filas, 1))
+    df = pd.DataFrame(x, columns=COMPONENTES)
+    df.insert(0, 'Fecha', pd.date_range('2024-01-01', periods=filas, freq='h').astype(str))
+    archivo = io.BytesIO(df.to_csv(index=False, sep=sep, decimal=decimal).encode())
+    archivo.name = 'historico.csv'
+    return archivo
+
+
+def test_rechazos_cuenta_todos_pero_guarda_solo_ejemplos():
+    filas = 3 * MAX_EJEMPLOS
+    agregador = procesar_historico(_csv(filas, escala=0.01), tamano_bloque=500)  # fracciones en lugar de %
+    assert agregador.muestras == 0
+    assert agregador.control.rechazadas == filas
+    assert len(agregador.informe_rechazos()) == MAX_EJEMPLOS
+
+
+def test_csv_con_punto_y_coma_y_coma_decimal():
+    coma = procesar_historico(_csv(48))
+    punto_y_coma = procesar_historico(_csv(48, sep=';', decimal=','))
+    assert punto_y_coma.muestras == coma.muestras == 48
+    pd.testing.assert_frame_equal(punto_y_coma.resumen(), coma.resumen())
+
+
+def test_csv_sin_columnas_reconocibles_da_el_error_de_leer_tabla():
+    archivo = io.BytesIO(b"a,b,c\n1,2,3\n")
+    archivo.name = 'raro.csv'
+    with pytest.raises(ValueError, match="Ninguna columna coincide"):
+        procesar_historico(archivo)
+    with pytest.raises(ValueError, match="Ninguna columna coincide"):
+        leer_tabla(archivo.getvalue(), nombre='raro.csv')
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from lts.gas import COMPONENTES
+from lts.propiedades import CRITICAS, P_ROCIO, SUMACION, factor_z, propiedades_reales, punto_rocio
+
+
+def _fracciones(**composicion):
+    x = np.array([composicion.get(k, 0.0) for k in COMPONENTES])
+    return x / x.sum()
+
+
+def _suma_z_sobre_k(x, t_celsius, presion=P_ROCIO):
+    t = t_celsius + 273.15
+    tc, pc, w = np.array([CRITICAS[k] for k in COMPONENTES]).T
+    k = pc / presion * np.exp(5.373 * (1 + w) * (1 - tc / t))
+    return (x / k).sum()
+
+
+GAS_TIPICO = _fracciones(CH4=90, C2H6=5, C3H8=2, **{'i-C4H10': 0.4, 'n-C4H10': 0.5, 'i-C5H12': 0.15,
+                                                    'n-C5H12': 0.1, 'C6+': 0.05, 'N2': 1, 'CO2': 0.8})
+
+
+def test_factor_z_metano_puro():
+    assert factor_z(_fracciones(CH4=1), COMPONENTES) == pytest.approx(1 - SUMACION['CH4'] ** 2)
+
+
+def test_punto_rocio_resuelve_la_ecuacion_de_rocio():
+    t = punto_rocio(GAS_TIPICO, COMPONENTES)
+    assert np.isfinite(t)
+    assert _suma_z_sobre_k(GAS_TIPICO, t) == pytest.approx(1.0, abs=1e-6)
+
+
+def test_punto_rocio_sube_con_componentes_pesados():
+    liviano = punto_rocio(_fracciones(CH4=95, C2H6=5), COMPONENTES)
+    pesado = punto_rocio(_fracciones(CH4=93, C2H6=5, **{'C6+': 2}), COMPONENTES)
+    assert pesado > liviano
+
+
+def test_punto_rocio_sin_raiz_en_el_intervalo_es_nan():
+    assert np.isnan(punto_rocio(_fracciones(**{'C6+': 1}), COMPONENTES))
+
+
+def test_punto_rocio_vectorizado_igual_fila_a_fila():
+    rng = np.random.default_rng(0)
+    x = np.abs(GAS_TIPICO + rng.normal(0, 0.01, (200, len(COMPONENTES))) * (GAS_TIPICO > 0))
+    x /= x.sum(axis=1, keepdims=True)
+    x[7] = _fracciones(**{'C6+': 1})  # una fila sin raíz no afecta a las demás
+    lote = punto_rocio(x, COMPONENTES)
+    filas = np.array([punto_rocio(fila, COMPONENTES) for fila in x])
+    np.testing.assert_allclose(lote, filas, rtol=0, atol=1e-6)
+    assert np.isnan(lote[7]) and np.isfinite(np.delete(lote, 7)).all()
+
+
+def test_propiedades_reales_sin_rocio_y_con_z_dado():
+    pm, hhv = 18.0, 40.0
+    base = propiedades_reales(GAS_TIPICO, COMPONENTES, pm, hhv, 101.325, 8.314, 288.15, 28.96)
+    sin_rocio = propiedades_reales(None, COMPONENTES, pm, hhv, 101.325, 8.314, 288.15, 28.96,
+                                   rocio=False, z=base['Z'])
+    assert 'Dew Point estimado (C)' not in sin_rocio
+    for clave, valor in sin_rocio.items():
+        assert valor == pytest.approx(base[clave])
+    assert base['PCS (MJ/m3)'] == pytest.approx(hhv / base['Z'])
@@ -0,0 +1,23 @@
+import numpy as np
+
+from lts.recursos import CacheLRU
+
+
+class Creciente:
+    def __init__(self):
+        self.datos = np.zeros(0)
+
+
+def test_actualizar_vuelve_a_medir_y_desaloja():
+    cache = CacheLRU('prueba-actualizar', max_mb=1)
+    vieja = cache.obtener('vieja', lambda: np.zeros(50_000))      # ~0.4 MB
+    creciente = cache.obtener('creciente', Creciente)
+    creciente.datos = np.zeros(100_000)                            # ~0.8 MB después de guardarse
+    assert cache.bytes < 2**20 // 2
+    cache.actualizar('creciente')
+    assert not cache.contiene('vieja') and cache.contiene('creciente')
+    assert cache.bytes <= 2**20
+    creciente.datos = np.zeros(200_000)                            # ya no entra en todo el cache
+    cache.actualizar('creciente')
+    assert not cache.contiene('creciente') and cache.bytes == 0
+    assert len(vieja) == 50_000
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lts.tendencias import Tendencia, lttb
+
+
+def _serie(valores, desde_id=1):
+    n = len(valores)
+    return pd.DataFrame({
+        'id': np.arange(desde_id, desde_id + n),
+        'fecha': pd.date_range('2026-01-01', periods=n, freq='h') + pd.Timedelta(hours=desde_id),
+        'valor': valores,
+        'cumple': np.ones(n, dtype=int),
+    })
+
+
+def test_welford_por_bloques_igual_a_todo_junto():
+    valores = np.random.default_rng(0).normal(9300, 40, 1000)
+    de_a_bloques = Tendencia(ventana=30)
+    for inicio in range(0, 1000, 137):
+        de_a_bloques.agregar(_serie(valores[inicio:inicio + 137], inicio + 1))
+    assert de_a_bloques.media == pytest.approx(valores.mean())
+    assert de_a_bloques.sigma == pytest.approx(valores.std(ddof=1))
+    datos = de_a_bloques.datos()
+    assert datos['media móvil'].iloc[-1] == pytest.approx(valores[-30:].mean())
+    assert datos['σ móvil'].iloc[-1] == pytest.approx(valores[-30:].std(ddof=1))
+
+
+def test_valores_no_finitos_no_envenenan_los_estadisticos():
+    tendencia = Tendencia(ventana=5)
+    tendencia.agregar(_serie([1.0, 2.0, np.nan, 3.0, None]))
+    tendencia.agregar(_serie([np.inf, 4.0], desde_id=6))
+    resumen = tendencia.resumen()
+    assert resumen['Muestras'] == 4
+    assert resumen['Media'] == pytest.approx(2.5)
+    assert np.isfinite(resumen['σ'])
+    assert np.isfinite(tendencia.ewma)
+    assert tendencia.ultimo_id == 7
+    assert np.isfinite(tendencia.datos()[['valor', 'media móvil', 'EWMA']].to_numpy()).all()
+
+
+def test_lttb_conserva_extremos_y_picos():
+    x = np.arange(10_000)
+    y = np.sin(x / 500.0)
+    y[4321] = 50.0
+    indices = lttb(x, y, 200)
+    assert len(indices) == 200
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert 4321 in indices
+    assert (np.diff(indices) > 0).all()
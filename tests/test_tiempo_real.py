@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+from lts.especificaciones import CONTRATO_BASE
+from lts.tiempo_real import AnalizadorTiempoReal
+
+GAS = {'CH4': 90.0, 'C2H6': 5.0, 'C3H8': 2.0, 'n-C4H10': 0.5, 'N2': 1.5, 'CO2': 1.0}
+FUERA = dict(GAS, CH4=89.0, N2=0.5, CO2=3.0)  # solo el CO2 fuera (inertes 3.5 %)
+
+
+def _analizador():
+    alarmas = []
+    return AnalizadorTiempoReal(al_alarmar=alarmas.append, contratos=[CONTRATO_BASE]), alarmas
+
+
+def test_lectura_fuera_de_especificacion_dispara_alarma():
+    analizador, alarmas = _analizador()
+    analizador.procesar('GC-01', GAS, fecha=1.0)
+    assert alarmas == []
+    analizador.procesar('GC-01', FUERA, fecha=2.0)
+    assert [(a.corriente, a.contrato, a.parametro, a.valor) for a in alarmas] == \
+        [('GC-01', CONTRATO_BASE, 'CO2 (%)', 3.0)]
+    assert list(analizador.datos('GC-01')['Cumple']) == [True, False]
+    assert list(analizador.ultimas_alarmas()['parametro']) == ['CO2 (%)']
+
+
+def test_lectura_ilegible_se_descarta_sin_alarma():
+    analizador, alarmas = _analizador()
+    assert analizador.procesar('GC-01', {'CH4': 'x'}) is None
+    assert analizador.descartadas == 1 and analizador.lecturas == 0 and alarmas == []
+
+
+def test_carpeta_solo_procesa_filas_nuevas(tmp_path):
+    ruta = tmp_path / 'GC-02.csv'
+    columnas = list(GAS)
+    ruta.write_text(','.join(columnas) + '\n' + ','.join(str(FUERA[c]) for c in columnas) + '\n')
+    analizador, alarmas = _analizador()
+
+    async def probar():
+        vigilancia = asyncio.create_task(analizador.vigilar_carpeta(tmp_path, intervalo=0.01))
+        await asyncio.sleep(0.05)
+        assert alarmas == []  # la fila escrita antes de arrancar no dispara alarmas viejas
+        with open(ruta, 'a') as f:
+            f.write(','.join(str(FUERA[c]) for c in columnas) + '\n')
+            f.write(','.join(str(GAS[c]) for c in columnas[:3]))  # fila incompleta: se espera
+        await asyncio.sleep(0.05)
+        vigilancia.cancel()
+
+    asyncio.run(probar())
+    assert [(a.corriente, a.parametro) for a in alarmas] == [('GC-02', 'CO2 (%)')]
+    assert analizador.lecturas == 1
+
+
+def test_socket_recibe_composiciones_json():
+    analizador, alarmas = _analizador()
+
+    async def probar():
+        servidor = await asyncio.start_server(analizador._atender, '127.0.0.1', 0)
+        puerto = servidor.sockets[0].getsockname()[1]
+        async with servidor:
+            lector, escritor = await asyncio.open_connection('127.0.0.1', puerto)
+            for linea in (dict(GAS, corriente='GC-03'), 'no es json', dict(FUERA, corriente='GC-03')):
+                escritor.write((json.dumps(linea) if isinstance(linea, dict) else linea).encode() + b'\n')
+            await escritor.drain()
+            escritor.close()
+            for _ in range(100):
+                if analizador.lecturas + analizador.descartadas == 3:
+                    break
+                await asyncio.sleep(0.01)
+
+    asyncio.run(probar())
+    assert analizador.lecturas == 2 and analizador.descartadas == 1
+    assert [(a.corriente, a.parametro) for a in alarmas] == [('GC-03', 'CO2 (%)')]